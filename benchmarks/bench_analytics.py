@@ -0,0 +1,83 @@
+"""
+Analytics Benchmark
+Times building the analytics columns and every metric, with NumPy (when
+installed) and with the pure-Python fallback
+
+Usage: python benchmarks/bench_analytics.py [N]   (default: 1000000)
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.analytics import StudyAnalytics, np
+from src.columnar import ColumnarSessions
+
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'History',
+            'Literature', 'Computer Science', 'Economics']
+TODAY = date(2025, 6, 1)
+
+
+def make_sessions(n, rng):
+    start = datetime(2020, 1, 1)
+    step = (datetime(2025, 6, 1) - start) / n
+    sessions = []
+    for i in range(n):
+        started = start + step * i + timedelta(minutes=rng.randrange(60))
+        minutes = rng.choice([25, 30, 45, 60, 90])
+        sessions.append({
+            'subject': rng.choice(SUBJECTS),
+            'planned_duration': minutes,
+            'actual_duration': minutes,
+            'start_time': started.isoformat(),
+            'date': started.strftime('%Y-%m-%d'),
+            'completed': True
+        })
+    return sessions
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rng = random.Random(3)
+    sessions = make_sessions(n, rng)
+    columns = ColumnarSessions(sessions)
+
+    modes = [False, True] if np is not None else [False]
+    print(f"{n:,} sessions (NumPy {'available' if np is not None else 'not installed'})")
+    print(f"{'step':<26}" + "".join(f"{'numpy' if m else 'python':>12}" for m in modes))
+
+    rows = {}
+    for use_numpy in modes:
+        build_ms, analytics = timed(lambda: StudyAnalytics(sessions, use_numpy=use_numpy))
+        columnar_ms, _ = timed(lambda: StudyAnalytics.from_columnar(columns, use_numpy=use_numpy))
+        rows.setdefault('build from dicts', []).append(build_ms)
+        rows.setdefault('build from columnar', []).append(columnar_ms)
+        metrics = [
+            ('daily_totals', analytics.daily_totals),
+            ('weekly_totals', analytics.weekly_totals),
+            ('rolling_average(7)', lambda: analytics.rolling_average(7)),
+            ('rolling_average(30)', lambda: analytics.rolling_average(30)),
+            ('streaks', lambda: analytics.streaks(TODAY)),
+            ('hour_heatmap', analytics.hour_heatmap),
+            ('subject_trends', lambda: analytics.subject_trends(today=TODAY)),
+            ('study_days', analytics.study_days),
+        ]
+        for name, metric in metrics:
+            rows.setdefault(name, []).append(timed(metric)[0])
+
+    for name, times in rows.items():
+        print(f"{name:<26}" + "".join(f"{ms:>10.1f}ms" for ms in times))
+
+
+if __name__ == '__main__':
+    main()
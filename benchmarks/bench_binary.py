@@ -0,0 +1,78 @@
+"""
+Binary Session File Benchmark
+Compares file size, load time and common queries for JSON and binary session storage
+
+Usage: python benchmarks/bench_binary.py [N]   (default: 1000000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_sessions, write_json
+from src.binary_sessions import binary_path
+from src.instrument import metrics
+from src.storage import migrate_binary_to_json, migrate_json_to_binary
+from src.study_tracker import StudyTracker
+
+
+def clock(call):
+    started = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - started
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    metrics.enabled = False
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'study_sessions.json')
+        json_size = write_json(path, generate_sessions(n, seed=7))
+        _, to_binary = clock(lambda: migrate_json_to_binary(path))
+        binary_size = os.path.getsize(binary_path(path))
+
+        trackers = {}
+        rows = []
+        for name, options in (('json', {}), ('columnar', {'layout': 'columnar'}),
+                              ('binary', {'storage': 'binary'})):
+            tracker, load = clock(lambda: StudyTracker(path, **options))
+            trackers[name] = tracker
+            stats, stats_s = clock(tracker.get_statistics)
+            recent, recent_s = clock(lambda: tracker.get_recent_sessions(10))
+            window, window_s = clock(lambda: tracker.get_sessions_between(
+                datetime(2024, 3, 1), datetime(2024, 4, 1)))
+            _, analytics_s = clock(tracker.get_analytics)
+            rows.append((name, load, stats_s, recent_s, window_s, analytics_s))
+            assert stats == trackers['json'].get_statistics()
+            assert [dict(s) for s in recent] == trackers['json'].get_recent_sessions(10)
+            assert [dict(s) for s in window] == trackers['json'].get_sessions_between(
+                datetime(2024, 3, 1), datetime(2024, 4, 1))
+
+        binary = trackers['binary']
+        binary.check_aggregates()
+        binary.close()
+        _, to_json = clock(lambda: migrate_binary_to_json(path))
+
+    print(f"{n:,} sessions")
+    print(f"{'file':<10}{'MB':>10}{'bytes/session':>16}")
+    print(f"{'json':<10}{json_size / 1e6:>10.1f}{json_size / n:>16.1f}")
+    print(f"{'binary':<10}{binary_size / 1e6:>10.1f}{binary_size / n:>16.1f}")
+    print(f"binary file is {json_size / binary_size:.1f}x smaller")
+    print()
+    print(f"{'storage':<10}{'load (s)':>10}{'stats (ms)':>12}{'recent (ms)':>13}"
+          f"{'month (ms)':>12}{'analytics (s)':>15}")
+    for name, load, stats_s, recent_s, window_s, analytics_s in rows:
+        print(f"{name:<10}{load:>10.3f}{stats_s * 1000:>12.3f}{recent_s * 1000:>13.3f}"
+              f"{window_s * 1000:>12.3f}{analytics_s:>15.3f}")
+    print(f"\nbinary loads {rows[0][1] / rows[2][1]:.0f}x faster than JSON")
+    print(f"conversion: JSON -> binary {to_binary:.2f} s, binary -> JSON {to_json:.2f} s "
+          f"(both verified lossless)")
+
+
+if __name__ == '__main__':
+    main()
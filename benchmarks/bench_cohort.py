@@ -0,0 +1,95 @@
+"""
+Cohort Report Benchmark
+Times cohort-wide statistics over many users' session files with 1 to N worker
+processes, against a serial loop of StudyTracker instances, and checks that
+every run produces the same report
+
+Usage: python benchmarks/bench_cohort.py [--users 1000] [--workers 1 2 4] [--seed 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_sessions, write_json
+from src.cohort import SESSIONS_FILE, CohortReport, cohort_report, user_dirs
+from src.instrument import metrics
+from src.study_tracker import StudyTracker
+
+
+def make_cohort(data_dir, users, seed):
+    """Users with skewed history sizes (a few heavy users, many light ones)"""
+    rng = random.Random(seed)
+    total = 0
+    for i in range(users):
+        count = min(int(rng.paretovariate(1.2) * 60), 5000) if rng.random() < 0.95 else 0
+        sessions = generate_sessions(count, seed * 100000 + i)
+        # Float durations exercise the merge order: float sums aren't associative
+        for session in sessions[::7]:
+            session['actual_duration'] += 0.1
+        write_json(os.path.join(data_dir, f"user{i:05d}", SESSIONS_FILE), sessions)
+        total += count
+    return total
+
+
+def tracker_loop(data_dir):
+    """The serial baseline: one StudyTracker per user"""
+    report = CohortReport()
+    for user_dir in user_dirs(data_dir):
+        tracker = StudyTracker(os.path.join(user_dir, SESSIONS_FILE))
+        aggregates = tracker.aggregates
+        report.add_user([(subject, minutes, aggregates.subject_counts[subject])
+                         for subject, minutes in aggregates.subject_minutes.items()])
+        tracker.close()
+    return report.report()
+
+
+def default_workers():
+    counts = [1]
+    while counts[-1] < max(2, os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel cohort reports")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers(),
+                        help='Worker counts to time (default: powers of two up to the CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+    metrics.enabled = False
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        started = time.perf_counter()
+        sessions = make_cohort(data_dir, args.users, args.seed)
+        print(f"{args.users:,} users, {sessions:,} sessions "
+              f"(generated in {time.perf_counter() - started:.1f} s, {os.cpu_count()} CPUs)")
+
+        started = time.perf_counter()
+        expected = tracker_loop(data_dir)
+        baseline = time.perf_counter() - started
+        print(f"\n{'path':<24}{'seconds':>10}{'speedup':>10}")
+        print(f"{'StudyTracker loop':<24}{baseline:>10.2f}{1.0:>9.2f}x")
+        for workers in args.workers:
+            started = time.perf_counter()
+            report = cohort_report(data_dir, workers=workers, chunk_size=args.chunk_size)
+            seconds = time.perf_counter() - started
+            assert report == expected, f"{workers} workers produced a different report"
+            label = f"{workers} worker" + ("s" if workers > 1 else "")
+            print(f"{label:<24}{seconds:>10.2f}{baseline / seconds:>9.2f}x")
+
+    study = expected['statistics']
+    print(f"\nAll reports identical: {study['total_sessions']:,} sessions, "
+          f"{study['total_hours']:,.1f} hours, most studied {study['most_studied_subject']}")
+
+
+if __name__ == '__main__':
+    main()
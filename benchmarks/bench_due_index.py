@@ -0,0 +1,103 @@
+"""
+Due Index Benchmark
+Compares the DueIndex deadline queries against scanning and sorting every
+task, and counts the timer wake-ups the reminder scheduler needs for a month
+of deadlines next to a once-a-minute poll
+
+Usage: python benchmarks/bench_due_index.py [N]   (default: 100000)
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_tasks, write_json
+from src.due_index import DueIndex
+from src.instrument import metrics
+from src.reminders import DeadlineReminders
+from src.storage import priority_rank
+from src.task_manager import TaskManager
+from src.timer import FakeClock
+
+TODAY = date(2023, 6, 1)
+
+
+def scan(tasks, start=None, end=None, before=None):
+    """Pending dated tasks in a date range, the way a list would find them"""
+    found = [t for t in tasks if not t['completed'] and t['due_date']
+             and (start is None or t['due_date'] >= start)
+             and (end is None or t['due_date'] <= end)
+             and (before is None or t['due_date'] < before)]
+    found.sort(key=lambda t: (t['due_date'], priority_rank(t['priority']), t['created_at']))
+    return found
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+async def count_wakeups(manager, days):
+    """Timer wake-ups and reminders over ``days`` days of simulated time"""
+    clock = FakeClock(datetime.combine(TODAY, datetime.min.time()))
+    reminded = []
+    reminders = DeadlineReminders(manager, reminded.append, clock=clock)
+    wakeups = [0]
+    fire = reminders._fire
+
+    def counted():
+        wakeups[0] += 1
+        fire()
+    reminders._fire = counted
+    reminders.start()
+    await clock.advance(days * 86400)
+    reminders.stop()
+    return wakeups[0], len(reminded)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    metrics.enabled = False
+    tasks = generate_tasks(n, seed=11)
+    index = DueIndex(tasks)
+    today, week = TODAY.isoformat(), (TODAY + timedelta(days=7)).isoformat()
+
+    rows = [
+        ('due within 7 days', lambda: scan(tasks, today, week),
+         lambda: index.between(today, week)),
+        ('overdue (first 20)', lambda: scan(tasks, before=today)[:20],
+         lambda: index.before(today, 20)),
+        ('next deadline', lambda: scan(tasks, today)[:1],
+         lambda: index.between(today, limit=1)),
+        ('urgency order', lambda: scan(tasks), index.ordered),
+    ]
+    print(f"{n:,} tasks, {len(index):,} pending with a due date")
+    print(f"{'query':<22}{'results':>9}{'scan (ms)':>12}{'index (ms)':>12}{'speedup':>10}")
+    for name, old, new in rows:
+        old_ms, expected = timed(old, 3)
+        new_ms, result = timed(new, 20)
+        assert [t['id'] for t in result] == [t['id'] for t in expected], name
+        print(f"{name:<22}{len(result):>9,}{old_ms:>12.3f}{new_ms:>12.3f}"
+              f"{old_ms / new_ms:>9.0f}x")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_file = os.path.join(data_dir, 'tasks.json')
+        write_json(data_file, tasks)
+        manager = TaskManager(data_file)
+        days = 30
+        wakeups, reminded = asyncio.run(count_wakeups(manager, days))
+        manager.close()
+    print(f"\nReminders over {days} days: {reminded:,} sent with {wakeups:,} timer "
+          f"wake-ups (polling every minute: {days * 24 * 60:,} scans of {n:,} tasks)")
+
+
+if __name__ == '__main__':
+    main()
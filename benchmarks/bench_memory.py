@@ -0,0 +1,68 @@
+"""
+Session Memory Benchmark
+Compares the memory held by the dict-list and columnar session layouts
+
+Usage: python benchmarks/bench_memory.py [N]   (default: 1000000)
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.columnar import ColumnarSessions
+
+SUBJECTS = ['Math', 'Physics', 'Chemistry', 'Biology', 'History',
+            'Literature', 'Economics', 'Programming']
+
+
+def session_lines(n):
+    """JSON text for n sessions, parsed the way the tracker loads them"""
+    rng = random.Random(11)
+    start = datetime(2020, 1, 1, 8)
+    for i in range(n):
+        started = start + timedelta(minutes=i * 90, microseconds=rng.randrange(10**6))
+        duration = rng.randint(15, 120)
+        yield json.dumps({
+            'subject': rng.choice(SUBJECTS),
+            'planned_duration': duration,
+            'actual_duration': duration,
+            'start_time': started.isoformat(),
+            'date': started.strftime('%Y-%m-%d'),
+            'completed': True
+        })
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, seconds
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    text = '[' + ','.join(session_lines(n)) + ']'
+
+    dicts, dict_bytes, dict_peak, dict_s = measure(lambda: json.loads(text))
+    columns, col_bytes, col_peak, col_s = measure(lambda: ColumnarSessions(dicts))
+    assert columns[n // 2] == dicts[n // 2]
+
+    print(f"{n:,} sessions")
+    print(f"{'layout':<10}{'held (MB)':>12}{'bytes/session':>16}{'build (s)':>12}")
+    print(f"{'dicts':<10}{dict_bytes / 2**20:>12.1f}{dict_bytes / n:>16.1f}{dict_s:>12.2f}")
+    print(f"{'columnar':<10}{col_bytes / 2**20:>12.1f}{col_bytes / n:>16.1f}{col_s:>12.2f}")
+    print(f"columnar layout holds {dict_bytes / col_bytes:.1f}x less memory "
+          f"(peak while converting: {col_peak / 2**20:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Review Queue Benchmark
+Times a 100k-item spaced-repetition queue: bulk add, reload, due lookups,
+reviews (one appended line each) against rewriting the whole file
+
+Usage: python benchmarks/bench_review_queue.py [N]   (default: 100000)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.review_queue import ReviewQueue
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(5)
+    now = datetime(2025, 1, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'reviews.jsonl')
+        queue = ReviewQueue(path, fsync=False)
+        names = [f"Topic {i}" for i in range(n)]
+        add_ms, _ = timed(lambda: queue.add_many(names, now))
+
+        # Spread the items out over the next months
+        for name in rng.sample(names, n // 2):
+            queue.review(name, rng.randrange(3, 6), now - timedelta(days=rng.randrange(30)))
+        queue.compact()
+        load_ms, queue = timed(lambda: ReviewQueue(path, fsync=False))
+
+        later = now + timedelta(days=1)
+        next_ms, _ = timed(lambda: queue.next_due(later), 1000)
+        due_ms, due = timed(lambda: queue.due(later, limit=20), 100)
+        scan_ms, _ = timed(lambda: sorted((i for i in queue.items.values()
+                                            if i['due'] <= later.isoformat()),
+                                           key=lambda i: i['due'])[:20], 5)
+
+        reviews = rng.sample(names, 1000)
+        review_ms, _ = timed(lambda: [queue.review(name, rng.randrange(6), later)
+                                      for name in reviews])
+
+        def rewrite():
+            with open(path + '.full', 'w') as f:
+                json.dump(list(queue.items.values()), f)
+        rewrite_ms, _ = timed(rewrite, 3)
+
+        print(f"{n:,} review items, {os.path.getsize(path) / 1e6:.1f} MB log")
+        print(f"{'add_many (all items)':<34}{add_ms:>10.1f} ms")
+        print(f"{'reload from log':<34}{load_ms:>10.1f} ms")
+        print(f"{'next_due':<34}{next_ms * 1000:>10.1f} us")
+        print(f"{'due(limit=20)':<34}{due_ms * 1000:>10.1f} us   ({len(due)} items)")
+        print(f"{'due(limit=20) by full scan':<34}{scan_ms * 1000:>10.1f} us")
+        # 1000 reviews took review_ms milliseconds, i.e. review_ms microseconds each
+        print(f"{'review (one appended line)':<34}{review_ms:>10.1f} us")
+        print(f"{'full-file rewrite per change':<34}{rewrite_ms:>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
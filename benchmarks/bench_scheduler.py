@@ -0,0 +1,81 @@
+"""
+Scheduler Benchmark
+Times full study plans and single-task re-plans over generated semesters
+
+Usage: python benchmarks/bench_scheduler.py [N ...]   (default: 1000 5000 20000)
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.scheduler import StudyScheduler
+
+START = date(2025, 9, 1)
+SEMESTER_DAYS = 120
+
+
+def make_tasks(n, rng):
+    tasks = []
+    for i in range(n):
+        due = None
+        if rng.random() < 0.8:
+            due = (START + timedelta(days=rng.randrange(SEMESTER_DAYS))).isoformat()
+        tasks.append({
+            'id': f"{i:08x}",
+            'title': f"Task {i}",
+            'priority': rng.choice(['High', 'Medium', 'Low']),
+            'due_date': due,
+            'completed': False,
+            'estimated_minutes': rng.choice([30, 45, 60, 90, 120, 180])
+        })
+    return tasks
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 5000, 20000]
+    rng = random.Random(11)
+
+    print(f"{'tasks':>8}{'load':>12}{'plan (ms)':>11}{'calendar (ms)':>15}"
+          f"{'infeasible':>12}{'re-plan (ms)':>14}{'vs full':>10}")
+    for n in sizes:
+        tasks = make_tasks(n, rng)
+        need = sum(t['estimated_minutes'] for t in tasks) // SEMESTER_DAYS
+        # Enough daily time for all the work, or less than the dated work needs
+        for load, daily in (('fits', need * 11 // 10), ('overloaded', need * 7 // 10)):
+
+            def full_plan():
+                scheduler = StudyScheduler(tasks, session_minutes=45,
+                                           daily_minutes=daily, start=START)
+                return scheduler, scheduler.summary()
+
+            plan_ms, (scheduler, summary) = timed(full_plan, 3)
+            calendar_ms, _ = timed(scheduler.calendar, 3)
+
+            # Re-plan after one task changes: the incremental path vs starting over
+            changed = [rng.choice(tasks) for _ in range(20)]
+
+            def replan():
+                for task in changed:
+                    task['estimated_minutes'] += 15
+                    scheduler.update_task(task)
+                    scheduler.summary()
+
+            replan_ms, _ = timed(replan)
+            replan_ms /= len(changed)
+            print(f"{n:>8,}{load:>12}{plan_ms:>11.1f}{calendar_ms:>15.1f}"
+                  f"{summary['infeasible']:>12,}{replan_ms:>14.2f}{plan_ms / replan_ms:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Search Benchmark
+Times the task search index against a linear scan, and saving/loading it
+against rebuilding it at startup
+
+Usage: python benchmarks/bench_search.py [N]   (default: 100000)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.search_index import SearchIndex, tokenize
+from src.task_manager import TaskManager
+
+WORDS = ['linear', 'algebra', 'calculus', 'essay', 'history', 'reading', 'chapter',
+         'lab', 'report', 'chemistry', 'organic', 'physics', 'quiz', 'review',
+         'project', 'presentation', 'biology', 'genetics', 'statistics', 'notes']
+QUERIES = ['alg', 'linear algebra', 'chem lab report', 'qu', 'Genetics Notes', 'zzz']
+
+
+def make_records(n, rng):
+    return [{
+        'id': f"{i:08x}",
+        'title': ' '.join(rng.sample(WORDS, 3)).capitalize() + f" {i}",
+        'description': ' '.join(rng.sample(WORDS, 5)),
+        'priority': rng.choice(['High', 'Medium', 'Low'])
+    } for i in range(n)]
+
+
+def scan(tasks, query):
+    """The search without an index: tokenize every task on every query"""
+    terms = tokenize(query)
+    matches = []
+    for task in tasks:
+        tokens = tokenize(f"{task['title']} {task['description']}")
+        if terms and all(any(t.startswith(term) for t in tokens) for term in terms):
+            matches.append(task['id'])
+    return matches
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(9)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'tasks.json')
+        manager = TaskManager(data_file)
+        manager.add_tasks_bulk(make_records(n, rng), batch_size=n)
+        tasks = manager.tasks
+
+        build_ms, _ = timed(lambda: manager._search_index())
+        manager._search = None
+        load_ms, _ = timed(lambda: SearchIndex.load(manager.search_file, data_file))
+        rebuild_ms, _ = timed(lambda: SearchIndex().add_many(
+            (t['id'], manager._search_text(t)) for t in tasks))
+
+        print(f"{n:,} tasks")
+        print(f"{'build + save index':<28}{build_ms:>10.1f} ms")
+        print(f"{'load saved index':<28}{load_ms:>10.1f} ms")
+        print(f"{'rebuild in memory':<28}{rebuild_ms:>10.1f} ms")
+        print()
+        print(f"{'query':<20}{'matches':>9}{'index (ms)':>12}{'scan (ms)':>12}")
+        for query in QUERIES:
+            index_ms, found = timed(lambda: manager.search(query), 5)
+            scan_ms, expected = timed(lambda: scan(tasks, query))
+            assert sorted(t['id'] for t in found) == sorted(expected), query
+            print(f"{query:<20}{len(found):>9,}{index_ms:>12.2f}{scan_ms:>12.1f}")
+
+        # The index side of add_task/delete_task (the JSON store write is separate)
+        index = manager._search_index()
+        extra = [(f"extra{i}", f"Extra task {i} linear review") for i in range(1000)]
+        add_ms, _ = timed(lambda: [index.add(doc_id, text) for doc_id, text in extra])
+        remove_ms, _ = timed(lambda: [index.remove(doc_id, text) for doc_id, text in extra])
+        print(f"\n{'index add':<28}{add_ms:>10.1f} us each")
+        print(f"{'index remove':<28}{remove_ms:>10.1f} us each")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Startup Benchmark
+Measures cold-start time of CLI commands and fails if it exceeds a cap
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--max-ms MS]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MAIN = os.path.join(ROOT, 'main.py')
+
+COMMANDS = [
+    ['--help'],
+    ['task', 'list', '--json'],
+    ['stats', '--json'],
+    ['recommend', '--json'],
+]
+
+
+def run_once(args, cwd):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, MAIN] + args, cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def imported_modules(args, cwd):
+    """Project modules imported by a command, from python -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', MAIN] + args,
+                            cwd=cwd, check=True, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        name = line.rsplit('|', 1)[-1].strip()
+        if name.startswith('src.'):
+            modules.append(name)
+    return list(dict.fromkeys(modules))
+
+
+def run_once_python(cwd):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], cwd=cwd, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-ms', type=float, default=250.0,
+                        help='Fail if any command\'s median start time exceeds this')
+    args = parser.parse_args()
+
+    baseline = statistics.median(
+        run_once_python(tempfile.gettempdir()) for _ in range(args.runs)
+    )
+    print(f"bare interpreter: {baseline:.1f} ms")
+
+    failed = False
+    with tempfile.TemporaryDirectory() as cwd:
+        run_once(['task', 'add', 'Warm-up task'], cwd)
+        for command in COMMANDS:
+            times = [run_once(command, cwd) for _ in range(args.runs)]
+            median = statistics.median(times)
+            over = median > args.max_ms
+            failed |= over
+            modules = ', '.join(m[4:] for m in imported_modules(command, cwd)) or '-'
+            print(f"{' '.join(command):<24} median {median:7.1f} ms  "
+                  f"max {max(times):7.1f} ms  {'OVER CAP' if over else 'ok':<8} "
+                  f"modules: {modules}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Storage Backend Benchmark
+Compares the JSON and SQLite backends for load, lookup and filter paths
+
+Usage: python benchmarks/bench_storage.py [N ...]   (default: 10000 100000 1000000)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.task_manager import TaskManager
+from src.study_tracker import StudyTracker
+from src.storage import SQLiteTaskStore, SQLiteSessionStore, sqlite_path
+
+SUBJECTS = ['Math', 'Physics', 'Chemistry', 'Biology', 'History',
+            'Literature', 'Economics', 'Programming']
+
+
+def make_tasks(n, rng):
+    return [{
+        'id': f"{i:08x}",
+        'title': f"Task {i}",
+        'description': f"Description for task {i}",
+        'priority': rng.choice(['High', 'Medium', 'Low']),
+        'due_date': f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        'created_at': '2025-01-01T00:00:00',
+        'completed': rng.random() < 0.5,
+        'completed_at': None
+    } for i in range(n)]
+
+
+def make_sessions(n, rng):
+    sessions = []
+    for i in range(n):
+        day = i * 1500 // max(n, 1)
+        date = time.strftime('%Y-%m-%d', time.gmtime(1577836800 + day * 86400))
+        duration = rng.randint(15, 120)
+        sessions.append({
+            'subject': rng.choice(SUBJECTS),
+            'planned_duration': duration,
+            'actual_duration': duration,
+            'start_time': f"{date}T{rng.randint(6, 22):02d}:00:00",
+            'date': date,
+            'completed': True
+        })
+    return sessions
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def bench(n, workdir):
+    rng = random.Random(42)
+    tasks = make_tasks(n, rng)
+    sessions = make_sessions(n, rng)
+
+    tasks_file = os.path.join(workdir, f"tasks_{n}.json")
+    sessions_file = os.path.join(workdir, f"sessions_{n}.json")
+    with open(tasks_file, 'w') as f:
+        json.dump(tasks, f, indent=4)
+    with open(sessions_file, 'w') as f:
+        json.dump(sessions, f, indent=4)
+
+    task_db = SQLiteTaskStore(sqlite_path(tasks_file))
+    task_db.add_many(tasks)
+    task_db.close()
+    session_db = SQLiteSessionStore(sqlite_path(sessions_file))
+    session_db.add_many(sessions)
+    session_db.close()
+
+    probe_id = tasks[n // 2]['id']
+    results = {}
+    for storage in ('json', 'sqlite'):
+        load_tasks, manager = timed(lambda: TaskManager(tasks_file, storage=storage))
+        load_sessions, tracker = timed(lambda: StudyTracker(sessions_file, storage=storage))
+        results[storage] = {
+            'load_tasks': load_tasks,
+            'load_sessions': load_sessions,
+            'get_task_by_id': timed(lambda: manager.get_task_by_id(probe_id), 100)[0],
+            'get_priority_tasks': timed(manager.get_priority_tasks, 3)[0],
+            'get_sessions_by_subject': timed(lambda: tracker.get_sessions_by_subject('math'), 3)[0],
+            'get_statistics': timed(tracker.get_statistics, 3)[0],
+        }
+        manager.store.close()
+        tracker.close()
+    return results
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10000, 100000, 1000000]
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            results = bench(n, workdir)
+            print(f"\n== {n:,} records ==")
+            print(f"{'operation':<26}{'json (ms)':>14}{'sqlite (ms)':>14}")
+            for op in results['json']:
+                print(f"{op:<26}{results['json'][op] * 1000:>14.3f}"
+                      f"{results['sqlite'][op] * 1000:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Task Index Benchmark
+Compares the TaskIndex lookups and views against the old list scans
+
+Usage: python benchmarks/bench_task_index.py [N]   (default: 100000)
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.task_index import TaskIndex
+
+
+def make_tasks(n, rng):
+    return [{
+        'id': f"{i:08x}",
+        'title': f"Task {i}",
+        'description': '',
+        'priority': rng.choice(['High', 'Medium', 'Low']),
+        'due_date': None,
+        'created_at': '2025-01-01T00:00:00',
+        'completed': rng.random() < 0.3,
+        'completed_at': '2025-01-02T00:00:00'
+    } for i in range(n)]
+
+
+def list_get(tasks, task_id):
+    for task in tasks:
+        if task['id'] == task_id:
+            return task
+    return None
+
+
+def list_sorted(tasks):
+    return sorted(tasks, key=lambda x: (
+        x['completed'],
+        {'High': 0, 'Medium': 1, 'Low': 2}.get(x['priority'], 3)
+    ))
+
+
+def list_priority(tasks):
+    return [task for task in tasks
+            if task['priority'] == 'High' and not task['completed']]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(7)
+    tasks = make_tasks(n, rng)
+    index = TaskIndex([dict(t) for t in tasks])
+    probes = [tasks[rng.randrange(n)]['id'] for _ in range(50)]
+
+    def list_complete_delete():
+        for task_id in probes[:10]:
+            task = list_get(tasks, task_id)
+            task['completed'] = True
+            tasks.remove(task)
+            tasks.append(task)
+
+    def index_complete_delete():
+        for task_id in probes[:10]:
+            task = index.get(task_id)
+            if not task['completed']:
+                index.mark_completed(task, '2025-01-03T00:00:00')
+            index.remove(task)
+            index.add(task)
+
+    rows = [
+        ('get_task_by_id x50', lambda: [list_get(tasks, p) for p in probes],
+         lambda: [index.get(p) for p in probes], 3),
+        ('get_all_tasks', lambda: list_sorted(tasks), index.ordered, 5),
+        ('get_priority_tasks', lambda: list_priority(tasks),
+         lambda: index.bucket('High'), 5),
+        ('complete+delete x10', list_complete_delete, index_complete_delete, 3),
+    ]
+
+    print(f"{n:,} tasks")
+    print(f"{'operation':<24}{'list (ms)':>12}{'index (ms)':>12}{'speedup':>10}")
+    for name, old, new, repeat in rows:
+        old_ms, new_ms = timed(old, repeat), timed(new, repeat)
+        print(f"{name:<24}{old_ms:>12.3f}{new_ms:>12.3f}{old_ms / new_ms:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
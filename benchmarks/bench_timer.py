@@ -0,0 +1,56 @@
+"""
+Timer Benchmark
+Runs hundreds of concurrent timed sessions on one event loop in real time,
+with pauses and aborts, and reports the CPU time they cost
+
+Usage: python benchmarks/bench_timer.py [N] [SECONDS]   (default: 500 sessions, 5 s)
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.timer import SessionEngine
+
+
+async def run(n, seconds, rng):
+    engine = SessionEngine()
+    minutes = seconds / 60
+    # Four work blocks and three breaks, compressed into ``seconds``
+    ids = [engine.start(f"Subject {i}", minutes * 4 / 7, minutes / 7, minutes / 7)
+           for i in range(n)]
+    await asyncio.sleep(seconds / 4)
+    paused = rng.sample(ids, n // 4)
+    for sid in paused:
+        engine.pause(sid)
+    for sid in rng.sample(ids, n // 10):
+        engine.abort(sid)
+    await asyncio.sleep(seconds / 4)
+    for sid in paused:
+        engine.resume(sid)
+    await engine.wait()
+    return engine
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    engine = asyncio.run(run(n, seconds, random.Random(4)))
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+
+    states = {}
+    for session in engine.sessions.values():
+        states[session.state] = states.get(session.state, 0) + 1
+    print(f"{n} sessions over {wall:.2f} s wall: {states}")
+    print(f"CPU time {cpu * 1000:.1f} ms ({cpu / wall:.1%} of one core)")
+
+
+if __name__ == '__main__':
+    main()
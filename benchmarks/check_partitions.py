@@ -0,0 +1,79 @@
+"""
+Partitioned Store Self-Check
+Simulates a crash in the middle of an append to a month partition and checks
+that the next append cuts off the torn line, so the month still loads with
+every complete session plus the new one
+
+Usage: python benchmarks/check_partitions.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.partitions import PartitionedSessionStore
+from src.study_tracker import StudyTracker
+
+
+def session(subject, start_time):
+    return {'subject': subject, 'planned_duration': 30, 'actual_duration': 30,
+            'start_time': start_time, 'end_time': None, 'completed': True}
+
+
+def tear(store, key, fragment):
+    """Leave a partial record at the end of a partition, as a crash would"""
+    with open(store._path(key), 'a') as f:
+        f.write(fragment)
+
+
+def check_torn_tail(directory):
+    store = PartitionedSessionStore(directory)
+    store.add_many([session('Math', '2025-03-01T09:00:00'),
+                    session('Physics', '2025-03-02T09:00:00')])
+    store.subject_totals()
+    tear(store, '2025-03', '{"subject": "Chem", "planned_dur')
+    store.add(session('History', '2025-03-03T09:00:00'))
+    store.close()
+
+    store = PartitionedSessionStore(directory)
+    assert [s['subject'] for s in store.iter_partition('2025-03')] == [
+        'Math', 'Physics', 'History']
+    assert store.count() == 3
+    store.close()
+
+    # A torn line with no complete one before it leaves an empty partition
+    tear(store, '2025-04', '{"subject": "Art"')
+    store.add(session('Biology', '2025-04-01T09:00:00'))
+    assert [s['subject'] for s in store.iter_partition('2025-04')] == ['Biology']
+
+
+def check_tracker(directory):
+    tracker = StudyTracker(os.path.join(directory, 'study_sessions.json'),
+                           storage='partitioned')
+    tracker.start_session('Math', 30)
+    key = tracker.get_recent_sessions(1)[0]['start_time'][:7]
+    tracker.close()
+    tear(tracker.store, key, '{"subject": "Phys')
+
+    tracker = StudyTracker(os.path.join(directory, 'study_sessions.json'),
+                           storage='partitioned')
+    tracker.start_session('History', 45)
+    tracker.close()
+    tracker = StudyTracker(os.path.join(directory, 'study_sessions.json'),
+                           storage='partitioned')
+    assert [s['subject'] for s in tracker.get_recent_sessions()] == ['History', 'Math']
+    assert tracker.get_statistics()['total_sessions'] == 2
+    tracker.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        check_torn_tail(os.path.join(tmp, 'store'))
+        check_tracker(os.path.join(tmp, 'tracker'))
+    print("partition checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Deadline Reminder Self-Check
+Drives the due-date index and the reminder scheduler with a fake clock (no
+real waiting) and checks query results, reminder times and how task changes
+move the timer
+
+Usage: python benchmarks/check_reminders.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.reminders import DeadlineReminders
+from src.task_manager import TaskManager
+from src.timer import FakeClock
+from src.utils import parse_due_date
+
+TODAY = date(2025, 3, 10)
+
+
+def titles(tasks):
+    return [task['title'] for task in tasks]
+
+
+def check_parse():
+    assert parse_due_date('2025-3-5') == '2025-03-05'
+    assert parse_due_date(' ') is None and parse_due_date(None) is None
+    for bad in ('2025-02-30', 'tomorrow', '03/05/2025'):
+        try:
+            parse_due_date(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {bad!r}")
+
+
+def check_queries(manager):
+    manager.add_task('Old essay', '', 'Low', '2025-03-01')
+    manager.add_task('Lab report', '', 'High', '2025-03-08')
+    manager.add_task('Quiz', '', 'Medium', '2025-03-10')
+    manager.add_task('Problem set', '', 'High', '2025-03-10')
+    manager.add_task('Reading', '', 'Medium', '2025-03-14')
+    manager.add_task('Project', '', 'High', '2025-04-01')
+    manager.add_task('Someday', '', 'High')
+    done = manager.add_task('Done already', '', 'High', '2025-03-09')
+    manager.complete_task(done)
+    try:
+        manager.add_task('Bad', '', 'High', '2025-13-01')
+        raise AssertionError("invalid due date accepted")
+    except ValueError:
+        pass
+
+    assert titles(manager.get_overdue(TODAY)) == ['Old essay', 'Lab report']
+    # Same day: higher priority first
+    assert titles(manager.get_due_within(0, TODAY)) == ['Problem set', 'Quiz']
+    assert titles(manager.get_due_within(7, TODAY)) == ['Problem set', 'Quiz', 'Reading']
+    assert manager.next_deadline(TODAY + timedelta(days=1))['title'] == 'Reading'
+    assert manager.next_deadline(date(2025, 5, 1)) is None
+    assert titles(manager.get_tasks_by_urgency()) == [
+        'Old essay', 'Lab report', 'Problem set', 'Quiz', 'Reading', 'Project',
+        'Someday', 'Done already']
+
+
+async def check_reminders(manager):
+    clock = FakeClock(datetime(2025, 3, 10, 9, 0))
+    sent = []
+    reminders = DeadlineReminders(manager, lambda task: sent.append((clock.now(), task['title'])),
+                                  lead=timedelta(hours=12), clock=clock)
+    reminders.start()
+    # Missed deadlines are reminded straight away, today's 12 hours before midnight
+    assert titles_at(sent) == ['Old essay', 'Lab report'], sent
+    assert reminders.next_reminder() == datetime(2025, 3, 10, 12, 0)
+    await clock.advance(3 * 3600)
+    assert sent[2:] == [(datetime(2025, 3, 10, 12, 0), 'Problem set'),
+                        (datetime(2025, 3, 10, 12, 0), 'Quiz')], sent
+    # Reading is due 03-14, so its deadline is 03-15 00:00 and the reminder 03-14 12:00
+    assert reminders.next_reminder() == datetime(2025, 3, 14, 12, 0)
+
+    await clock.advance(2 * 86400 - 3 * 3600)
+    assert len(sent) == 4
+    # Completing the next task moves the timer on to the one after it
+    manager.complete_task(manager.get_due_within(7, TODAY)[-1]['id'])
+    assert reminders.next_reminder() == datetime(2025, 4, 1, 12, 0)
+    # A task added inside the window is reminded at once, one further out gets the timer
+    manager.add_task('Late feedback form', '', 'Low', '2025-03-11')
+    assert sent[-1] == (datetime(2025, 3, 12, 9, 0), 'Late feedback form'), sent
+    manager.add_task('Midterm', '', 'High', '2025-03-20')
+    assert reminders.next_reminder() == datetime(2025, 3, 20, 12, 0)
+
+    await clock.advance(30 * 86400)
+    assert sent[-2:] == [(datetime(2025, 3, 20, 12, 0), 'Midterm'),
+                         (datetime(2025, 4, 1, 12, 0), 'Project')], sent
+    assert len(reminders.reminded) == len(sent) == 7
+    reminders.stop()
+    # One timer at a time: wake-ups are bounded by deadlines plus the hourly
+    # re-check, not by the number of tasks
+    assert clock._seq < 32 * 24 + 20, clock._seq
+
+
+def titles_at(sent):
+    return [title for _, title in sent]
+
+
+async def main():
+    check_parse()
+    with tempfile.TemporaryDirectory() as tmp:
+        for storage in ('json', 'sqlite'):
+            manager = TaskManager(os.path.join(tmp, storage, 'tasks.json'), storage=storage)
+            check_queries(manager)
+            await check_reminders(manager)
+            manager.close()
+    print("reminder checks passed")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
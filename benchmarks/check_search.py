@@ -0,0 +1,77 @@
+"""
+Task Search Self-Check
+Two task managers share one task file: checks that neither uses a search
+index the other saved for tasks it hasn't loaded, and that a change made
+without searching leaves a saved index the next search can use
+
+Usage: python benchmarks/check_search.py
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.search_index import SearchIndex
+from src.task_manager import TaskManager
+
+
+def titles(tasks):
+    return [task['title'] for task in tasks]
+
+
+def check_two_managers(data_file):
+    first = TaskManager(data_file)
+    first.add_task('Algebra homework', '')
+    second = TaskManager(data_file)
+    second.add_task('Algebra quiz', '')
+    # Saves an index of both tasks, tagged with the file as the second left it
+    assert titles(second.search('algebra quiz')) == ['Algebra quiz']
+    second.close()
+
+    # The first manager never loaded the quiz: it must not find it
+    assert titles(first.search('algebra')) == ['Algebra homework']
+    assert first.search('quiz') == []
+    first.close()
+
+    # Loading afresh picks up both tasks
+    third = TaskManager(data_file)
+    assert sorted(titles(third.search('algebra'))) == ['Algebra homework', 'Algebra quiz']
+    third.close()
+
+
+def check_deleted_elsewhere(data_file):
+    first = TaskManager(data_file)
+    task_id = first.add_task('Chemistry lab', '')
+    assert titles(first.search('chem')) == ['Chemistry lab']
+    second = TaskManager(data_file)
+    second.delete_task(task_id)
+    second.close()
+    # The first manager picks up the deletion when its next write merges
+    first.add_task('Chemistry notes', '')
+    assert titles(first.search('chem')) == ['Chemistry notes']
+    first.close()
+
+
+def check_saved_after_change(data_file):
+    manager = TaskManager(data_file)
+    manager.search('anything')
+    manager.close()
+    manager = TaskManager(data_file)
+    manager.add_task('Essay outline', '')
+    manager.close()
+    index = SearchIndex.load(manager.search_file, data_file)
+    assert index is not None and index.search('essay'), "index not saved"
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        check_two_managers(os.path.join(tmp, 'a', 'tasks.json'))
+        check_deleted_elsewhere(os.path.join(tmp, 'b', 'tasks.json'))
+        check_saved_after_change(os.path.join(tmp, 'c', 'tasks.json'))
+    print("search checks passed")
+
+
+if __name__ == '__main__':
+    main()
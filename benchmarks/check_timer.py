@@ -0,0 +1,139 @@
+"""
+Timer Self-Check
+Drives timed sessions with a fake clock (no real waiting) and checks phase
+changes, pause/resume/abort accounting and the recorded durations
+
+Usage: python benchmarks/check_timer.py
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.study_tracker import StudyTracker
+from src.timer import BREAK, WORK, FakeClock, ProgressDisplay, SessionEngine, pomodoro_phases
+
+
+def check_phases():
+    assert pomodoro_phases(60) == [(WORK, 1500), (BREAK, 300), (WORK, 1500),
+                                   (BREAK, 300), (WORK, 600)]
+    assert pomodoro_phases(25) == [(WORK, 1500)]
+    assert pomodoro_phases(50, 25, 0) == [(WORK, 1500), (WORK, 1500)]
+
+
+async def check_full_session(tracker):
+    clock = FakeClock()
+    engine = SessionEngine(tracker, clock)
+    sid = engine.start('Physics', 60)
+    session = engine.sessions[sid]
+    await clock.advance(25 * 60 - 1)
+    assert (session.phase, session.cycle) == (WORK, 1), session.progress()
+    await clock.advance(1)
+    assert session.phase == BREAK and session.cycle == 2
+    await clock.advance(5 * 60)
+    assert session.phase == WORK and abs(session.studied_seconds() - 1500) < 1e-6
+    await clock.advance(40 * 60)
+    assert session.state == 'finished', session.progress()
+    # 60 minutes of work plus two 5-minute breaks
+    assert session.ended == clock.start + timedelta(minutes=70)
+    await engine.wait()
+    record = engine.recorded[-1]
+    assert record['actual_duration'] == 60 and record['completed'] is True, record
+    assert record['start_time'] == clock.start.isoformat()
+
+
+async def check_pause_resume_abort(tracker):
+    clock = FakeClock()
+    engine = SessionEngine(tracker, clock)
+    sid = engine.start('Chemistry', 30)
+    session = engine.sessions[sid]
+    await clock.advance(10 * 60)
+    assert engine.pause(sid) and not engine.pause(sid)
+    await clock.advance(60 * 60)   # an hour paused counts for nothing
+    assert session.studied_seconds() == 600 and session.phase_left() == 900
+    assert engine.resume(sid)
+    await clock.advance(5 * 60)
+    assert session.studied_seconds() == 900
+    assert engine.abort(sid) and not engine.resume(sid)
+    await clock.advance(60 * 60)
+    await engine.wait()
+    record = engine.recorded[-1]
+    assert record['actual_duration'] == 15 and record['completed'] is False, record
+
+
+async def check_abort_during_break(tracker):
+    clock = FakeClock()
+    engine = SessionEngine(tracker, clock)
+    sid = engine.start('Biology', 50)
+    await clock.advance(27 * 60)   # 25 minutes of work, 2 into the break
+    engine.abort(sid)
+    await engine.wait()
+    assert engine.recorded[-1]['actual_duration'] == 25
+
+
+async def check_short_abort_not_recorded():
+    clock = FakeClock()
+    engine = SessionEngine(None, clock)
+    sid = engine.start('History', 25)
+    await clock.advance(20)
+    engine.abort(sid)
+    await engine.wait()
+    assert engine.recorded == []
+
+
+async def check_many_sessions():
+    clock = FakeClock()
+    engine = SessionEngine(None, clock)
+    ids = [engine.start(f"Subject {i}", 25 + i % 50, 25, 5) for i in range(500)]
+    for sid in ids[::2]:
+        engine.pause(sid)
+    await clock.advance(200 * 60)
+    assert all(engine.sessions[sid].state == 'paused' for sid in ids[::2])
+    for sid in ids[::2]:
+        engine.resume(sid)
+    await clock.advance(200 * 60)
+    await engine.wait()
+    assert sorted(r['actual_duration'] for r in engine.recorded) == \
+        sorted(25 + i % 50 for i in range(500))
+    # Phase ends are the only wakeups: no per-tick timers were scheduled
+    assert clock._seq < 500 * 8, clock._seq
+
+
+async def check_display():
+    clock = FakeClock()
+    engine = SessionEngine(None, clock)
+    stream = io.StringIO()
+    engine.start('Mathematics', 30)
+    display = asyncio.get_running_loop().create_task(
+        ProgressDisplay(engine, stream).run())
+    await clock.advance(40 * 60)
+    await display
+    lines = stream.getvalue().splitlines()
+    # Not a terminal: one line per phase change, not per tick
+    assert lines == ["Mathematics: work 1/2 25:00 left, 0/30 min studied",
+                     "Mathematics: break 05:00 left, 25/30 min studied",
+                     "Mathematics: work 2/2 05:00 left, 25/30 min studied"], lines
+
+
+async def main():
+    check_phases()
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = StudyTracker(os.path.join(tmp, 'sessions.json'))
+        await check_full_session(tracker)
+        await check_pause_resume_abort(tracker)
+        await check_abort_during_break(tracker)
+        assert [s['actual_duration'] for s in tracker.get_all_sessions()] == [60, 15, 25]
+        assert tracker.get_statistics()['total_hours'] * 60 == 100
+    await check_short_abort_not_recorded()
+    await check_many_sessions()
+    await check_display()
+    print("timer checks passed")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
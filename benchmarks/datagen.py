@@ -0,0 +1,93 @@
+"""
+Synthetic Data Generator
+Seeded tasks and study sessions in the planner's own record format, for
+benchmarks and for sizing data files
+
+Usage: python benchmarks/datagen.py {tasks,sessions} N PATH [--seed S]
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+SUBJECTS = ['Mathematics', 'Physics', 'Chemistry', 'Biology', 'History',
+            'Literature', 'Computer Science', 'Economics', 'Statistics', 'Philosophy',
+            'Linear Algebra', 'Organic Chemistry', 'Data Structures', 'Psychology',
+            'Spanish', 'Art History', 'Genetics', 'Microeconomics', 'Calculus', 'Ethics']
+WORDS = ['read', 'chapter', 'essay', 'lab', 'report', 'problem', 'set', 'review',
+         'notes', 'quiz', 'project', 'draft', 'outline', 'exercises', 'slides']
+PRIORITIES = ['High', 'Medium', 'Low']
+START = datetime(2021, 9, 1, 8, 0)
+END = datetime(2025, 6, 30, 22, 0)
+
+
+def generate_tasks(n, seed=0):
+    """``n`` tasks: mixed priorities, two thirds with due dates, 40% completed"""
+    rng = random.Random(seed)
+    span = (END - START).total_seconds()
+    tasks = []
+    for i in range(n):
+        created = START + timedelta(seconds=rng.random() * span)
+        completed = rng.random() < 0.4
+        due = created + timedelta(days=rng.randrange(1, 60))
+        tasks.append({
+            'id': f"{i:08x}",
+            'title': f"{rng.choice(SUBJECTS)}: {' '.join(rng.sample(WORDS, 2))} {i}",
+            'description': ' '.join(rng.sample(WORDS, 4)),
+            'priority': rng.choices(PRIORITIES, weights=[2, 5, 3])[0],
+            'due_date': due.strftime('%Y-%m-%d') if rng.random() < 0.67 else None,
+            'created_at': created.isoformat(),
+            'completed': completed,
+            'completed_at': (created + timedelta(days=rng.randrange(0, 30))).isoformat()
+            if completed else None
+        })
+    return tasks
+
+
+def generate_sessions(n, seed=0):
+    """``n`` completed sessions spread evenly over four school years, oldest first"""
+    rng = random.Random(seed)
+    # A few subjects dominate, like a real timetable
+    weights = [1 / (rank + 1) for rank in range(len(SUBJECTS))]
+    step = (END - START) / max(n, 1)
+    sessions = []
+    for i in range(n):
+        started = START + step * i + timedelta(minutes=rng.randrange(45))
+        planned = rng.choice([25, 30, 45, 50, 60, 90, 120])
+        sessions.append({
+            'subject': rng.choices(SUBJECTS, weights)[0],
+            'planned_duration': planned,
+            'actual_duration': max(5, planned + rng.randrange(-15, 16)),
+            'start_time': started.isoformat(timespec='seconds'),
+            'date': started.strftime('%Y-%m-%d'),
+            'completed': True
+        })
+    return sessions
+
+
+def write_json(path, records):
+    """Write records the way the JSON stores do; returns the file size"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as f:
+        json.dump(records, f, indent=4)
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic tasks or sessions file")
+    parser.add_argument('kind', choices=['tasks', 'sessions'])
+    parser.add_argument('count', type=int)
+    parser.add_argument('path')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate = generate_tasks if args.kind == 'tasks' else generate_sessions
+    size = write_json(args.path, generate(args.count, args.seed))
+    print(f"Wrote {args.count:,} {args.kind} to {args.path} ({size / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
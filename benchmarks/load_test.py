@@ -0,0 +1,125 @@
+"""
+Planner API Load Test
+Drives the HTTP API with concurrent clients and reports latency and throughput
+
+Usage: python benchmarks/load_test.py [--url URL] [--requests N] [--users U]
+       (without --url an in-process server on a temporary data directory is used)
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.server import PlannerPool, PlannerServer
+
+SUBJECTS = ['Math', 'Physics', 'Chemistry', 'Biology', 'History']
+
+
+def client(host, port, users, requests, seed, latencies, errors):
+    """One client issuing a read-heavy mix of API calls on a keep-alive connection"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    for _ in range(requests):
+        user = f"user{rng.randrange(users)}"
+        roll = rng.random()
+        if roll < 0.15:
+            method, path, body = 'POST', f"/users/{user}/sessions", {
+                'subject': rng.choice(SUBJECTS), 'duration': rng.randint(15, 90)}
+        elif roll < 0.25:
+            method, path, body = 'POST', f"/users/{user}/tasks", {
+                'title': 'Load test task', 'priority': rng.choice(['High', 'Medium', 'Low'])}
+        elif roll < 0.50:
+            method, path, body = 'GET', f"/users/{user}/tasks", None
+        elif roll < 0.75:
+            method, path, body = 'GET', f"/users/{user}/stats", None
+        else:
+            method, path, body = 'GET', f"/users/{user}/recommendations", None
+
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_level(host, port, concurrency, total_requests, users):
+    latencies, errors = [], []
+    per_client = max(1, total_requests // concurrency)
+    threads = [threading.Thread(target=client,
+                                args=(host, port, users, per_client, seed, latencies, errors))
+               for seed in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'rps': len(latencies) / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='Existing server, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Requests per concurrency level')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--pool-size', type=int, default=32)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlparse(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        data_dir = tempfile.mkdtemp(prefix='planner-load-')
+        server = PlannerServer(('127.0.0.1', 0), PlannerPool(data_dir, capacity=args.pool_size))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = '127.0.0.1', server.server_port
+
+    print(f"{'clients':>8}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for concurrency in args.concurrency:
+        r = run_level(host, port, concurrency, args.requests, args.users)
+        print(f"{r['concurrency']:>8}{r['requests']:>10}{r['errors']:>8}"
+              f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['rps']:>10.0f}")
+
+    if server is not None:
+        server.shutdown()
+        server.pool.close()
+
+
+if __name__ == '__main__':
+    main()
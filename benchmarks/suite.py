@@ -0,0 +1,211 @@
+"""
+Benchmark Suite
+Times the planner's hot paths on seeded synthetic data at several sizes,
+writes the results as JSON and compares them against a stored baseline
+
+Usage:
+  python benchmarks/suite.py [--sizes 1000 10000 100000] [--output results.json]
+  python benchmarks/suite.py --output benchmarks/baseline.json        # record a baseline
+  python benchmarks/suite.py --compare benchmarks/baseline.json       # run, fail on regressions
+  python benchmarks/suite.py --compare baseline.json --current results.json   # no new run
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_sessions, generate_tasks, write_json
+from src.instrument import metrics
+from src.recommender import StudyRecommender
+from src.study_tracker import StudyTracker
+from src.task_manager import TaskManager
+
+
+def timings(calls):
+    """Milliseconds taken by each of the zero-argument ``calls``"""
+    result = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        result.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def summary(samples):
+    return {
+        'median_ms': round(statistics.median(samples), 4),
+        'min_ms': round(min(samples), 4),
+        'runs': len(samples)
+    }
+
+
+def write_runs(n, repeat):
+    """Runs for paths that rewrite or re-read the whole file: fewer as files grow"""
+    return max(3, min(repeat, 200000 // n))
+
+
+def bench_tasks(n, directory, seed, repeat):
+    path = os.path.join(directory, f"tasks-{n}.json")
+    tasks = generate_tasks(n, seed)
+    size = write_json(path, tasks)
+    rng = random.Random(seed)
+    runs = write_runs(n, repeat)
+
+    results = {'tasks.load': timings([lambda: TaskManager(path)] * runs)}
+    manager = TaskManager(path)
+    results['tasks.get_all_tasks'] = timings([manager.get_all_tasks] * repeat)
+
+    pending = [t['id'] for t in tasks if not t['completed']]
+    to_complete, to_delete = rng.sample(pending, runs), rng.sample(pending, 2 * runs)[runs:]
+    to_delete = [task_id for task_id in to_delete if task_id not in to_complete]
+    results['tasks.add_task'] = timings(
+        [lambda i=i: manager.add_task(f"Benchmark task {i}", 'generated', 'High', '2025-07-01')
+         for i in range(runs)])
+    results['tasks.complete_task'] = timings(
+        [lambda task_id=task_id: manager.complete_task(task_id) for task_id in to_complete])
+    results['tasks.delete_task'] = timings(
+        [lambda task_id=task_id: manager.delete_task(task_id) for task_id in to_delete])
+    manager.close()
+    return results, size
+
+
+def bench_sessions(n, directory, seed, repeat):
+    path = os.path.join(directory, f"sessions-{n}.json")
+    size = write_json(path, generate_sessions(n, seed))
+    runs = write_runs(n, repeat)
+
+    results = {'sessions.load': timings([lambda: StudyTracker(path)] * runs)}
+    tracker = StudyTracker(path)
+    results['sessions.save'] = timings([tracker._save_sessions] * runs)
+    results['sessions.start_session'] = timings(
+        [lambda: tracker.start_session('Benchmarking', 25)] * runs)
+    results['sessions.get_statistics'] = timings([tracker.get_statistics] * repeat)
+    results['sessions.get_recent_sessions'] = timings(
+        [lambda: tracker.get_recent_sessions(10)] * repeat)
+    results['sessions.get_subject_breakdown'] = timings([tracker.get_subject_breakdown] * repeat)
+
+    # Cold: a new recommender derives its features; warm: they are cached
+    random.seed(seed)
+    results['recommend.cold'] = timings(
+        [lambda: StudyRecommender(tracker).get_recommendations()] * repeat)
+    recommender = StudyRecommender(tracker)
+    results['recommend.warm'] = timings([recommender.get_recommendations] * repeat)
+    tracker.close()
+    return results, size
+
+
+def run_suite(sizes, seed, repeat, log=sys.stderr):
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'sizes': sizes,
+            'repeat': repeat
+        },
+        'results': {},
+        'file_bytes': {}
+    }
+    # The suite times the code paths themselves, not the instrumentation
+    metrics.enabled = False
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            for kind, bench in (('tasks', bench_tasks), ('sessions', bench_sessions)):
+                started = time.perf_counter()
+                results, size = bench(n, directory, seed, repeat)
+                for name, samples in results.items():
+                    report['results'].setdefault(name, {})[str(n)] = summary(samples)
+                report['file_bytes'].setdefault(kind, {})[str(n)] = size
+                print(f"  {kind} at {n:,}: {time.perf_counter() - started:.1f} s", file=log)
+    return report
+
+
+def print_report(report):
+    sizes = [str(n) for n in report['meta']['sizes']]
+    print(f"{'median ms':<32}" + "".join(f"{int(n):>12,}" for n in sizes))
+    for name, by_size in report['results'].items():
+        print(f"{name:<32}" + "".join(
+            f"{by_size[n]['median_ms']:>12.3f}" if n in by_size else f"{'-':>12}"
+            for n in sizes))
+    for kind, by_size in report['file_bytes'].items():
+        print(f"{kind + ' file MB':<32}" + "".join(
+            f"{by_size[n] / 1e6:>12.2f}" if n in by_size else f"{'-':>12}" for n in sizes))
+
+
+def compare(baseline, current, threshold, min_ms):
+    """Paths whose median got slower than the baseline by more than ``threshold``
+    (a fraction) and by at least ``min_ms``, with a printed comparison table"""
+    regressions = []
+    print(f"{'path':<32}{'size':>10}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, by_size in current['results'].items():
+        for n, result in by_size.items():
+            base = baseline['results'].get(name, {}).get(n)
+            if base is None:
+                print(f"{name:<32}{int(n):>10,}{'-':>12}{result['median_ms']:>12.3f}   new")
+                continue
+            before, after = base['median_ms'], result['median_ms']
+            change = (after - before) / before if before else 0.0
+            regressed = change > threshold and after - before >= min_ms
+            flag = "  REGRESSED" if regressed else ""
+            print(f"{name:<32}{int(n):>10,}{before:>12.3f}{after:>12.3f}{change:>+9.0%}{flag}")
+            if regressed:
+                regressions.append((name, n, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the planner benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Record counts to run at (default: 1000 10000 100000)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Runs per in-memory path (whole-file paths run fewer '
+                             'times on large data)')
+    parser.add_argument('--output', help='Write the results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='Compare against a results file; exit 1 on regressions')
+    parser.add_argument('--current', metavar='RESULTS',
+                        help='With --compare: use this results file instead of running')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown before failing, as a fraction (default: 0.25)')
+    parser.add_argument('--min-ms', type=float, default=0.05,
+                        help='Ignore slowdowns smaller than this many ms (default: 0.05)')
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current) as f:
+            report = json.load(f)
+    else:
+        report = run_suite(args.sizes, args.seed, args.repeat)
+        print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(baseline, report, args.threshold, args.min_ms)
+        if regressions:
+            print(f"\n✗ {len(regressions)} path(s) regressed by more than "
+                  f"{args.threshold:.0%}")
+            return 1
+        print(f"\n✓ No path regressed by more than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,19 +6,116 @@ AI-powered study planner with task management and intelligent recommendations
 
 import sys
 import os
-from datetime import datetime
-from src.task_manager import TaskManager
-from src.study_tracker import StudyTracker
-from src.recommender import StudyRecommender
-from src.utils import clear_screen, print_banner, get_user_input
+import json
+import signal
+import argparse
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from src.instrument import DEFAULT_DUMP
+from src.utils import clear_screen, print_banner, get_user_input, parse_due_date
+
+# Components are imported and loaded on first use: a command that only touches
+# tasks never imports the tracker or parses the session history.
+
+def open_task_manager(**options):
+    """Create and load the task manager (close it to save what the command changed)"""
+    from src.task_manager import TaskManager
+    return TaskManager(**options)
+
+def open_study_tracker(**options):
+    """Create and load the study tracker"""
+    from src.study_tracker import StudyTracker
+    return StudyTracker(**options)
+
+def open_review_queue():
+    """Load the spaced-repetition review queue"""
+    from src.review_queue import ReviewQueue
+    return ReviewQueue()
+
+def open_recommender(study_tracker, review_queue=None):
+    """Create the recommender for a study tracker"""
+    from src.recommender import StudyRecommender
+    return StudyRecommender(study_tracker, review_queue)
+
+def time_session(study_tracker, subject, duration, work_minutes=25, break_minutes=5,
+                 stream=sys.stdout):
+    """Run a Pomodoro timer in the terminal and record the time actually studied.
+
+    Typing p + Enter pauses or resumes, q + Enter (or Ctrl+C) stops early.
+    Returns the recorded session, or None if less than a minute was studied.
+    """
+    import asyncio
+    from src.timer import ProgressDisplay, SessionEngine
+
+    async def timed():
+        engine = SessionEngine(study_tracker)
+        session_id = engine.start(subject, duration, work_minutes, break_minutes)
+        loop = asyncio.get_running_loop()
+
+        def on_input():
+            command = sys.stdin.readline()
+            if not command:
+                loop.remove_reader(sys.stdin)
+            elif command.strip().lower() == 'p':
+                engine.pause(session_id) or engine.resume(session_id)
+            elif command.strip().lower() == 'q':
+                engine.abort(session_id)
+
+        # Keyboard controls need a selectable stdin and Unix signal support
+        controls = []
+        for install, remove in ((lambda: loop.add_reader(sys.stdin, on_input),
+                                 lambda: loop.remove_reader(sys.stdin)),
+                                (lambda: loop.add_signal_handler(signal.SIGINT, engine.abort_all),
+                                 lambda: loop.remove_signal_handler(signal.SIGINT))):
+            try:
+                install()
+                controls.append(remove)
+            except (NotImplementedError, OSError, ValueError, RuntimeError):
+                pass
+        try:
+            await asyncio.gather(ProgressDisplay(engine, stream).run(), engine.wait())
+        finally:
+            for remove in controls:
+                remove()
+        return engine.recorded[0] if engine.recorded else None
+
+    print(f"Timing {subject} for {duration} minutes "
+          f"({work_minutes}-minute blocks, {break_minutes}-minute breaks).", file=stream)
+    print("Enter p to pause or resume, q to stop early.\n", file=stream)
+    return asyncio.run(timed())
 
 class SmartStudyPlanner:
-    def __init__(self):
-        self.task_manager = TaskManager()
-        self.study_tracker = StudyTracker()
-        self.recommender = StudyRecommender(self.study_tracker)
+    def __init__(self, autosave_interval=2.0, max_pending=100):
+        self._task_manager = None
+        self._study_tracker = None
+        self._recommender = None
+        # Changes are written behind: at most max_pending of them, or
+        # autosave_interval seconds' worth, are unsaved at any time
+        self.write_options = {
+            'write_behind': True,
+            'max_delay': autosave_interval,
+            'max_pending': max_pending,
+        }
         self.running = True
 
+    @property
+    def task_manager(self):
+        if self._task_manager is None:
+            self._task_manager = open_task_manager(**self.write_options)
+        return self._task_manager
+
+    @property
+    def study_tracker(self):
+        if self._study_tracker is None:
+            self._study_tracker = open_study_tracker(**self.write_options)
+        return self._study_tracker
+
+    @property
+    def recommender(self):
+        if self._recommender is None:
+            self._recommender = open_recommender(self.study_tracker)
+        return self._recommender
+
     def display_menu(self):
         """Display the main menu"""
         print("\n" + "="*50)
@@ -51,7 +148,13 @@ class SmartStudyPlanner:
         priority_map = {"1": "High", "2": "Medium", "3": "Low"}
         priority = priority_map.get(priority_choice, "Medium")
         
-        due_date = get_user_input("Enter due date (YYYY-MM-DD) or press Enter to skip: ")
+        while True:
+            due_date = get_user_input("Enter due date (YYYY-MM-DD) or press Enter to skip: ")
+            try:
+                due_date = parse_due_date(due_date)
+                break
+            except ValueError:
+                print("✗ Invalid date. Please use YYYY-MM-DD.")
         
         task_id = self.task_manager.add_task(title, description, priority, due_date)
         print(f"\n✓ Task added successfully! (ID: {task_id})")
@@ -60,8 +163,9 @@ class SmartStudyPlanner:
     def view_tasks(self):
         """Display all tasks"""
         clear_screen()
-        print("\n--- All Tasks ---")
-        tasks = self.task_manager.get_all_tasks()
+        print("\n--- All Tasks (most urgent first) ---")
+        tasks = self.task_manager.get_tasks_by_urgency()
+        today = date.today().isoformat()
         
         if not tasks:
             print("No tasks found. Add some tasks to get started!")
@@ -72,7 +176,10 @@ class SmartStudyPlanner:
                 print(f"Title: {task['title']}")
                 print(f"Priority: {task['priority']}")
                 print(f"Status: {status}")
-                print(f"Due Date: {task['due_date'] or 'Not set'}")
+                overdue = (not task['completed'] and task['due_date']
+                           and task['due_date'] < today)
+                print(f"Due Date: {task['due_date'] or 'Not set'}"
+                      f"{' (overdue)' if overdue else ''}")
                 print("-" * 40)
         
         input("\nPress Enter to continue...")
@@ -99,12 +206,23 @@ class SmartStudyPlanner:
         
         try:
             duration = int(get_user_input("Enter planned duration (minutes): "))
+            if duration <= 0:
+                raise ValueError(duration)
             
-            print(f"\n✓ Study session started for {subject}!")
-            print(f"Duration: {duration} minutes")
-            print("\nGood luck with your studies!")
-            
-            self.study_tracker.start_session(subject, duration)
+            if get_user_input("Run a Pomodoro timer now? (y/n): ").lower().startswith('y'):
+                print()
+                session = time_session(self.study_tracker, subject, duration)
+                if session is None:
+                    print("\nSession stopped before a minute was studied; nothing recorded.")
+                else:
+                    print(f"\n✓ Recorded {session['actual_duration']} of {duration} "
+                          f"minutes of {subject}!")
+            else:
+                print(f"\n✓ Study session started for {subject}!")
+                print(f"Duration: {duration} minutes")
+                print("\nGood luck with your studies!")
+                
+                self.study_tracker.start_session(subject, duration)
             
         except ValueError:
             print("\n✗ Invalid duration entered!")
@@ -168,8 +286,24 @@ class SmartStudyPlanner:
         
         input("\nPress Enter to continue...")
 
+    def close(self):
+        """Write pending changes and release storage"""
+        if self._task_manager is not None:
+            self._task_manager.close()
+        if self._study_tracker is not None:
+            self._study_tracker.close()
+
     def run(self):
-        """Main application loop"""
+        """Main application loop; pending changes are saved however it ends"""
+        # Turn SIGTERM into SystemExit so the finally block below still runs
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        try:
+            self._loop()
+        finally:
+            self.close()
+
+    def _loop(self):
+        """Show the menu until the user exits"""
         while self.running:
             clear_screen()
             print_banner()
@@ -201,7 +335,626 @@ class SmartStudyPlanner:
                 print("\n✗ Invalid choice! Please try again.")
                 input("Press Enter to continue...")
 
-if __name__ == "__main__":
+def run_import(args):
+    """Bulk import tasks or sessions from a file"""
+    from src import bulk
+    
+    if args.kind == 'tasks':
+        with closing(open_task_manager()) as manager:
+            result = bulk.import_tasks(manager, args.path, args.format, args.batch_size)
+    else:
+        with closing(open_study_tracker()) as tracker:
+            result = bulk.import_sessions(tracker, args.path, args.format, args.batch_size)
+    
+    for number, reason in result['rejected']:
+        print(f"✗ Record {number} rejected: {reason}")
+    print(f"✓ Imported {result['imported']} {args.kind} in {result['seconds']:.2f}s "
+          f"({result['records_per_second']:.0f} records/s), "
+          f"{len(result['rejected'])} rejected")
+    return 1 if result['rejected'] else 0
+
+def run_export(args):
+    """Export tasks or sessions to a file"""
+    from src import bulk
+    
+    if args.kind == 'tasks':
+        with closing(open_task_manager()) as manager:
+            count = bulk.export_tasks(manager, args.path, args.format)
+    else:
+        with closing(open_study_tracker()) as tracker:
+            count = bulk.export_sessions(tracker, args.path, args.format)
+    print(f"✓ Exported {count} {args.kind} to {args.path}")
+    return 0
+
+def emit(args, data, text):
+    """Print data as JSON with --json, otherwise as human-readable text"""
+    if args.json:
+        print(json.dumps(data, indent=2, default=dict))
+    else:
+        print(text)
+
+def format_task(task):
+    """One-line summary of a task"""
+    status = "✓" if task['completed'] else "○"
+    return (f"{status} [{task['id']}] {task['title']} "
+            f"({task['priority']}, due {task['due_date'] or 'not set'})")
+
+def run_task_add(args):
+    """Add a task"""
+    try:
+        due_date = parse_due_date(args.due)
+    except ValueError:
+        print(f"✗ Invalid due date '{args.due}' (expected YYYY-MM-DD)", file=sys.stderr)
+        return 2
+    with closing(open_task_manager()) as manager:
+        task_id = manager.add_task(args.title, args.description, args.priority, due_date)
+        emit(args, manager.get_task_by_id(task_id), f"✓ Task added (ID: {task_id})")
+    return 0
+
+def run_task_list(args):
+    """List tasks"""
+    with closing(open_task_manager()) as manager:
+        if args.high:
+            tasks = manager.get_priority_tasks()
+        elif args.sort == 'urgency':
+            tasks = manager.get_tasks_by_urgency()
+        else:
+            tasks = manager.get_all_tasks()
+    if args.pending:
+        tasks = [t for t in tasks if not t['completed']]
+    emit(args, tasks, "\n".join(format_task(t) for t in tasks) or "No tasks found.")
+    return 0
+
+def run_task_complete(args):
+    """Mark a task as completed"""
+    with closing(open_task_manager()) as manager:
+        done = manager.complete_task(args.task_id)
+    emit(args, {'id': args.task_id, 'completed': done},
+         "✓ Task marked as completed!" if done else "✗ Task not found!")
+    return 0 if done else 1
+
+def run_task_delete(args):
+    """Delete a task"""
+    with closing(open_task_manager()) as manager:
+        deleted = manager.delete_task(args.task_id)
+    emit(args, {'id': args.task_id, 'deleted': deleted},
+         "✓ Task deleted successfully!" if deleted else "✗ Task not found!")
+    return 0 if deleted else 1
+
+def due_label(due_date, today):
+    """How far off a due date is, relative to ``today``"""
+    days = (date.fromisoformat(due_date) - today).days
+    if days < 0:
+        return f"overdue since {due_date}"
+    if days == 0:
+        return "due today"
+    if days == 1:
+        return "due tomorrow"
+    return f"due in {days} days ({due_date})"
+
+def run_task_due(args):
+    """Show overdue tasks, tasks due soon and the next deadline"""
+    today = date.today()
+    with closing(open_task_manager()) as manager:
+        overdue = manager.get_overdue(today)
+        upcoming = manager.get_due_within(args.days, today)
+        following = manager.next_deadline(today + timedelta(days=args.days + 1))
+    
+    lines = [f"Overdue ({len(overdue)}):"]
+    lines += [f"  {format_task(t)}" for t in overdue] or ["  none"]
+    lines.append(f"Due in the next {args.days} days ({len(upcoming)}):")
+    lines += [f"  {format_task(t)} - {due_label(t['due_date'], today)}"
+              for t in upcoming] or ["  none"]
+    if following is not None:
+        lines.append(f"After that: {following['title']} [{following['id']}], "
+                     f"{due_label(following['due_date'], today)}")
+    emit(args, {'overdue': overdue, 'due_soon': upcoming,
+                'next_deadline': upcoming[0] if upcoming else following},
+         "\n".join(lines))
+    return 0
+
+def run_task_remind(args):
+    """Print a reminder as each task's deadline comes within the lead time"""
+    import asyncio
+    from src.reminders import DeadlineReminders
+    manager = open_task_manager()
+    
+    def remind(task):
+        print(f"⏰ {task['title']} [{task['id']}] ({task['priority']}) is "
+              f"{due_label(task['due_date'], date.today())}", flush=True)
+    
+    async def watch():
+        reminders = DeadlineReminders(manager, remind, timedelta(hours=args.lead_hours),
+                                      follow=True)
+        reminders.start()
+        try:
+            if args.once:
+                return
+            upcoming = reminders.next_reminder()
+            print(f"Watching deadlines ({args.lead_hours:g} hours' notice); next reminder "
+                  f"{upcoming:%Y-%m-%d %H:%M}." if upcoming else
+                  "Watching deadlines; no upcoming ones yet.", flush=True)
+            await asyncio.Event().wait()
+        finally:
+            reminders.stop()
+    
+    try:
+        asyncio.run(watch())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.close()
+    return 0
+
+def run_task_search(args):
+    """Search task titles and descriptions"""
+    with closing(open_task_manager()) as manager:
+        tasks = manager.search(args.query, args.limit)
+    emit(args, tasks, "\n".join(format_task(t) for t in tasks) or "No matching tasks.")
+    return 0
+
+def run_session_search(args):
+    """Search sessions by subject"""
+    with closing(open_study_tracker()) as tracker:
+        sessions = tracker.search(args.query, args.limit)
+    emit(args, sessions, "\n".join(
+        f"{s['start_time'][:16].replace('T', ' ')}  {s['subject']} ({s['actual_duration']} min)"
+        for s in sessions) or "No matching sessions.")
+    return 0
+
+def run_session_start(args):
+    """Record a study session"""
+    if args.duration <= 0:
+        print("✗ Duration must be a positive number of minutes", file=sys.stderr)
+        return 2
+    with closing(open_study_tracker()) as tracker:
+        session = tracker.start_session(args.subject, args.duration)
+    emit(args, session,
+         f"✓ Study session recorded for {args.subject} ({args.duration} minutes)")
+    return 0
+
+def run_session_timer(args):
+    """Time a study session with a Pomodoro timer"""
+    if args.duration <= 0 or args.work <= 0 or args.break_minutes < 0:
+        print("✗ Durations must be positive numbers of minutes", file=sys.stderr)
+        return 2
+    # With --json the live progress goes to stderr, keeping stdout parseable
+    with closing(open_study_tracker()) as tracker:
+        session = time_session(tracker, args.subject, args.duration,
+                               args.work, args.break_minutes,
+                               sys.stderr if args.json else sys.stdout)
+    if session is None:
+        emit(args, None, "Stopped before a minute was studied; nothing recorded.")
+        return 1
+    emit(args, session,
+         f"✓ Recorded {session['actual_duration']} of {args.duration} minutes of {args.subject}")
+    return 0
+
+def run_stats(args):
+    """Show task and study statistics"""
+    with closing(open_task_manager()) as manager, closing(open_study_tracker()) as tracker:
+        data = {
+            'tasks': manager.get_statistics(),
+            'study': tracker.get_statistics(),
+        }
+    tasks, study = data['tasks'], data['study']
+    lines = [
+        f"Tasks: {tasks['total']} total, {tasks['completed']} completed, "
+        f"{tasks['pending']} pending ({tasks['completion_rate']:.0f}% done)",
+        f"Total Study Sessions: {study['total_sessions']}",
+        f"Total Study Time: {study['total_hours']:.2f} hours",
+        f"Average Session Duration: {study['avg_duration']:.2f} minutes",
+        f"Most Studied Subject: {study['most_studied_subject']}",
+    ]
+    if args.perf:
+        # Everything dumped so far plus what this command has done
+        from src.instrument import Metrics, format_report, load_dump, metrics
+        perf_file = args.perf_dump or DEFAULT_DUMP
+        combined = Metrics()
+        combined.merge(load_dump(perf_file))
+        combined.merge(metrics.snapshot())
+        data['performance'] = combined.snapshot()
+        lines += ["", f"Performance ({perf_file} + this command):",
+                  format_report(data['performance'])]
+    emit(args, data, "\n".join(lines))
+    return 0
+
+def run_analytics(args):
+    """Show streaks, rolling averages, busiest hours and subject trends"""
+    with closing(open_study_tracker()) as tracker:
+        report = tracker.get_analytics().report()
+    if args.json:
+        emit(args, report, '')
+        return 0
+    
+    streaks = report['streaks']
+    lines = [
+        f"Study days: {report['study_days']}",
+        f"Current streak: {streaks['current']} days",
+        f"Longest streak: {streaks['longest']} days"
+        + (f" ({streaks['longest_start']} to {streaks['longest_end']})" if streaks['longest'] else ""),
+    ]
+    for label, key in (("7-day", 'rolling_7_day'), ("30-day", 'rolling_30_day')):
+        if report[key]:
+            day, average = report[key][-1]
+            lines.append(f"{label} average as of {day}: {average:.1f} minutes/day")
+    
+    weekdays = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    cells = [(minutes, weekday, hour) for weekday, row in enumerate(report['hour_heatmap'])
+             for hour, minutes in enumerate(row) if minutes]
+    if cells:
+        lines.append("Busiest hours: " + ", ".join(
+            f"{weekdays[weekday]} {hour:02d}:00 ({minutes:.0f} min)"
+            for minutes, weekday, hour in sorted(cells, reverse=True)[:3]))
+    for subject, trend in report['subject_trends'].items():
+        lines.append(f"{subject}: {trend['recent_minutes']:.0f} min in the last 30 days "
+                     f"({trend['change']:+.0f} vs the 30 days before)")
+    print("\n".join(lines))
+    return 0
+
+def run_recommend(args):
+    """Show study recommendations"""
+    with closing(open_study_tracker()) as tracker:
+        recommendations = open_recommender(tracker).get_recommendations()
+    emit(args, recommendations,
+         "\n".join(f"{i}. {rec}" for i, rec in enumerate(recommendations, 1)))
+    return 0
+
+def run_plan(args):
+    """Show a deadline-aware day-by-day study plan for pending tasks"""
+    from src.scheduler import StudyScheduler
+    
+    options = {'daily_minutes': args.daily_minutes}
+    if args.session_minutes:
+        options['session_minutes'] = args.session_minutes
+    with closing(open_task_manager()) as manager:
+        if args.session_minutes:
+            scheduler = StudyScheduler.from_manager(manager, **options)
+        else:
+            with closing(open_study_tracker()) as tracker:
+                scheduler = StudyScheduler.from_manager(manager, open_recommender(tracker),
+                                                        **options)
+    calendar = scheduler.calendar(args.days)
+    infeasible = scheduler.infeasible()
+    
+    lines = []
+    for day in calendar:
+        if day['sessions']:
+            lines.append(f"{day['date']}:")
+            lines.extend(f"  {s['minutes']:>3} min  {s['title']} [{s['task_id']}]"
+                         for s in day['sessions'])
+    for plan in infeasible:
+        lines.append(f"⚠ {plan['title']} [{plan['task_id']}] can't be finished by "
+                     f"{plan['due_date']} ({plan['missing_minutes']} minutes short)")
+    emit(args, {'summary': scheduler.summary(), 'calendar': calendar, 'infeasible': infeasible},
+         "\n".join(lines) or "No pending tasks to plan.")
+    return 0
+
+def format_review(item):
+    """One-line summary of a review item"""
+    last = item['last_review'] or 'never'
+    return (f"{item['name']}: due {item['due'].replace('T', ' ')} "
+            f"(interval {item['interval']}d, ease {item['ease']:.2f}, last reviewed {last})")
+
+def run_review_list(args):
+    """List review items that are due (or all upcoming ones)"""
+    queue = open_review_queue()
+    with closing(open_study_tracker()) as tracker:
+        queue.add_many(tracker.get_subject_breakdown())
+    items = queue.upcoming(args.limit) if args.all else queue.due(limit=args.limit)
+    emit(args, items, "\n".join(format_review(i) for i in items) or "Nothing is due for review.")
+    return 0
+
+def run_review_done(args):
+    """Record a review of a subject"""
+    if not 0 <= args.quality <= 5:
+        print("✗ Quality must be from 0 (forgot) to 5 (perfect recall)", file=sys.stderr)
+        return 2
+    item = open_review_queue().review(args.subject, args.quality)
+    emit(args, item, f"✓ Reviewed {item['name']}; next review {item['due'].replace('T', ' ')}")
+    return 0
+
+def run_review_next(args):
+    """Suggest the subject to study next, most overdue review first"""
+    with closing(open_study_tracker()) as tracker:
+        subject = open_recommender(tracker, open_review_queue()).get_suggested_next_subject()
+    emit(args, {'subject': subject},
+         f"Next up: {subject}" if subject else "No subjects yet. Record a study session first.")
+    return 0
+
+def format_change(event):
+    """One-line summary of a change feed event"""
+    record = event.get('task') or event.get('session') or {}
+    what = (f"{record['title']} [{record['id']}]" if 'task' in event
+            else f"{record.get('subject')} ({record.get('actual_duration')} min)")
+    return f"#{event['seq']} {event['at'].replace('T', ' ')[:19]} {event['type']}: {what}"
+
+def run_changes(args):
+    """List task and session changes after a sequence number"""
+    from src.changefeed import ChangeFeed, feed_dir
+    feed = ChangeFeed(feed_dir('data/tasks.json'))
+    try:
+        events = feed.changes_since(args.since, args.type, args.limit)
+    except ValueError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    emit(args, events, "\n".join(format_change(e) for e in events) or
+         f"No changes after #{args.since}.")
+    return 0
+
+def run_cohort(args):
+    """Aggregate study statistics across every user's history under --data-dir"""
+    from src.cohort import cohort_report
+    report = cohort_report(args.data_dir, args.storage, args.workers, args.chunk_size)
+    study = report['statistics']
+    lines = [
+        f"Users: {report['users']} ({report['active_users']} with study sessions)",
+        f"Total Study Sessions: {study['total_sessions']}",
+        f"Total Study Time: {study['total_hours']:.2f} hours",
+        f"Average Session Duration: {study['avg_duration']:.2f} minutes",
+        f"Most Studied Subject: {study['most_studied_subject']}",
+    ]
+    top = list(report['subject_breakdown'].items())[:args.top]
+    if top:
+        lines.append("Top subjects:")
+        lines.extend(f"  {subject}: {minutes / 60:.1f} hours over "
+                     f"{report['subject_sessions'][subject]} sessions by "
+                     f"{report['subject_users'][subject]} users" for subject, minutes in top)
+    emit(args, report, "\n".join(lines))
+    return 0
+
+def run_serve(args):
+    """Run the multi-user HTTP API"""
+    from src.server import serve
+    # SIGTERM shuts down like Ctrl+C, so users' data and --perf-dump get saved
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    serve(args.host, args.port, args.data_dir, args.pool_size, args.storage,
+          verbose=not args.quiet)
+    return 0
+
+def build_parser():
+    """Build the command line parser"""
+    # No abbreviations: they would make 'stats --perf' ambiguous with --perf-dump
+    parser = argparse.ArgumentParser(
+        description="Smart Study Planner. Run without a command for the interactive menu.",
+        allow_abbrev=False
+    )
+    parser.add_argument('--autosave-interval', type=float, default=2.0, metavar='SECONDS',
+                        help='Interactive menu: longest time a change stays unsaved '
+                             '(default: 2.0)')
+    parser.add_argument('--max-pending', type=int, default=100, metavar='N',
+                        help='Interactive menu: save once this many changes are '
+                             'pending (default: 100)')
+    parser.add_argument('--perf-dump', default=os.environ.get('PLANNER_PERF_DUMP'),
+                        metavar='PATH',
+                        help='Merge operation timings into this JSON file periodically '
+                             f'and at exit, e.g. {DEFAULT_DUMP} (default: '
+                             '$PLANNER_PERF_DUMP)')
+    parser.add_argument('--perf-interval', type=float, default=60.0, metavar='SECONDS',
+                        help='Seconds between --perf-dump writes (default: 60)')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='Run the command under cProfile, save the stats to PATH '
+                             'and print the top functions to stderr')
+    subparsers = parser.add_subparsers(dest='command')
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    
+    task_parser = subparsers.add_parser('task', help='Manage tasks')
+    task_commands = task_parser.add_subparsers(dest='task_command', required=True)
+    
+    add_parser = task_commands.add_parser('add', parents=[output], help='Add a task')
+    add_parser.add_argument('title')
+    add_parser.add_argument('--description', default='')
+    add_parser.add_argument('--priority', choices=['High', 'Medium', 'Low'], default='Medium')
+    add_parser.add_argument('--due', help='Due date (YYYY-MM-DD)')
+    add_parser.set_defaults(handler=run_task_add)
+    
+    list_parser = task_commands.add_parser('list', parents=[output], help='List tasks')
+    list_parser.add_argument('--high', action='store_true',
+                             help='Only pending high priority tasks')
+    list_parser.add_argument('--pending', action='store_true',
+                             help='Hide completed tasks')
+    list_parser.add_argument('--sort', choices=['priority', 'urgency'], default='priority',
+                             help='priority: by status and priority (default); urgency: '
+                                  'pending tasks by due date, overdue first')
+    list_parser.set_defaults(handler=run_task_list)
+    
+    due_parser = task_commands.add_parser('due', parents=[output],
+                                          help='Show overdue tasks and upcoming deadlines')
+    due_parser.add_argument('--days', type=int, default=7,
+                            help='How many days ahead to look (default: 7)')
+    due_parser.set_defaults(handler=run_task_due)
+    
+    remind_parser = task_commands.add_parser(
+        'remind', help='Print reminders as task deadlines approach (until Ctrl+C)'
+    )
+    remind_parser.add_argument('--lead-hours', type=float, default=24,
+                               help='Remind this long before the end of the due date '
+                                    '(default: 24)')
+    remind_parser.add_argument('--once', action='store_true',
+                               help='Print the reminders already due and exit')
+    remind_parser.set_defaults(handler=run_task_remind)
+    
+    complete_parser = task_commands.add_parser('complete', parents=[output],
+                                               help='Mark a task as completed')
+    complete_parser.add_argument('task_id')
+    complete_parser.set_defaults(handler=run_task_complete)
+    
+    delete_parser = task_commands.add_parser('delete', parents=[output], help='Delete a task')
+    delete_parser.add_argument('task_id')
+    delete_parser.set_defaults(handler=run_task_delete)
+    
+    search_parser = task_commands.add_parser('search', parents=[output],
+                                             help='Search task titles and descriptions')
+    search_parser.add_argument('query', help='Words to match (prefixes, any case)')
+    search_parser.add_argument('--limit', type=int)
+    search_parser.set_defaults(handler=run_task_search)
+    
+    session_parser = subparsers.add_parser('session', help='Record study sessions')
+    session_commands = session_parser.add_subparsers(dest='session_command', required=True)
+    start_parser = session_commands.add_parser('start', parents=[output],
+                                               help='Record a study session')
+    start_parser.add_argument('subject')
+    start_parser.add_argument('duration', type=int, help='Duration in minutes')
+    start_parser.set_defaults(handler=run_session_start)
+    timer_parser = session_commands.add_parser('timer', parents=[output],
+                                               help='Time a session with a Pomodoro timer')
+    timer_parser.add_argument('subject')
+    timer_parser.add_argument('duration', type=int, help='Minutes of study planned')
+    timer_parser.add_argument('--work', type=int, default=25,
+                              help='Minutes per work block (default: 25)')
+    timer_parser.add_argument('--break', dest='break_minutes', type=int, default=5,
+                              help='Minutes per break (default: 5)')
+    timer_parser.set_defaults(handler=run_session_timer)
+    session_search_parser = session_commands.add_parser('search', parents=[output],
+                                                        help='Search sessions by subject')
+    session_search_parser.add_argument('query', help='Words to match (prefixes, any case)')
+    session_search_parser.add_argument('--limit', type=int)
+    session_search_parser.set_defaults(handler=run_session_search)
+    
+    stats_parser = subparsers.add_parser('stats', parents=[output],
+                                         help='Show task and study statistics')
+    stats_parser.add_argument('--perf', action='store_true',
+                              help='Also show call counts, latency percentiles and I/O '
+                                   'per operation')
+    stats_parser.set_defaults(handler=run_stats)
+    
+    analytics_parser = subparsers.add_parser(
+        'analytics', parents=[output],
+        help='Show streaks, rolling averages, busiest hours and subject trends'
+    )
+    analytics_parser.set_defaults(handler=run_analytics)
+    
+    recommend_parser = subparsers.add_parser('recommend', parents=[output],
+                                             help='Show study recommendations')
+    recommend_parser.set_defaults(handler=run_recommend)
+    
+    plan_parser = subparsers.add_parser('plan', parents=[output],
+                                        help='Show a day-by-day study plan for pending tasks')
+    plan_parser.add_argument('--days', type=int, default=14,
+                             help='Number of days to show (default: 14)')
+    plan_parser.add_argument('--daily-minutes', type=int, default=120,
+                             help='Study minutes available per day (default: 120)')
+    plan_parser.add_argument('--session-minutes', type=int,
+                             help='Session length (default: the recommended study time)')
+    plan_parser.set_defaults(handler=run_plan)
+    
+    review_parser = subparsers.add_parser('review', help='Spaced-repetition reviews')
+    review_commands = review_parser.add_subparsers(dest='review_command', required=True)
+    review_list_parser = review_commands.add_parser('list', parents=[output],
+                                                    help='List subjects due for review')
+    review_list_parser.add_argument('--all', action='store_true',
+                                    help='Show upcoming reviews too, not only due ones')
+    review_list_parser.add_argument('--limit', type=int, default=20)
+    review_list_parser.set_defaults(handler=run_review_list)
+    
+    review_done_parser = review_commands.add_parser('done', parents=[output],
+                                                    help='Record a review')
+    review_done_parser.add_argument('subject')
+    review_done_parser.add_argument('quality', type=int,
+                                    help='Recall from 0 (forgot) to 5 (perfect)')
+    review_done_parser.set_defaults(handler=run_review_done)
+    
+    review_next_parser = review_commands.add_parser('next', parents=[output],
+                                                    help='Suggest the subject to study next')
+    review_next_parser.set_defaults(handler=run_review_next)
+    
+    import_parser = subparsers.add_parser(
+        'import', help='Bulk import tasks or sessions from CSV / JSON lines'
+    )
+    import_parser.add_argument('kind', choices=['tasks', 'sessions'])
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=['csv', 'jsonl', 'json'],
+                               help='Input format (default: from file extension)')
+    import_parser.add_argument('--batch-size', type=int, default=1000,
+                               help='Records per storage write (default: 1000)')
+    import_parser.set_defaults(handler=run_import)
+    
+    export_parser = subparsers.add_parser(
+        'export', help='Export tasks or sessions to CSV / JSON lines'
+    )
+    export_parser.add_argument('kind', choices=['tasks', 'sessions'])
+    export_parser.add_argument('path')
+    export_parser.add_argument('--format', choices=['csv', 'jsonl', 'json'],
+                               help='Output format (default: from file extension)')
+    export_parser.set_defaults(handler=run_export)
+    
+    changes_parser = subparsers.add_parser('changes', parents=[output],
+                                           help='List task and session changes in order')
+    changes_parser.add_argument('--since', type=int, default=0, metavar='SEQ',
+                                help='Only changes after this sequence number (default: 0)')
+    changes_parser.add_argument('--type', nargs='+',
+                                choices=['task_added', 'task_completed', 'task_deleted',
+                                         'session_recorded'],
+                                help='Only these event types')
+    changes_parser.add_argument('--limit', type=int, help='Show at most this many')
+    changes_parser.set_defaults(handler=run_changes)
+    
+    cohort_parser = subparsers.add_parser(
+        'cohort', parents=[output],
+        help="Aggregate study statistics across every user's history"
+    )
+    cohort_parser.add_argument('--data-dir', default='data/users',
+                               help='Directory holding one sub-directory per user')
+    cohort_parser.add_argument('--storage', choices=['json', 'log', 'binary', 'sqlite', 'partitioned'],
+                               default='json', help='Session storage backend')
+    cohort_parser.add_argument('--workers', type=int,
+                               help='Processes parsing histories (default: one per CPU; '
+                                    '1 runs serially)')
+    cohort_parser.add_argument('--chunk-size', type=int, default=16,
+                               help='Users handed to a worker at a time (default: 16)')
+    cohort_parser.add_argument('--top', type=int, default=10,
+                               help='Subjects to list (default: 10)')
+    cohort_parser.set_defaults(handler=run_cohort)
+    
+    serve_parser = subparsers.add_parser('serve', help='Run the multi-user JSON HTTP API')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--data-dir', default='data/users',
+                              help='Directory holding one sub-directory per user')
+    serve_parser.add_argument('--pool-size', type=int, default=128,
+                              help='Maximum number of users kept loaded in memory')
+    serve_parser.add_argument('--storage', choices=['json', 'log', 'binary', 'sqlite', 'partitioned'],
+                              default='json', help='Session storage backend')
+    serve_parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    serve_parser.set_defaults(handler=run_serve)
+    
+    return parser
+
+def run_command(args):
+    """Run a command's handler, timed as cli.<command>, under cProfile with --profile"""
+    from src.instrument import measure
+    subcommand = getattr(args, f"{args.command}_command", None)
+    name = f"cli.{args.command}" + (f".{subcommand}" if subcommand else "")
+    with measure(name):
+        if not args.profile:
+            return args.handler(args)
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(args.handler, args)
+        finally:
+            profiler.dump_stats(args.profile)
+            print(f"\nProfile saved to {args.profile}", file=sys.stderr)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(15)
+
+def main(argv=None):
+    """Run a command, or the interactive menu when none is given"""
+    args = build_parser().parse_args(argv)
+    if args.perf_dump:
+        from src.instrument import PeriodicDump
+        PeriodicDump(args.perf_dump, args.perf_interval).start()
+    if args.command:
+        return run_command(args)
+    if args.profile:
+        print("✗ --profile needs a command", file=sys.stderr)
+        return 2
+    
     print("\nInitializing Smart Study Planner...")
-    app = SmartStudyPlanner()
+    app = SmartStudyPlanner(args.autosave_interval, args.max_pending)
     app.run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,22 @@ Smart Study Planner Package
 Makes the src directory a Python package
 """
 
-from .task_manager import TaskManager
-from .study_tracker import StudyTracker
-from .recommender import StudyRecommender
+from importlib import import_module
 from .utils import *
 
+# Components are imported on first access so that a CLI command only pays
+# for the modules it actually uses
+_LAZY_EXPORTS = {
+    'TaskManager': '.task_manager',
+    'StudyTracker': '.study_tracker',
+    'StudyRecommender': '.recommender',
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __version__ = '1.0.0'
 __author__ = 'Smart Study Planner Team'
 __all__ = ['TaskManager', 'StudyTracker', 'StudyRecommender']
@@ -0,0 +1,108 @@
+"""
+Aggregates Module
+Running totals over study sessions, kept up to date on every insert
+"""
+
+
+class SessionAggregates:
+    """Total minutes, session count and per-subject minutes/counts.
+
+    Subjects are kept in order of first appearance so that ties resolve the
+    same way a full recompute with Counter/sorted would resolve them.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear all totals"""
+        self.session_count = 0
+        self.total_minutes = 0
+        self.subject_minutes = {}
+        self.subject_counts = {}
+        self._order = {}
+        self._top_subject = None
+
+    def add(self, session):
+        """Fold one session into the totals"""
+        self.add_subject(session['subject'], session['actual_duration'], 1)
+
+    def add_subject(self, subject, minutes, count):
+        """Fold pre-summed minutes and a session count for one subject"""
+        if subject not in self._order:
+            self._order[subject] = len(self._order)
+            self.subject_minutes[subject] = 0
+            self.subject_counts[subject] = 0
+
+        self.session_count += count
+        self.total_minutes += minutes
+        self.subject_minutes[subject] += minutes
+        self.subject_counts[subject] += count
+
+        top = self._top_subject
+        if top is None or self._ranks_above(subject, top):
+            self._top_subject = subject
+
+    def _ranks_above(self, subject, other):
+        """Whether subject beats other as the most studied subject"""
+        count, other_count = self.subject_counts[subject], self.subject_counts[other]
+        return count > other_count or (
+            count == other_count and self._order[subject] < self._order[other]
+        )
+
+    def rebuild(self, sessions):
+        """Recompute everything from an iterable of sessions.
+
+        Columnar session stores provide ``subject_totals()``, which sums their
+        columns (or reads totals saved with a binary file) without building a
+        dict per session.
+        """
+        self.reset()
+        subject_totals = getattr(sessions, 'subject_totals', None)
+        if subject_totals is not None:
+            for subject, minutes, count in subject_totals():
+                self.add_subject(subject, minutes, count)
+            return
+        for session in sessions:
+            self.add(session)
+
+    def statistics(self):
+        """Statistics in the shape returned by StudyTracker.get_statistics"""
+        if self.session_count == 0:
+            return {
+                'total_sessions': 0,
+                'total_hours': 0,
+                'avg_duration': 0,
+                'most_studied_subject': 'None'
+            }
+
+        return {
+            'total_sessions': self.session_count,
+            'total_hours': self.total_minutes / 60,
+            'avg_duration': self.total_minutes / self.session_count,
+            'most_studied_subject': self._top_subject
+        }
+
+    def breakdown(self):
+        """Minutes per subject, most studied first"""
+        return dict(sorted(self.subject_minutes.items(),
+                           key=lambda x: x[1],
+                           reverse=True))
+
+    def snapshot(self):
+        """Comparable view of the totals"""
+        return (self.session_count, self.total_minutes,
+                dict(self.subject_minutes), dict(self.subject_counts),
+                self._top_subject)
+
+    def verify(self, sessions):
+        """Check the running totals against a full recompute"""
+        expected = SessionAggregates()
+        for session in sessions:
+            expected.add(session)
+        if expected.snapshot() != self.snapshot():
+            raise ValueError(
+                f"Session aggregates out of sync: expected {expected.snapshot()}, "
+                f"have {self.snapshot()}"
+            )
+        return True
@@ -0,0 +1,286 @@
+"""
+Analytics Module
+Daily and weekly totals, rolling averages, streaks, heatmaps and subject trends
+"""
+
+from array import array
+from datetime import date, datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # optional: every metric has a pure-Python fallback
+    np = None
+
+EPOCH = date(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+EPOCH_WEEKDAY = EPOCH.weekday()  # 1970-01-01 was a Thursday
+DAY_SECONDS = 86400
+
+
+def day_number(day):
+    """Days since the epoch of a date"""
+    return day.toordinal() - EPOCH_ORDINAL
+
+
+def day_date(number):
+    """ISO date string of a day number"""
+    return (EPOCH + timedelta(days=number)).isoformat()
+
+
+class StudyAnalytics:
+    """Study history as flat arrays, for metrics computed without per-session loops.
+
+    Sessions are reduced once to four columns: study day (days since the
+    epoch, from the ``date`` field), start time (seconds since the epoch),
+    minutes studied and an interned subject id. Metrics run as NumPy
+    bincount / cumsum / diff operations over views of those columns when
+    NumPy is installed, and as plain loops otherwise; both give the same
+    results. Minutes are returned as floats.
+    """
+
+    def __init__(self, sessions=(), use_numpy=None):
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed")
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        self.days = array('i')
+        self.starts = array('q')
+        self.minutes = array('d')
+        self.subject_ids = array('I')
+        self.subjects = []
+        self._subject_ids = {}
+        self._day_numbers = {}
+        self.extend(sessions)
+
+    @classmethod
+    def from_columnar(cls, columns, use_numpy=None):
+        """Build the columns straight from a ColumnarSessions store"""
+        analytics = cls(use_numpy=use_numpy)
+        analytics.subjects = list(columns.subjects)
+        analytics._subject_ids = {s: i for i, s in enumerate(analytics.subjects)}
+        analytics.subject_ids = array('I', columns.subject_ids)
+        analytics.minutes = array('d', columns.actual)
+        micros = 1000000
+        if analytics.use_numpy:
+            start_us = np.frombuffer(columns.start_us, dtype=np.int64)
+            analytics.starts.frombytes((start_us // micros).tobytes())
+            analytics.days.frombytes((start_us // (DAY_SECONDS * micros))
+                                     .astype(np.int32).tobytes())
+        else:
+            analytics.starts = array('q', [us // micros for us in columns.start_us])
+            analytics.days = array('i', [s // DAY_SECONDS for s in analytics.starts])
+
+        # Values the columnar store couldn't encode are kept verbatim
+        for index, start_time in columns.overrides('start_time'):
+            analytics.starts[index] = analytics._seconds(start_time)
+        for index, day in columns.overrides('date'):
+            analytics.days[index] = analytics._day_number(day, analytics.starts[index])
+        for index, minutes in columns.overrides('actual_duration'):
+            analytics.minutes[index] = minutes
+        return analytics
+
+    def __len__(self):
+        return len(self.starts)
+
+    @staticmethod
+    def _seconds(start_time):
+        start = datetime.fromisoformat(start_time)
+        return (day_number(start) * DAY_SECONDS + start.hour * 3600
+                + start.minute * 60 + start.second)
+
+    def _day_number(self, day, seconds):
+        """Day number of a session's date, falling back to its start day"""
+        number = self._day_numbers.get(day)
+        if number is None:
+            try:
+                number = day_number(date.fromisoformat(day))
+            except (TypeError, ValueError):
+                return seconds // DAY_SECONDS
+            self._day_numbers[day] = number
+        return number
+
+    def append(self, session):
+        """Add one session"""
+        seconds = self._seconds(session['start_time'])
+        subject_id = self._subject_ids.get(session['subject'])
+        if subject_id is None:
+            subject_id = self._subject_ids[session['subject']] = len(self.subjects)
+            self.subjects.append(session['subject'])
+        self.starts.append(seconds)
+        self.days.append(self._day_number(session.get('date'), seconds))
+        self.minutes.append(session['actual_duration'])
+        self.subject_ids.append(subject_id)
+
+    def extend(self, sessions):
+        for session in sessions:
+            self.append(session)
+
+    def _column(self, name):
+        """A column as a zero-copy NumPy view"""
+        column = getattr(self, name)
+        return np.frombuffer(column, dtype={'i': np.int32, 'q': np.int64, 'd': np.float64,
+                                            'I': np.uint32}[column.typecode])
+
+    def study_days(self):
+        """Number of distinct days with at least one session"""
+        if self.use_numpy:
+            return int(np.unique(self._column('days')).size)
+        return len(set(self.days))
+
+    def _daily(self):
+        """First day number and the minutes studied on every day from it to the last"""
+        if self.use_numpy:
+            days = self._column('days')
+            first = int(days.min())
+            return first, np.bincount(days - first, weights=self._column('minutes'))
+        first = min(self.days)
+        totals = [0.0] * (max(self.days) - first + 1)
+        for day, minutes in zip(self.days, self.minutes):
+            totals[day - first] += minutes
+        return first, totals
+
+    def daily_totals(self):
+        """(date, minutes) for every day from the first study day to the last"""
+        if not len(self):
+            return []
+        first, totals = self._daily()
+        if self.use_numpy:
+            totals = totals.tolist()
+        return [(day_date(first + i), minutes) for i, minutes in enumerate(totals)]
+
+    def weekly_totals(self):
+        """(Monday's date, minutes) for every week from the first study week to the last"""
+        if not len(self):
+            return []
+        # Weeks counted from the Monday before the epoch
+        if self.use_numpy:
+            weeks = (self._column('days') + EPOCH_WEEKDAY) // 7
+            first = int(weeks.min())
+            totals = np.bincount(weeks - first, weights=self._column('minutes')).tolist()
+        else:
+            weeks = [(day + EPOCH_WEEKDAY) // 7 for day in self.days]
+            first = min(weeks)
+            totals = [0.0] * (max(weeks) - first + 1)
+            for week, minutes in zip(weeks, self.minutes):
+                totals[week - first] += minutes
+        return [(day_date((first + i) * 7 - EPOCH_WEEKDAY), minutes)
+                for i, minutes in enumerate(totals)]
+
+    def rolling_average(self, window=7):
+        """(date, average daily minutes over the ``window`` days ending that day)
+        for every day from the first study day to the last"""
+        if not len(self):
+            return []
+        first, totals = self._daily()
+        if self.use_numpy:
+            running = np.concatenate(([0.0], np.cumsum(totals)))
+            ends = np.arange(1, len(totals) + 1)
+            averages = ((running[ends] - running[np.maximum(ends - window, 0)])
+                        / window).tolist()
+        else:
+            averages = []
+            total = 0.0
+            for i, minutes in enumerate(totals):
+                total += minutes
+                if i >= window:
+                    total -= totals[i - window]
+                averages.append(total / window)
+        return [(day_date(first + i), average) for i, average in enumerate(averages)]
+
+    def streaks(self, today=None):
+        """Current and longest runs of consecutive study days.
+
+        The current streak still counts if the last study day was yesterday.
+        """
+        result = {'current': 0, 'longest': 0, 'longest_start': None, 'longest_end': None}
+        if not len(self):
+            return result
+        today = day_number(today or date.today())
+
+        if self.use_numpy:
+            days = np.unique(self._column('days'))
+            breaks = np.flatnonzero(np.diff(days) != 1)
+            starts = np.concatenate(([0], breaks + 1))
+            ends = np.concatenate((breaks, [days.size - 1]))
+            lengths = ends - starts + 1
+            best = int(np.argmax(lengths))
+            runs = [(int(days[starts[best]]), int(lengths[best])),
+                    (int(days[starts[-1]]), int(lengths[-1]))]
+        else:
+            days = sorted(set(self.days))
+            runs = []
+            run_start = days[0]
+            for previous, day in zip(days, days[1:] + [None]):
+                if day != previous + 1:
+                    runs.append((run_start, previous - run_start + 1))
+                    run_start = day
+            best = max(range(len(runs)), key=lambda i: (runs[i][1], -i))
+            runs = [runs[best], runs[-1]]
+
+        (longest_start, longest), (last_start, last_length) = runs
+        result['longest'] = longest
+        result['longest_start'] = day_date(longest_start)
+        result['longest_end'] = day_date(longest_start + longest - 1)
+        if last_start + last_length - 1 >= today - 1:
+            result['current'] = last_length
+        return result
+
+    def hour_heatmap(self):
+        """Minutes studied by weekday (rows, Monday first) and hour of day (columns)"""
+        if self.use_numpy:
+            starts = self._column('starts')
+            cells = ((starts // DAY_SECONDS + EPOCH_WEEKDAY) % 7) * 24 + starts // 3600 % 24
+            heatmap = np.bincount(cells, weights=self._column('minutes'), minlength=168)
+            return heatmap.reshape(7, 24).tolist()
+        heatmap = [[0.0] * 24 for _ in range(7)]
+        for seconds, minutes in zip(self.starts, self.minutes):
+            heatmap[(seconds // DAY_SECONDS + EPOCH_WEEKDAY) % 7][seconds // 3600 % 24] += minutes
+        return heatmap
+
+    def subject_trends(self, window=30, today=None):
+        """Per-subject minutes in the last ``window`` days against the window before.
+
+        Returns {subject: {'recent_minutes', 'previous_minutes', 'change'}} for
+        subjects studied in either window, in order of first appearance.
+        """
+        today = day_number(today or date.today())
+        count = len(self.subjects)
+        if self.use_numpy and len(self):
+            age = today - self._column('days').astype(np.int64)
+            subject_ids = self._column('subject_ids')
+            minutes = self._column('minutes')
+            recent, previous = [
+                np.bincount(subject_ids[mask], weights=minutes[mask], minlength=count).tolist()
+                for mask in ((age >= 0) & (age < window),
+                             (age >= window) & (age < 2 * window))
+            ]
+        else:
+            recent, previous = [0.0] * count, [0.0] * count
+            for day, subject_id, minutes in zip(self.days, self.subject_ids, self.minutes):
+                age = today - day
+                if 0 <= age < window:
+                    recent[subject_id] += minutes
+                elif window <= age < 2 * window:
+                    previous[subject_id] += minutes
+
+        return {
+            subject: {
+                'recent_minutes': recent[i],
+                'previous_minutes': previous[i],
+                'change': recent[i] - previous[i]
+            }
+            for i, subject in enumerate(self.subjects) if recent[i] or previous[i]
+        }
+
+    def report(self, today=None):
+        """All metrics in one dict"""
+        return {
+            'sessions': len(self),
+            'study_days': self.study_days(),
+            'streaks': self.streaks(today),
+            'daily_totals': self.daily_totals(),
+            'weekly_totals': self.weekly_totals(),
+            'rolling_7_day': self.rolling_average(7),
+            'rolling_30_day': self.rolling_average(30),
+            'hour_heatmap': self.hour_heatmap(),
+            'subject_trends': self.subject_trends(today=today)
+        }
@@ -0,0 +1,186 @@
+"""
+Binary Sessions Module
+Fixed-width binary session files, read through mmap without decoding
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from .columnar import COLUMNS, ColumnarSessions, copy_column
+from .instrument import note
+from .session_log import SessionLog
+
+MAGIC = b'SSPSESS\x00'
+VERSION = 1
+# Flags: start times strictly increase with position, or else the file holds
+# a block of positions sorted by start time (the order a TimeIndex keeps)
+IN_ORDER = 1
+SORTED_BLOCK = 2
+
+# magic, version, flags, session count, tail offset, tail length; padded to 64
+# bytes so the 8-byte column that follows starts aligned
+HEADER = struct.Struct('<8sIIQQQ')
+HEADER_SIZE = 64
+
+SWAP = sys.byteorder != 'little'
+
+
+def binary_path(data_file):
+    """Binary session file that stands in for a JSON session file"""
+    return os.path.splitext(data_file)[0] + '.bin'
+
+
+def write_sessions(path, sessions):
+    """Write sessions (dicts or a ColumnarSessions) as a binary file, atomically.
+
+    Layout: a header, then one fixed-width block per column (start time in
+    epoch microseconds, planned and actual minutes, subject id, completed
+    flag; little-endian, 21 bytes per session), the sorted positions if the
+    sessions are out of order, then a JSON tail with the subject table,
+    per-subject totals and any values the columns can't hold exactly.
+    """
+    columns = sessions if isinstance(sessions, ColumnarSessions) else ColumnarSessions(sessions)
+    count = len(columns)
+    tail = json.dumps({
+        'subjects': columns.subjects,
+        'totals': {subject: [minutes, sessions]
+                   for subject, minutes, sessions in columns.subject_totals()},
+        'overflow': {str(index): overflow for index, overflow in columns._overflow.items()}
+    }, default=dict).encode('utf-8')
+    blocks = [(getattr(columns, name), code) for name, code in COLUMNS]
+    order = columns.time_order()
+    if isinstance(order, range):
+        flags = IN_ORDER
+    elif order is not None:
+        flags = SORTED_BLOCK
+        blocks.append((order, 'q'))
+    else:
+        flags = 0
+    blocks_size = sum(count * array(code).itemsize for _, code in blocks)
+    header = HEADER.pack(MAGIC, VERSION, flags, count, HEADER_SIZE + blocks_size, len(tail))
+
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            for column, code in blocks:
+                if SWAP:
+                    column = copy_column(code, column)
+                    column.byteswap()
+                f.write(column)
+            f.write(tail)
+            note(bytes_written=f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+class MappedSessions(ColumnarSessions):
+    """ColumnarSessions backed by a memory-mapped binary session file.
+
+    Opening reads the header and the small JSON tail only: the columns are
+    memoryviews over the mapping, so a page of the file is read when a query
+    first touches it. The first append copies the columns into ordinary
+    arrays (one memcpy each) and releases the mapping.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, count, tail_offset, tail_length = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} binary session file")
+        tail = json.loads(self._map[tail_offset:tail_offset + tail_length])
+        note(bytes_read=HEADER_SIZE + tail_length)
+
+        blocks = COLUMNS + ((('_sorted', 'q'),) if flags & SORTED_BLOCK else ())
+        self._sorted = None
+        self._views = [memoryview(self._map)]
+        offset = HEADER_SIZE
+        for name, code in blocks:
+            size = count * array(code).itemsize
+            column = self._views[0][offset:offset + size].cast(code)
+            if SWAP:
+                column = copy_column(code, column)
+                column.byteswap()
+            else:
+                self._views.append(column)
+            setattr(self, name, column)
+            offset += size
+        self.subjects = tail['subjects']
+        self._subject_ids = {subject: i for i, subject in enumerate(self.subjects)}
+        self._overflow = {int(index): overflow for index, overflow in tail['overflow'].items()}
+        self._totals = tail['totals']
+        self._mapped = count
+        self._in_order = bool(flags & IN_ORDER)
+
+    def _release(self):
+        """Copy the columns into arrays and close the mapping"""
+        if self._map is None:
+            return
+        for name, code in COLUMNS:
+            setattr(self, name, copy_column(code, getattr(self, name)))
+        if self._sorted is not None:
+            self._sorted = copy_column('q', self._sorted)
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._map = None
+
+    def append(self, session):
+        self._release()
+        super().append(session)
+
+    def subject_totals(self, first=0):
+        """Totals saved with the file, plus those of sessions appended since"""
+        if first:
+            return super().subject_totals(first)
+        minutes = {subject: total[0] for subject, total in self._totals.items()}
+        counts = {subject: total[1] for subject, total in self._totals.items()}
+        for subject, added_minutes, added in super().subject_totals(self._mapped):
+            minutes[subject] = minutes.get(subject, 0) + added_minutes
+            counts[subject] = counts.get(subject, 0) + added
+        return [(subject, minutes[subject], counts[subject])
+                for subject in self.subjects if counts.get(subject)]
+
+    def time_order(self):
+        """Sorted order of the sessions in the file, read from it rather than
+        worked out; TimeIndex.rebuild adds any appended since"""
+        if self._in_order:
+            return range(self._mapped)
+        if self._sorted is not None:
+            return copy_column('q', self._sorted)
+        return super().time_order()
+
+
+def read_sessions(path):
+    """Open a binary session file (empty if it doesn't exist)"""
+    if not os.path.exists(path):
+        return ColumnarSessions()
+    return MappedSessions(path)
+
+
+class BinarySessionLog(SessionLog):
+    """SessionLog whose snapshot is a binary session file"""
+
+    def _read_snapshot(self):
+        return read_sessions(self.snapshot_file)
+
+    def _write_snapshot(self, records):
+        write_sessions(self.snapshot_file, records)
+
+    def _frozen(self, records):
+        if isinstance(records, ColumnarSessions):
+            return records.copy()
+        return super()._frozen(records)
@@ -0,0 +1,107 @@
+"""
+Bulk Import/Export Module
+Streams tasks and sessions between CSV / JSON-lines files and the planner
+"""
+
+import csv
+import json
+import os
+import time
+
+TASK_FIELDS = ['id', 'title', 'description', 'priority', 'due_date',
+               'created_at', 'completed', 'completed_at']
+SESSION_FIELDS = ['subject', 'planned_duration', 'actual_duration',
+                  'start_time', 'date', 'completed']
+
+
+def detect_format(path, fmt=None):
+    """Pick 'csv', 'jsonl' or 'json' from an explicit format or the file extension"""
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext == '.json':
+        return 'json'
+    return 'jsonl'
+
+
+def read_records(path, fmt=None):
+    """Yield one dict per record without reading the whole file up front.
+
+    A record that isn't valid JSON is yielded as a ValueError saying why, so
+    the importer rejects it under its record number and carries on.
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, 'r', newline='') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        elif fmt == 'json':
+            try:
+                records = json.load(f)
+            except json.JSONDecodeError as e:
+                yield ValueError(f"invalid JSON: {e.msg} at line {e.lineno}")
+                return
+            yield from records if isinstance(records, list) else [records]
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield ValueError(f"invalid JSON: {e.msg}")
+
+
+def write_records(path, records, fields, fmt=None):
+    """Write records as CSV, JSON lines or a JSON array; returns the count"""
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, 'w', newline='') as f:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        elif fmt == 'json':
+            records = list(records)
+            json.dump(records, f, indent=4, default=dict)
+            count = len(records)
+        else:
+            for record in records:
+                f.write(json.dumps(record, default=dict) + '\n')
+                count += 1
+    return count
+
+
+def _report(result, started):
+    """Add elapsed time and throughput to an import result"""
+    seconds = time.perf_counter() - started
+    result['seconds'] = seconds
+    result['records_per_second'] = result['imported'] / seconds if seconds > 0 else 0
+    return result
+
+
+def import_tasks(task_manager, path, fmt=None, batch_size=1000):
+    """Import tasks from a file through TaskManager.add_tasks_bulk"""
+    started = time.perf_counter()
+    result = task_manager.add_tasks_bulk(read_records(path, fmt), batch_size=batch_size)
+    return _report(result, started)
+
+
+def import_sessions(study_tracker, path, fmt=None, batch_size=1000):
+    """Import sessions from a file through StudyTracker.import_sessions"""
+    started = time.perf_counter()
+    result = study_tracker.import_sessions(read_records(path, fmt), batch_size=batch_size)
+    return _report(result, started)
+
+
+def export_tasks(task_manager, path, fmt=None):
+    """Export all tasks to a file"""
+    return write_records(path, task_manager.get_all_tasks(), TASK_FIELDS, fmt)
+
+
+def export_sessions(study_tracker, path, fmt=None):
+    """Export all sessions to a file"""
+    return write_records(path, study_tracker.get_all_sessions(), SESSION_FIELDS, fmt)
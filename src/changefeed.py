@@ -0,0 +1,225 @@
+"""
+Change Feed Module
+Durable, sequenced change events for tasks and sessions, with in-process subscribers
+"""
+
+import glob
+import json
+import os
+import threading
+import warnings
+from bisect import bisect_right
+from datetime import datetime
+from .fileio import file_lock
+from .instrument import note
+
+TASK_ADDED = 'task_added'
+TASK_COMPLETED = 'task_completed'
+TASK_DELETED = 'task_deleted'
+SESSION_RECORDED = 'session_recorded'
+TASK_EVENTS = (TASK_ADDED, TASK_COMPLETED, TASK_DELETED)
+SESSION_EVENTS = (SESSION_RECORDED,)
+
+
+def feed_dir(data_file):
+    """Change feed directory shared by the data files of one directory"""
+    return os.path.join(os.path.dirname(data_file), 'changes')
+
+
+class ChangeFeed:
+    """Append-only log of change events, numbered 1, 2, 3, ... without gaps.
+
+    Each event is one JSON line: ``{'seq', 'type', 'at', ...}`` plus the
+    changed record under 'task' or 'session'. Lines go into segment files
+    named after the first seq they hold, with a new segment every
+    ``segment_size`` events, so ``changes_since(seq)`` opens the segment
+    holding seq + 1 straight from the file names and a consumer catching up
+    reads only what it hasn't seen (plus at most one segment's worth of
+    lines). Appends hold a lock file and continue from the last seq on disk,
+    so several processes sharing a data directory produce one sequence.
+
+    Subscribers are called in the publishing process, after the events are
+    on disk; other processes pick them up with ``changes_since``.
+    """
+
+    def __init__(self, directory, segment_size=10000, fsync=True):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.fsync = fsync
+        self.lock_file = os.path.join(directory, 'changes.lock')
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._tail = None  # (first seq, size, last seq) of the newest segment
+
+    def _path(self, first):
+        return os.path.join(self.directory, f"{first:012d}.jsonl")
+
+    def segments(self):
+        """First seq of each segment file, oldest first"""
+        paths = glob.glob(os.path.join(self.directory, '*.jsonl'))
+        return sorted(int(os.path.basename(p)[:-len('.jsonl')]) for p in paths)
+
+    def _read_lines(self, first, offset=0):
+        """Complete lines of a segment from ``offset``, stopping at a torn one"""
+        try:
+            with open(self._path(first), 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        return
+                    note(bytes_read=len(line))
+                    yield line
+        except FileNotFoundError:
+            return
+
+    def _newest(self):
+        """(first seq, size, last seq) of the newest segment, reading only what
+        was appended since this process last looked. Call with both locks held."""
+        firsts = self.segments()
+        if not firsts:
+            return None, 0, 0
+        first = firsts[-1]
+        size = os.path.getsize(self._path(first))
+        if self._tail is not None and self._tail[:2] == (first, size):
+            return self._tail
+
+        offset, last = 0, first - 1
+        if self._tail is not None and self._tail[0] == first and self._tail[1] < size:
+            offset, last = self._tail[1], self._tail[2]
+        for line in self._read_lines(first, offset):
+            offset += len(line)
+            last += 1
+        if offset < size:
+            # A crash left a partial event behind; drop it
+            with open(self._path(first), 'r+b') as f:
+                f.truncate(offset)
+        self._tail = (first, offset, last)
+        return self._tail
+
+    def publish(self, kind, **payload):
+        """Append one event and notify subscribers; returns the event"""
+        return self.publish_many([(kind, payload)])[0]
+
+    def publish_many(self, changes):
+        """Append (type, payload) changes as consecutive events with one write
+        per segment, then notify subscribers; returns the events"""
+        if not changes:
+            return []
+        at = datetime.now().isoformat()
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with file_lock(self.lock_file):
+                first, _, last = self._newest()
+                events = []
+                writes = {}
+                for kind, payload in changes:
+                    last += 1
+                    if first is None or last - first >= self.segment_size:
+                        first = last
+                    event = {'seq': last, 'type': kind, 'at': at}
+                    event.update(payload)
+                    events.append(event)
+                    writes.setdefault(first, []).append(json.dumps(event, default=dict) + '\n')
+
+                for segment, lines in writes.items():
+                    text = ''.join(lines)
+                    with open(self._path(segment), 'a') as f:
+                        f.write(text)
+                        f.flush()
+                        if self.fsync:
+                            os.fsync(f.fileno())
+                    note(bytes_written=len(text))
+                self._tail = (first, os.path.getsize(self._path(first)), last)
+
+        for event in events:
+            self._notify(event)
+        return events
+
+    def _notify(self, event):
+        for callback, types in list(self._subscribers):
+            if types is None or event['type'] in types:
+                try:
+                    callback(event)
+                except Exception as e:
+                    # The change is already saved; one failing consumer must
+                    # not undo it or keep the others from hearing about it
+                    warnings.warn(f"Change feed subscriber {callback!r} failed: {e!r}")
+
+    def subscribe(self, callback, types=None):
+        """Call ``callback(event)`` for each event this process publishes (only
+        those of ``types``, if given); returns a function that unsubscribes"""
+        subscriber = (callback, frozenset(types) if types else None)
+        self._subscribers.append(subscriber)
+
+        def unsubscribe():
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+        return unsubscribe
+
+    def last_seq(self):
+        """Seq of the newest event (0 if there are none)"""
+        if not os.path.isdir(self.directory):
+            return 0
+        with self._lock, file_lock(self.lock_file):
+            return self._newest()[2]
+
+    def iter_changes(self, since=0, types=None):
+        """Stream events with seq > ``since``, oldest first.
+
+        Raises ValueError if events after ``since`` were pruned: the consumer
+        has missed changes and has to re-read everything instead.
+        """
+        since = max(since, 0)
+        firsts = self.segments()
+        if not firsts:
+            return
+        if since + 1 < firsts[0]:
+            raise ValueError(f"Changes before seq {firsts[0]} were pruned; "
+                             f"can't resume from seq {since}")
+        position = max(bisect_right(firsts, since + 1) - 1, 0)
+        for first in firsts[position:]:
+            # Segments hold consecutive seqs, so earlier lines are skipped unparsed
+            skip = since + 1 - first
+            for number, line in enumerate(self._read_lines(first)):
+                if number < skip:
+                    continue
+                event = json.loads(line)
+                if types is None or event['type'] in types:
+                    yield event
+
+    def changes_since(self, since=0, types=None, limit=None):
+        """Events with seq > ``since`` (of ``types``, at most ``limit``), oldest
+        first; pass the last seq returned to get the next batch"""
+        events = []
+        for event in self.iter_changes(since, types):
+            events.append(event)
+            if limit is not None and len(events) >= limit:
+                break
+        return events
+
+    def prune(self, before):
+        """Delete segments whose events all have seq < ``before``; returns how many"""
+        with self._lock, file_lock(self.lock_file):
+            firsts = self.segments()
+            removed = 0
+            for first, following in zip(firsts, firsts[1:]):
+                if following > before:
+                    break
+                os.remove(self._path(first))
+                removed += 1
+            return removed
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def shared_feed(directory):
+    """The ChangeFeed for ``directory`` in this process, so components that
+    share a data directory also share subscribers"""
+    key = os.path.abspath(directory)
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            feed = _feeds[key] = ChangeFeed(directory)
+        return feed
@@ -0,0 +1,110 @@
+"""
+Cohort Report Module
+Study statistics aggregated across many users' session histories, in parallel
+"""
+
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from .aggregates import SessionAggregates
+from .instrument import timed
+from .storage import open_session_store
+
+SESSIONS_FILE = 'study_sessions.json'
+
+
+def user_dirs(data_dir):
+    """Per-user directories under ``data_dir`` (the server's layout), by user id"""
+    if not os.path.isdir(data_dir):
+        return []
+    return [os.path.join(data_dir, name)
+            for name in sorted(entry.name for entry in os.scandir(data_dir) if entry.is_dir())]
+
+
+def user_totals(user_dir, storage='json'):
+    """(subject, minutes, sessions) per subject for one user, in order of first
+    appearance, summed the way a StudyTracker's running aggregates are"""
+    store = open_session_store(storage, os.path.join(user_dir, SESSIONS_FILE))
+    try:
+        if not store.resident:
+            return store.subject_totals()
+        aggregates = SessionAggregates()
+        aggregates.rebuild(store.load())
+        return [(subject, minutes, aggregates.subject_counts[subject])
+                for subject, minutes in aggregates.subject_minutes.items()]
+    finally:
+        store.close()
+
+
+def _chunk_totals(chunk, storage):
+    """Worker: user_totals for each directory in a chunk"""
+    return [user_totals(user_dir, storage) for user_dir in chunk]
+
+
+def iter_user_totals(dirs, storage='json', workers=None, chunk_size=16):
+    """Yield user_totals for each directory, in order.
+
+    With more than one worker, chunks of ``chunk_size`` users are parsed in
+    a process pool. At most two chunks per worker are in flight, so memory
+    stays bounded however many users there are.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for user_dir in dirs:
+            yield user_totals(user_dir, storage)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for start in range(0, len(dirs), chunk_size):
+            pending.append(pool.submit(_chunk_totals, dirs[start:start + chunk_size], storage))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+class CohortReport:
+    """Cohort-wide totals, merged one user at a time.
+
+    Users must be added in the same order for two reports to compare equal:
+    subject ties and float sums both depend on it.
+    """
+
+    def __init__(self):
+        self.aggregates = SessionAggregates()
+        self.users = 0
+        self.active_users = 0
+        self.subject_users = Counter()
+
+    def add_user(self, totals):
+        """Fold in one user's user_totals"""
+        self.users += 1
+        if totals:
+            self.active_users += 1
+        for subject, minutes, count in totals:
+            self.aggregates.add_subject(subject, minutes, count)
+            self.subject_users[subject] += 1
+
+    def report(self):
+        return {
+            'users': self.users,
+            'active_users': self.active_users,
+            'statistics': self.aggregates.statistics(),
+            'subject_breakdown': self.aggregates.breakdown(),
+            'subject_sessions': dict(self.aggregates.subject_counts),
+            'subject_users': dict(self.subject_users)
+        }
+
+
+@timed('cohort.report')
+def cohort_report(data_dir='data/users', storage='json', workers=None, chunk_size=16):
+    """Statistics and subject breakdown across every user under ``data_dir``.
+
+    ``workers=1`` runs serially in this process; any other count gives the
+    same result, since per-user totals are merged in user order either way.
+    """
+    report = CohortReport()
+    for totals in iter_user_totals(user_dirs(data_dir), storage, workers, chunk_size):
+        report.add_user(totals)
+    return report.report()
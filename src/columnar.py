@@ -0,0 +1,225 @@
+"""
+Columnar Sessions Module
+Compact array-backed in-memory storage for study sessions
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+FIELDS = ('subject', 'planned_duration', 'actual_duration',
+          'start_time', 'date', 'completed')
+COLUMNS = (('start_us', 'q'), ('planned', 'i'), ('actual', 'i'),
+           ('subject_ids', 'I'), ('completed', 'b'))
+
+
+def copy_column(code, column):
+    """A new array holding a column's values, copied as one block of bytes"""
+    copied = array(code)
+    with memoryview(column).cast('B') as raw:
+        copied.frombytes(raw)
+    return copied
+
+
+class SessionView(Mapping):
+    """Read-only dict-like view of one session in a ColumnarSessions store"""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._store.field(self._index, key)
+
+    def __iter__(self):
+        return iter(self._store.keys(self._index))
+
+    def __len__(self):
+        return len(self._store.keys(self._index))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ColumnarSessions(Sequence):
+    """Sessions stored as parallel arrays instead of one dict per session.
+
+    Start times are kept as microseconds since the epoch, durations as
+    32-bit ints and subjects as ids into an interned subject table; the
+    ``date`` field is derived from the start time. Anything that doesn't
+    round-trip through that encoding (unusual timestamps, float durations,
+    extra keys) is kept verbatim in a small per-record overflow dict, so
+    views always compare equal to the dicts that were appended.
+    """
+
+    def __init__(self, sessions=()):
+        self.start_us = array('q')
+        self.planned = array('i')
+        self.actual = array('i')
+        self.subject_ids = array('I')
+        self.completed = array('b')
+        self.subjects = []
+        self._subject_ids = {}
+        self._overflow = {}
+        self.extend(sessions)
+
+    def __len__(self):
+        return len(self.start_us)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SessionView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('session index out of range')
+        return SessionView(self, index)
+
+    def subject_id(self, subject):
+        """Intern a subject and return its id"""
+        subject_id = self._subject_ids.get(subject)
+        if subject_id is None:
+            subject_id = len(self.subjects)
+            self.subjects.append(subject)
+            self._subject_ids[subject] = subject_id
+        return subject_id
+
+    @staticmethod
+    def _encode_time(start_time):
+        """Microseconds since the epoch, or None if it doesn't round-trip"""
+        try:
+            parsed = datetime.fromisoformat(start_time)
+        except (TypeError, ValueError):
+            return None
+        if parsed.tzinfo is not None or parsed.isoformat() != start_time:
+            return None
+        return (parsed - EPOCH) // MICROSECOND
+
+    @staticmethod
+    def _decode_time(micros):
+        return (EPOCH + micros * MICROSECOND).isoformat()
+
+    @staticmethod
+    def _int_column(value):
+        if type(value) is int and -2**31 <= value < 2**31:
+            return value
+        return None
+
+    def append(self, session):
+        """Add one session dict"""
+        overflow = {key: value for key, value in session.items() if key not in FIELDS}
+
+        start_time = session['start_time']
+        start_us = self._encode_time(start_time)
+        if start_us is None:
+            overflow['start_time'] = start_time
+            start_us = 0
+            start_time = self._decode_time(0)
+        if session.get('date') != start_time[:10]:
+            overflow['date'] = session.get('date')
+
+        durations = []
+        for key in ('planned_duration', 'actual_duration'):
+            value = self._int_column(session[key])
+            if value is None:
+                overflow[key] = session[key]
+                value = 0
+            durations.append(value)
+
+        completed = session.get('completed', True)
+        if type(completed) is not bool:
+            overflow['completed'] = completed
+
+        index = len(self)
+        self.start_us.append(start_us)
+        self.planned.append(durations[0])
+        self.actual.append(durations[1])
+        self.subject_ids.append(self.subject_id(session['subject']))
+        self.completed.append(bool(completed))
+        if overflow:
+            self._overflow[index] = overflow
+
+    def extend(self, sessions):
+        for session in sessions:
+            self.append(session)
+
+    def field(self, index, key):
+        """Read one field of one session"""
+        overflow = self._overflow.get(index)
+        if overflow is not None and key in overflow:
+            return overflow[key]
+        if key == 'subject':
+            return self.subjects[self.subject_ids[index]]
+        if key == 'actual_duration':
+            return self.actual[index]
+        if key == 'planned_duration':
+            return self.planned[index]
+        if key == 'start_time':
+            return self._decode_time(self.start_us[index])
+        if key == 'date':
+            return self._decode_time(self.start_us[index])[:10]
+        if key == 'completed':
+            return bool(self.completed[index])
+        raise KeyError(key)
+
+    def overrides(self, key):
+        """(index, value) pairs for sessions whose ``key`` is kept verbatim
+        instead of in its column"""
+        return [(index, overflow[key]) for index, overflow in self._overflow.items()
+                if key in overflow]
+
+    def keys(self, index):
+        """Field names of one session"""
+        overflow = self._overflow.get(index)
+        if not overflow:
+            return FIELDS
+        return FIELDS + tuple(key for key in overflow if key not in FIELDS)
+
+    def to_dicts(self):
+        """Materialize every session as a plain dict"""
+        return [dict(view) for view in self]
+
+    def copy(self):
+        """An independent copy (the columns are copied wholesale, not per session)"""
+        copied = ColumnarSessions()
+        for name, code in COLUMNS:
+            setattr(copied, name, copy_column(code, getattr(self, name)))
+        copied.subjects = list(self.subjects)
+        copied._subject_ids = dict(self._subject_ids)
+        copied._overflow = {index: dict(o) for index, o in self._overflow.items()}
+        return copied
+
+    def subject_totals(self, first=0):
+        """(subject, minutes, sessions) per subject for sessions from ``first`` on,
+        in order of first appearance, summed straight from the columns"""
+        minutes = [0] * len(self.subjects)
+        counts = [0] * len(self.subjects)
+        subject_ids = self.subject_ids
+        actual = self.actual
+        for index in range(first, len(self)):
+            subject_id = subject_ids[index]
+            minutes[subject_id] += actual[index]
+            counts[subject_id] += 1
+        for index, value in self.overrides('actual_duration'):
+            if index >= first:
+                minutes[subject_ids[index]] += value - actual[index]
+        return [(subject, minutes[i], counts[i])
+                for i, subject in enumerate(self.subjects) if counts[i]]
+
+    def time_order(self):
+        """Positions sorted the way TimeIndex sorts them (by start time, later
+        sessions first on ties), or None if some start times are kept verbatim.
+
+        Encoded start times sort the same as their ISO strings, so this
+        compares integers instead of decoding every timestamp.
+        """
+        if self.overrides('start_time'):
+            return None
+        start_us = self.start_us
+        if all(start_us[i] < start_us[i + 1] for i in range(len(self) - 1)):
+            return range(len(self))
+        return array('q', sorted(range(len(self) - 1, -1, -1), key=start_us.__getitem__))
@@ -0,0 +1,107 @@
+"""
+Due Index Module
+Pending tasks sorted by due date, for deadline queries and reminders
+"""
+
+from bisect import bisect_left, insort
+from datetime import date
+from .storage import priority_rank
+
+# Sorts after every (due date, priority rank, ...) key of the same date: ranks run 0-3
+_END_OF_DAY = 4
+
+
+class DueIndex:
+    """Pending tasks with a due date, as a sorted list of
+    (due date, priority rank, created_at, id) keys.
+
+    Due dates are kept as YYYY-MM-DD strings, which sort like the dates they
+    name, so a date range is found with a bisect and read off as a slice:
+    O(log N + K) for K matching tasks. Adding a task is an insort; completing
+    or deleting one removes its key with another bisect. Due dates are
+    validated and normalized when tasks are added, so the stored strings are
+    used as they are; ones that aren't YYYY-MM-DD (saved before due dates were
+    validated) are left out rather than guessed at.
+    """
+
+    def __init__(self, tasks=()):
+        self.keys = []
+        self.tasks = {}     # id -> task, for the tasks in keys
+        self._keys = {}     # id -> key
+        self.rebuild(tasks)
+
+    @staticmethod
+    def _key(task):
+        due = task.get('due_date')
+        if not isinstance(due, str) or len(due) != 10 or due[4] != '-' or due[7] != '-':
+            return None
+        try:
+            date.fromisoformat(due)
+        except ValueError:
+            return None
+        return (due, priority_rank(task['priority']), task.get('created_at') or '', task['id'])
+
+    def rebuild(self, tasks):
+        """Index the pending tasks among ``tasks`` with one sort"""
+        self.keys = []
+        self.tasks.clear()
+        self._keys.clear()
+        for task in tasks:
+            key = None if task['completed'] else self._key(task)
+            if key is not None:
+                self.keys.append(key)
+                self.tasks[task['id']] = task
+                self._keys[task['id']] = key
+        self.keys.sort()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, task_id):
+        return task_id in self._keys
+
+    def add(self, task):
+        """Index a task; completed and undated tasks are only dropped"""
+        self.remove(task['id'])
+        key = None if task['completed'] else self._key(task)
+        if key is not None:
+            insort(self.keys, key)
+            self.tasks[task['id']] = task
+            self._keys[task['id']] = key
+
+    def remove(self, task_id):
+        key = self._keys.pop(task_id, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+            del self.tasks[task_id]
+
+    def _position(self, day, end_of_day=False):
+        """Index of the first key due on ``day`` (or after it, with ``end_of_day``)"""
+        return bisect_left(self.keys, (day, _END_OF_DAY) if end_of_day else (day,))
+
+    def between(self, start=None, end=None, limit=None):
+        """Tasks due from ``start`` through ``end`` (YYYY-MM-DD, inclusive; None
+        leaves that side open), earliest deadline then highest priority first"""
+        low = 0 if start is None else self._position(start)
+        high = len(self.keys) if end is None else self._position(end, end_of_day=True)
+        if limit is not None:
+            high = min(high, low + limit)
+        return [self.tasks[key[3]] for key in self.keys[low:high]]
+
+    def before(self, day, limit=None):
+        """Tasks due before ``day``, i.e. overdue on it"""
+        high = self._position(day)
+        if limit is not None:
+            high = min(high, limit)
+        return [self.tasks[key[3]] for key in self.keys[:high]]
+
+    def first(self, start=None):
+        """The task with the earliest deadline on or after ``start``, or None"""
+        position = 0 if start is None else self._position(start)
+        if position == len(self.keys):
+            return None
+        return self.tasks[self.keys[position][3]]
+
+    def ordered(self):
+        """Every indexed task, most urgent first"""
+        return [self.tasks[key[3]] for key in self.keys]
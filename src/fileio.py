@@ -0,0 +1,80 @@
+"""
+File I/O Module
+Cross-process file locks, atomic JSON writes and corruption-safe reads
+"""
+
+import json
+import os
+import time
+import warnings
+from contextlib import contextmanager
+from .instrument import note
+
+try:
+    import fcntl
+except ImportError:  # Windows: advisory locks are unavailable, writes stay atomic
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_file, exclusive=True):
+    """Hold an advisory fcntl lock on ``lock_file`` (created if missing).
+
+    The lock lives on a separate file because atomic writes replace the data
+    file's inode, which would silently drop a lock taken on the data file.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(lock_file, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_json(path, data, **dump_options):
+    """Write JSON to a temp file in the same directory, fsync it, then os.replace"""
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, **dump_options)
+            note(bytes_written=f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def file_stamp(path):
+    """Identity of a file's current contents: (inode, mtime_ns, size) or None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def read_json_file(path, default):
+    """Read a JSON file, setting aside (not discarding) a corrupt one.
+
+    A file that fails to parse is renamed to ``<path>.corrupt-<timestamp>``
+    and a warning is issued, so its contents can still be recovered.
+    """
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+            note(bytes_read=f.tell())
+            return data
+    except json.JSONDecodeError as e:
+        backup = f"{path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+        os.replace(path, backup)
+        warnings.warn(f"{path} could not be parsed ({e}); moved it to {backup}")
+        return default
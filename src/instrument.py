@@ -0,0 +1,298 @@
+"""
+Instrumentation Module
+Per-operation call counts, latency percentiles, bytes and records
+"""
+
+import atexit
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+# Latencies go into logarithmic buckets, 8 per doubling (about 9% wide), so
+# percentiles cost constant memory however many calls are recorded
+BUCKETS_PER_DOUBLING = 8
+DEFAULT_DUMP = 'data/perf.json'
+
+
+def _bucket(seconds):
+    micros = seconds * 1e6
+    return math.ceil(math.log2(micros) * BUCKETS_PER_DOUBLING) if micros > 1 else 0
+
+
+def _bucket_seconds(bucket):
+    """Upper bound of a bucket"""
+    return 2 ** (bucket / BUCKETS_PER_DOUBLING) / 1e6
+
+
+class OperationStats:
+    """Totals and a latency histogram for one named operation"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.records = 0
+        self.histogram = {}
+
+    def add(self, seconds, failed, bytes_read, bytes_written, records):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if failed:
+            self.errors += 1
+        if bytes_read or bytes_written or records:
+            self.bytes_read += bytes_read
+            self.bytes_written += bytes_written
+            self.records += records
+        bucket = _bucket(seconds)
+        histogram = self.histogram
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def percentile(self, q):
+        """Latency (seconds) that ``q`` of the calls stayed under"""
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= rank:
+                return min(_bucket_seconds(bucket), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': round(self.total * 1000, 3),
+            'p50_ms': round(self.percentile(0.50) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'records': self.records,
+            'histogram': {str(b): n for b, n in sorted(self.histogram.items())}
+        }
+
+    def merge(self, snapshot):
+        """Fold in a snapshot taken elsewhere (another process or an earlier dump)"""
+        self.calls += snapshot['calls']
+        self.errors += snapshot['errors']
+        self.total += snapshot['total_ms'] / 1000
+        self.max = max(self.max, snapshot['max_ms'] / 1000)
+        self.bytes_read += snapshot['bytes_read']
+        self.bytes_written += snapshot['bytes_written']
+        self.records += snapshot['records']
+        for bucket, count in snapshot['histogram'].items():
+            bucket = int(bucket)
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+
+
+class Metrics:
+    """Thread-safe registry of OperationStats by operation name"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = {}
+        self.enabled = True
+
+    def record(self, name, seconds, failed=False, bytes_read=0, bytes_written=0, records=0):
+        with self.lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.add(seconds, failed, bytes_read, bytes_written, records)
+
+    def snapshot(self, reset=False):
+        """{name: stats} as plain data; ``reset`` starts counting afresh"""
+        with self.lock:
+            data = {name: stats.snapshot() for name, stats in sorted(self.operations.items())}
+            if reset:
+                self.operations = {}
+        return data
+
+    def merge(self, snapshot):
+        with self.lock:
+            for name, data in snapshot.items():
+                self.operations.setdefault(name, OperationStats()).merge(data)
+
+    def reset(self):
+        with self.lock:
+            self.operations = {}
+
+
+metrics = Metrics()
+# PLANNER_PERF=0 turns recording off (measured calls then cost one flag check)
+metrics.enabled = os.environ.get('PLANNER_PERF', '1') != '0'
+
+
+class _Operation:
+    """I/O and records charged to the operation being measured"""
+
+    __slots__ = ('bytes_read', 'bytes_written', 'records')
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.records = 0
+
+
+_current = ContextVar('current_operation', default=None)
+
+
+def _finish(name, operation, token, started, failed):
+    elapsed = time.perf_counter() - started
+    _current.reset(token)
+    parent = _current.get()
+    if parent is not None:
+        parent.bytes_read += operation.bytes_read
+        parent.bytes_written += operation.bytes_written
+    metrics.record(name, elapsed, failed, operation.bytes_read,
+                   operation.bytes_written, operation.records)
+
+
+class measure:
+    """Context manager timing a block as one call of ``name``.
+
+    Bytes noted inside the block (see ``note``) are charged to it and to
+    any operation it is nested in; records only to the innermost one.
+    """
+
+    __slots__ = ('name', 'operation', 'token', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.operation = _Operation()
+        self.token = _current.set(self.operation) if metrics.enabled else None
+        self.started = time.perf_counter()
+        return self.operation
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.token is not None:
+            _finish(self.name, self.operation, self.token, self.started, exc_type is not None)
+
+
+def timed(name, records=None):
+    """Decorator form of ``measure``; ``records(result)`` counts what a call returned"""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            operation = _Operation()
+            token = _current.set(operation)
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                if records is not None:
+                    operation.records += records(result)
+                failed = False
+                return result
+            finally:
+                _finish(name, operation, token, started, failed)
+        return wrapper
+    return decorate
+
+
+def note(records=0, bytes_read=0, bytes_written=0):
+    """Charge records or I/O to the operation being measured, if any"""
+    operation = _current.get()
+    if operation is not None:
+        operation.records += records
+        operation.bytes_read += bytes_read
+        operation.bytes_written += bytes_written
+
+
+def load_dump(path):
+    """Operations saved in a dump file ({} if there is none)"""
+    from .fileio import read_json_file
+    return read_json_file(path, {}).get('operations', {})
+
+
+def dump(path):
+    """Merge this process's metrics into the JSON file at ``path``.
+
+    The in-process counters are reset afterwards, so repeated dumps (and
+    several processes sharing one file) never count a call twice.
+    """
+    from .fileio import atomic_write_json, file_lock
+    taken = metrics.snapshot(reset=True)
+    if not taken:
+        return
+    combined = Metrics()
+    try:
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with file_lock(path + '.lock'):
+            combined.merge(load_dump(path))
+            combined.merge(taken)
+            atomic_write_json(path, {
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+                'operations': combined.snapshot()
+            }, indent=2)
+    except BaseException:
+        metrics.merge(taken)  # keep them for the next dump
+        raise
+
+
+class PeriodicDump:
+    """Background thread dumping metrics every ``interval`` seconds and at exit"""
+
+    def __init__(self, path=DEFAULT_DUMP, interval=60.0):
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='perf-dump', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            dump(self.path)
+
+    def stop(self):
+        """Stop the thread and write whatever was recorded since the last dump"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        atexit.unregister(self.stop)
+        dump(self.path)
+
+
+def format_size(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def format_report(operations):
+    """Text table of a metrics snapshot, one line per operation"""
+    if not operations:
+        return "No operations recorded."
+    lines = [f"{'operation':<28}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+             f"{'max ms':>10}{'read':>11}{'written':>11}{'records':>10}"]
+    for name, op in operations.items():
+        errors = f" ({op['errors']} failed)" if op['errors'] else ""
+        lines.append(f"{name:<28}{op['calls']:>8}{op['p50_ms']:>10.3f}{op['p95_ms']:>10.3f}"
+                     f"{op['p99_ms']:>10.3f}{op['max_ms']:>10.3f}"
+                     f"{format_size(op['bytes_read']):>11}{format_size(op['bytes_written']):>11}"
+                     f"{op['records']:>10}{errors}")
+    return "\n".join(lines)
@@ -0,0 +1,206 @@
+"""
+Partitioned Session Store Module
+Month-partitioned JSON-lines session history that is streamed from disk
+"""
+
+import glob
+import heapq
+import json
+import os
+from .fileio import file_lock
+from .instrument import note
+
+
+class PartitionedSessionStore:
+    """One append-only ``YYYY-MM.jsonl`` file per month of sessions.
+
+    Sessions are never held in memory as a whole: queries stream the
+    partitions, and recent-session lookups only open the newest months.
+    A small summary file caches per-partition subject totals keyed on the
+    partition's size, so opening the store only rescans months that changed.
+    Appends hold a lock shared with other processes and first cut off a torn
+    line a crash left at the end of the partition, so a new record never
+    lands on the end of a partial one.
+    """
+
+    resident = False
+    summary_name = '_summary.json'
+    lock_name = '_append.lock'
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.summary_file = os.path.join(directory, self.summary_name)
+        self.lock_file = os.path.join(directory, self.lock_name)
+        self._summary = self._read_summary()
+        self._summary_dirty = False
+
+    def _read_summary(self):
+        try:
+            with open(self.summary_file, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_summary(self):
+        if not self._summary_dirty:
+            return
+        tmp_file = self.summary_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self._summary, f)
+        os.replace(tmp_file, self.summary_file)
+        self._summary_dirty = False
+
+    @staticmethod
+    def partition_key(session):
+        """Month partition of a session, from its start time"""
+        return session['start_time'][:7]
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.jsonl')
+
+    def partitions(self):
+        """Partition keys, oldest first"""
+        paths = glob.glob(os.path.join(self.directory, '*.jsonl'))
+        return sorted(os.path.basename(p)[:-len('.jsonl')] for p in paths)
+
+    def iter_partition(self, key):
+        """Stream the sessions of one partition, skipping a torn last line"""
+        try:
+            with open(self._path(key), 'r') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    note(bytes_read=len(line))
+                    yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def load(self):
+        """Sessions stay on disk; nothing is loaded up front"""
+        return []
+
+    def add(self, session, records=None):
+        self.add_many([session])
+
+    def add_many(self, sessions, records=None):
+        """Append sessions to their month partitions"""
+        by_partition = {}
+        for session in sessions:
+            by_partition.setdefault(self.partition_key(session), []).append(session)
+
+        for key, batch in by_partition.items():
+            path = self._path(key)
+            text = ''.join(json.dumps(s, default=dict) + '\n' for s in batch)
+            with file_lock(self.lock_file):
+                summary = self._summary.get(key)
+                fresh = summary is not None and summary['size'] == self._size(path)
+                with open(path, 'a+b') as f:
+                    self._drop_torn_tail(f)
+                    f.write(text.encode())
+            note(bytes_written=len(text))
+            if fresh:
+                for session in batch:
+                    self._fold(summary, session)
+                summary['size'] = self._size(path)
+                self._summary_dirty = True
+
+    @staticmethod
+    def _drop_torn_tail(f):
+        """Truncate an open partition after its last complete line"""
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b'\n':
+            return
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        f.truncate(position)
+
+    @staticmethod
+    def _size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return -1
+
+    @staticmethod
+    def _fold(summary, session):
+        totals = summary['subjects'].setdefault(session['subject'], [0, 0])
+        totals[0] += session['actual_duration']
+        totals[1] += 1
+        summary['count'] += 1
+
+    def _partition_summary(self, key):
+        """Subject totals for one partition, rescanning it if it changed"""
+        size = self._size(self._path(key))
+        summary = self._summary.get(key)
+        if summary is None or summary['size'] != size:
+            summary = {'size': size, 'count': 0, 'subjects': {}}
+            for session in self.iter_partition(key):
+                self._fold(summary, session)
+            self._summary[key] = summary
+            self._summary_dirty = True
+        return summary
+
+    def subject_totals(self):
+        """(subject, minutes, count) rows in order of first appearance"""
+        totals = {}
+        for key in self.partitions():
+            for subject, (minutes, count) in self._partition_summary(key)['subjects'].items():
+                row = totals.setdefault(subject, [0, 0])
+                row[0] += minutes
+                row[1] += count
+        self._write_summary()
+        return [(subject, minutes, count) for subject, (minutes, count) in totals.items()]
+
+    def totals(self):
+        """Session count and total minutes"""
+        rows = self.subject_totals()
+        return sum(r[2] for r in rows), sum(r[1] for r in rows)
+
+    def count(self):
+        return sum(self._partition_summary(key)['count'] for key in self.partitions())
+
+    def iter_sessions(self):
+        """Stream every session, oldest partition first"""
+        for key in self.partitions():
+            yield from self.iter_partition(key)
+
+    def sessions_by_subject(self, subject):
+        """Sessions for a subject, matched case-insensitively"""
+        subject = subject.lower()
+        return [s for s in self.iter_sessions() if s['subject'].lower() == subject]
+
+    def sessions_between(self, start, end):
+        """Sessions with start <= start_time < end, reading only overlapping months"""
+        matches = []
+        for key in self.partitions():
+            if key < start[:7] or key > end[:7]:
+                continue
+            matches.extend(s for s in self.iter_partition(key)
+                           if start <= s['start_time'] < end)
+        return sorted(matches, key=lambda s: s['start_time'])
+
+    def recent(self, limit):
+        """Newest sessions, reading only as many recent partitions as needed"""
+        newest = []
+        for key in reversed(self.partitions()):
+            newest.extend(self.iter_partition(key))
+            if len(newest) >= limit:
+                break
+        return heapq.nlargest(limit, newest, key=lambda s: s['start_time'])
+
+    def compact(self, records=None):
+        self._write_summary()
+
+    def close(self):
+        self._write_summary()
@@ -5,17 +5,57 @@ Provides intelligent study recommendations based on patterns
 
 import random
 from datetime import datetime, timedelta
+from .analytics import StudyAnalytics
+from .instrument import timed
 
 class StudyRecommender:
-    def __init__(self, study_tracker):
+    def __init__(self, study_tracker, review_queue=None):
         self.study_tracker = study_tracker
+        self.review_queue = review_queue
+        self._features = None
+        self._features_version = None
+        self.cache_hits = 0
+        self.cache_misses = 0
     
+    def _get_features(self):
+        """Return tracker-derived features, recomputing only after the tracker changes"""
+        version = self.study_tracker.version
+        if self._features is not None and self._features_version == version:
+            self.cache_hits += 1
+            return self._features
+        
+        self.cache_misses += 1
+        stats = self.study_tracker.get_statistics()
+        features = {
+            'stats': stats,
+            'subject_breakdown': self.study_tracker.get_subject_breakdown(),
+            'recent_study_days': 0
+        }
+        if stats['total_sessions'] >= 3:
+            # Distinct days among the last 7 sessions
+            recent_sessions = self.study_tracker.get_recent_sessions(limit=7)
+            features['recent_study_days'] = StudyAnalytics(recent_sessions).study_days()
+        
+        self._features = features
+        self._features_version = version
+        return features
+    
+    def cache_info(self):
+        """Return recommender cache hit/miss counters"""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'version': self._features_version
+        }
+    
+    @timed('recommend.recommendations', records=len)
     def get_recommendations(self):
         """Generate AI-powered study recommendations"""
         recommendations = []
         
-        stats = self.study_tracker.get_statistics()
-        sessions = self.study_tracker.get_all_sessions()
+        features = self._get_features()
+        stats = features['stats']
+        session_count = stats['total_sessions']
         
         # Recommendation 1: Study frequency
         if stats['total_sessions'] == 0:
@@ -42,8 +82,8 @@ class StudyRecommender:
                 )
         
         # Recommendation 2: Subject diversity
-        if sessions:
-            subject_breakdown = self.study_tracker.get_subject_breakdown()
+        if session_count:
+            subject_breakdown = features['subject_breakdown']
             if len(subject_breakdown) == 1:
                 recommendations.append(
                     "Try diversifying your study topics to develop a well-rounded knowledge base."
@@ -54,15 +94,14 @@ class StudyRecommender:
                 )
         
         # Recommendation 3: Study consistency
-        if len(sessions) >= 3:
-            recent_sessions = self.study_tracker.get_recent_sessions(limit=7)
-            unique_dates = set(s['date'] for s in recent_sessions)
+        if session_count >= 3:
+            study_days = features['recent_study_days']
             
-            if len(unique_dates) >= 5:
+            if study_days >= 5:
                 recommendations.append(
                     "Outstanding consistency! Daily practice is the key to mastery."
                 )
-            elif len(unique_dates) <= 2:
+            elif study_days <= 2:
                 recommendations.append(
                     "Try to study more frequently. Even 20-30 minutes daily is more effective than long, infrequent sessions."
                 )
@@ -87,9 +126,20 @@ class StudyRecommender:
         
         return recommendations[:5]  # Return top 5 recommendations
     
+    @timed('recommend.next_subject')
     def get_suggested_next_subject(self):
-        """Suggest which subject to study next based on patterns"""
-        subject_breakdown = self.study_tracker.get_subject_breakdown()
+        """Suggest which subject to study next based on patterns.
+        
+        With a review queue attached, the most overdue review comes first;
+        subjects seen in sessions join the queue due immediately.
+        """
+        subject_breakdown = self._get_features()['subject_breakdown']
+        
+        if self.review_queue is not None:
+            self.review_queue.add_many(subject_breakdown)
+            item = self.review_queue.next_due()
+            if item is not None:
+                return item['name']
         
         if not subject_breakdown:
             return None
@@ -98,9 +148,10 @@ class StudyRecommender:
         least_studied = min(subject_breakdown.items(), key=lambda x: x[1])
         return least_studied[0]
     
+    @timed('recommend.session_length')
     def get_optimal_study_time(self):
         """Suggest optimal study duration based on past performance"""
-        stats = self.study_tracker.get_statistics()
+        stats = self._get_features()['stats']
         avg_duration = stats['avg_duration']
         
         if avg_duration == 0:
@@ -0,0 +1,134 @@
+"""
+Reminders Module
+Deadline reminders driven by a single timer set for the next due task
+"""
+
+from datetime import date, datetime, time, timedelta
+from .changefeed import TASK_ADDED
+from .timer import SystemClock
+
+# Longest single wait. The timer is set again after it, so a wait of days
+# doesn't drift with clock changes or suspend, and changes other processes
+# made are picked up within this many seconds when following them.
+MAX_WAIT = 3600
+
+
+def deadline(due_date):
+    """End of a task's due date (YYYY-MM-DD), when it becomes overdue"""
+    return datetime.combine(date.fromisoformat(due_date) + timedelta(days=1), time())
+
+
+class DeadlineReminders:
+    """Calls ``callback(task)`` once for each pending task when its deadline
+    (the end of its due date) is ``lead`` away or has already passed.
+
+    Rather than checking every task on a tick, the scheduler keeps one timer
+    set for the earliest reminder still to send, found with a bisect on the
+    task manager's due index. Reminders go out in due-date order; ``through``
+    is the last due date reminded, so each wake-up only reads the tasks that
+    just came into the window. Tasks added, completed or deleted through the
+    same task manager move the timer at once (via the change feed); with
+    ``follow=True`` the task manager is also reloaded, at most every
+    MAX_WAIT seconds, when other processes have changed tasks, and tasks
+    they added inside the window are reminded then.
+
+    Timers run on the clock's event loop, so start the scheduler and change
+    tasks from the loop's thread.
+    """
+
+    def __init__(self, task_manager, callback, lead=timedelta(days=1), clock=None,
+                 follow=False):
+        self.task_manager = task_manager
+        self.callback = callback
+        self.lead = lead
+        self.clock = clock or SystemClock()
+        self.follow = follow
+        self.through = None     # due date (YYYY-MM-DD) reminded up to
+        self.reminded = set()   # ids of the tasks reminded so far
+        self._handle = None
+        self._unsubscribe = None
+        self._seq = None
+
+    def horizon(self):
+        """Latest due date whose reminder is due now"""
+        return ((self.clock.now() + self.lead).date() - timedelta(days=1)).isoformat()
+
+    def start(self):
+        """Send the reminders already due (missed deadlines included) and set the timer"""
+        if self._unsubscribe is None:
+            self._unsubscribe = self.task_manager.subscribe(self._on_change)
+        if self.follow:
+            self._seq = self.task_manager.changes.last_seq()
+        self._fire()
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _after(self):
+        """First due date not reminded yet (None: all of them)"""
+        if self.through is None:
+            return None
+        return date.fromisoformat(self.through) + timedelta(days=1)
+
+    def _next_task(self):
+        tasks = self.task_manager.get_due_between(self._after(), limit=1)
+        return tasks[0] if tasks else None
+
+    def _remind(self, task):
+        if task['id'] not in self.reminded:
+            self.reminded.add(task['id'])
+            self.callback(task)
+
+    def _fire(self):
+        """Remind the tasks that came into the window since the last wake-up"""
+        self._handle = None
+        if self.follow:
+            seq = self.task_manager.changes.last_seq()
+            if seq != self._seq:
+                self.task_manager.reload()
+                self._seq = seq
+                if self.through is not None:
+                    for task in self.task_manager.get_due_between(
+                            end=date.fromisoformat(self.through)):
+                        self._remind(task)
+        horizon = self.horizon()
+        if self.through is None or horizon > self.through:
+            for task in self.task_manager.get_due_between(self._after(),
+                                                          date.fromisoformat(horizon)):
+                self._remind(task)
+            self.through = horizon
+        self._arm()
+
+    def _arm(self):
+        """Set the timer for the first reminder after ``through``"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        remind_at = self.next_reminder()
+        delay = MAX_WAIT if self.follow else None
+        if remind_at is not None:
+            wait = max((remind_at - self.clock.now()).total_seconds(), 0)
+            delay = min(wait, MAX_WAIT)
+        if delay is not None:
+            self._handle = self.clock.call_later(delay, self._fire)
+
+    def next_reminder(self):
+        """When the next reminder is due, or None if no pending task is dated"""
+        task = self._next_task()
+        return deadline(task['due_date']) - self.lead if task is not None else None
+
+    def _on_change(self, event):
+        if event['type'] == TASK_ADDED and self.through is not None:
+            due_date = event['task']['due_date']
+            if due_date is not None and due_date <= self.through:
+                # Already inside the window: its reminder is due now
+                task = self.task_manager.get_task_by_id(event['task']['id'])
+                if task is not None and not task['completed']:
+                    self._remind(task)
+                return
+        self._arm()
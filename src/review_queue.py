@@ -0,0 +1,242 @@
+"""
+Review Queue Module
+SM-2 spaced-repetition scheduling of study subjects on a due-time heap
+"""
+
+import heapq
+import json
+import os
+from datetime import datetime, timedelta
+from .instrument import note
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+
+def item_key(name):
+    """Case-insensitive key of a review item (subjects match the same way)"""
+    return name.strip().lower()
+
+
+def sm2(item, quality):
+    """Ease, interval (days) and repetition count after a review graded 0-5"""
+    ease, interval, repetitions = item['ease'], item['interval'], item['repetitions']
+    if quality < 3:
+        repetitions, interval = 0, 1
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1
+        elif repetitions == 2:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return round(ease, 4), interval, repetitions
+
+
+class ReviewQueue:
+    """Review items with SM-2 state, ordered by next due time.
+
+    A min-heap holds (due, seq, key) entries. A review pushes a new entry
+    instead of moving the old one, and entries whose seq no longer matches
+    the item are skipped when they reach the top, so finding what is due
+    costs O(log N) and never scans the items. The heap is rebuilt once
+    stale entries outnumber live ones.
+
+    State is persisted as a JSON-lines log of item records, the last record
+    per item winning. Each change appends one line; the log is rewritten
+    from the live items only once it holds ``compact_ratio`` times more
+    lines than there are items.
+    """
+
+    def __init__(self, data_file='data/reviews.jsonl', compact_ratio=2, fsync=True):
+        self.data_file = data_file
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        self.items = {}
+        self._heap = []
+        self._seqs = {}
+        self._next_seq = 0
+        self._lines = 0
+        data_dir = os.path.dirname(data_file)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+        self._load()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, name):
+        return item_key(name) in self.items
+
+    def _load(self):
+        """Replay the log, truncating a torn last line"""
+        if not os.path.exists(self.data_file):
+            return
+        good_offset = 0
+        with open(self.data_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record.get('deleted'):
+                    self.items.pop(record['key'], None)
+                else:
+                    self.items[record['key']] = record
+                good_offset += len(line)
+                self._lines += 1
+        note(bytes_read=good_offset, records=len(self.items))
+        if good_offset < os.path.getsize(self.data_file):
+            with open(self.data_file, 'r+b') as f:
+                f.truncate(good_offset)
+
+        for key in self.items:
+            self._seqs[key] = self._next_seq
+            self._heap.append((self.items[key]['due'], self._next_seq, key))
+            self._next_seq += 1
+        heapq.heapify(self._heap)
+
+    def _append(self, records):
+        """Persist changed items with one write"""
+        text = ''.join(json.dumps(r) + '\n' for r in records)
+        note(bytes_written=len(text))
+        with open(self.data_file, 'a') as f:
+            f.write(text)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._lines += len(records)
+        if self._lines > self.compact_ratio * max(len(self.items), 1000):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with one line per live item"""
+        tmp_file = self.data_file + '.tmp'
+        text = ''.join(json.dumps(item) + '\n' for item in self.items.values())
+        note(bytes_written=len(text))
+        with open(tmp_file, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+        self._lines = len(self.items)
+
+    def _push(self, item):
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seqs[item['key']] = seq
+        heapq.heappush(self._heap, (item['due'], seq, item['key']))
+        if len(self._heap) > 2 * len(self.items) + 64:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(self.items[key]['due'], seq, key) for key, seq in self._seqs.items()]
+        heapq.heapify(self._heap)
+
+    def _live(self, entry):
+        return self._seqs.get(entry[2]) == entry[1]
+
+    @staticmethod
+    def _timestamp(moment):
+        return moment.isoformat(timespec='seconds')
+
+    def get(self, name):
+        """Review state of an item, or None"""
+        return self.items.get(item_key(name))
+
+    def add_many(self, names, now=None):
+        """Add items that aren't in the queue yet, due immediately.
+
+        Returns the newly added items.
+        """
+        due = self._timestamp(now or datetime.now())
+        added = []
+        for name in names:
+            key = item_key(name)
+            if not key or key in self.items:
+                continue
+            item = {
+                'key': key,
+                'name': name.strip(),
+                'ease': DEFAULT_EASE,
+                'interval': 0,
+                'repetitions': 0,
+                'due': due,
+                'last_review': None
+            }
+            self.items[key] = item
+            self._push(item)
+            added.append(item)
+        if added:
+            self._append(added)
+        return added
+
+    def add(self, name, now=None):
+        """Add one item; returns it (or the existing item of that name)"""
+        self.add_many([name], now)
+        return self.get(name)
+
+    def remove(self, name):
+        """Drop an item from the queue"""
+        key = item_key(name)
+        if key not in self.items:
+            return False
+        del self.items[key]
+        del self._seqs[key]
+        self._append([{'key': key, 'deleted': True}])
+        return True
+
+    def review(self, name, quality, now=None):
+        """Record a review graded 0 (blackout) to 5 (perfect) and reschedule it"""
+        if not isinstance(quality, int) or not 0 <= quality <= 5:
+            raise ValueError("quality must be an integer from 0 to 5")
+        item = self.get(name)
+        if item is None:
+            item = self.add(name, now)
+        now = now or datetime.now()
+        ease, interval, repetitions = sm2(item, quality)
+        item.update({
+            'ease': ease,
+            'interval': interval,
+            'repetitions': repetitions,
+            'due': self._timestamp(now + timedelta(days=interval)),
+            'last_review': self._timestamp(now)
+        })
+        self._push(item)
+        self._append([item])
+        return item
+
+    def next_due(self, now=None):
+        """The most overdue item, or None if nothing is due yet"""
+        heap = self._heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+        if heap and heap[0][0] <= self._timestamp(now or datetime.now()):
+            return self.items[heap[0][2]]
+        return None
+
+    def due(self, now=None, limit=None):
+        """Items due by ``now``, most overdue first"""
+        cutoff = self._timestamp(now or datetime.now())
+        heap = self._heap
+        taken = []
+        items = []
+        while heap and (limit is None or len(items) < limit):
+            entry = heapq.heappop(heap)
+            if not self._live(entry):
+                continue
+            taken.append(entry)
+            if entry[0] > cutoff:
+                break
+            items.append(self.items[entry[2]])
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return items
+
+    def upcoming(self, limit=10):
+        """The next ``limit`` items by due time, due or not"""
+        return self.due(datetime.max, limit)
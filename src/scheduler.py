@@ -0,0 +1,330 @@
+"""
+Scheduler Module
+Deadline-aware day-by-day study plans over pending tasks
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from .storage import priority_rank
+
+# Estimated minutes of work per task when no estimate is given
+DEFAULT_EFFORT = {'High': 180, 'Medium': 120, 'Low': 60}
+NO_DEADLINE = '9999-12-31'
+
+
+class StudyScheduler:
+    """Deadline-aware study plan packed into the daily study time.
+
+    Tasks with a due date are worked on earliest deadline first, split into
+    sessions of at most ``session_minutes`` that fill the minutes available
+    each day. When the work due by some date doesn't fit in the time before
+    it, the least important tasks (lowest priority, then largest) are
+    deferred until it does (Moore-Hodgson), so one overloaded week doesn't
+    make every later task late as well. Deferred tasks are reported as
+    infeasible and planned after the on-time work, followed by undated tasks.
+
+    The plan is kept as the sorted task order plus running totals of the
+    planned work, so adding, changing or removing one task only redoes the
+    pass from that task's position onwards (or from the first deferred task,
+    if that comes earlier).
+    """
+
+    def __init__(self, tasks=(), session_minutes=45, daily_minutes=120,
+                 start=None, efforts=None):
+        if isinstance(daily_minutes, int):
+            daily_minutes = [daily_minutes] * 7
+        if len(daily_minutes) != 7 or sum(daily_minutes) <= 0:
+            raise ValueError("daily_minutes must be one value or seven (Monday first), "
+                             "with some time available")
+        if session_minutes <= 0:
+            raise ValueError("session_minutes must be positive")
+        self.session_minutes = session_minutes
+        self.daily_minutes = list(daily_minutes)
+        self.start = start or date.today()
+        self.efforts = efforts or {}
+        self.tasks = {}
+        self.order = []          # (due date, priority rank, seq, id), sorted
+        self.deferred = set()    # ids of tasks that can't be done on time
+        self.totals = []         # on-time work planned once each position is passed
+        self.ends = []           # minute of work at which each task is finished
+        self._keys = {}
+        self._effort = {}
+        self._seqs = {}          # id -> arrival order, kept across re-plans
+        self._next_seq = 0
+        self._valid = 0          # positions before this one are unaffected by changes
+        self._first_deferred = 0
+        self._capacity = [0]     # minutes available before the start of each day
+        self._deadlines = {}     # due date -> minutes available by then
+        self._load(tasks)
+
+    @classmethod
+    def from_manager(cls, task_manager, recommender=None, **options):
+        """Plan a TaskManager's pending tasks, using the recommender's
+        optimal study time as the session length when one is given"""
+        if recommender is not None and 'session_minutes' not in options:
+            options['session_minutes'] = recommender.get_optimal_study_time()
+        return cls(task_manager.get_all_tasks(), **options)
+
+    def _effort_of(self, task):
+        return (self.efforts.get(task['id']) or task.get('estimated_minutes')
+                or DEFAULT_EFFORT.get(task['priority'], 60))
+
+    def _key(self, task):
+        seq = self._seqs.get(task['id'])
+        if seq is None:
+            seq = self._seqs[task['id']] = self._next_seq
+            self._next_seq += 1
+        return (task['due_date'] or NO_DEADLINE, priority_rank(task['priority']),
+                seq, task['id'])
+
+    def _load(self, tasks):
+        """Plan many tasks with one sort"""
+        for task in tasks:
+            if task['completed']:
+                continue
+            key = self._key(task)
+            self.tasks[task['id']] = task
+            self._keys[task['id']] = key
+            self._effort[task['id']] = self._effort_of(task)
+            self.order.append(key)
+        self.order.sort()
+        self.totals = [0] * len(self.order)
+        self.ends = [0] * len(self.order)
+        self._valid = 0
+
+    def _remove(self, task_id):
+        key = self._keys.pop(task_id)
+        position = bisect_left(self.order, key)
+        del self.order[position]
+        del self.totals[position]
+        del self.ends[position]
+        del self.tasks[task_id]
+        del self._effort[task_id]
+        self.deferred.discard(task_id)
+        self._valid = min(self._valid, position)
+
+    def update_task(self, task):
+        """Add, re-plan or (once completed) drop one task"""
+        if task['id'] in self._keys:
+            self._remove(task['id'])
+        if task['completed']:
+            return
+        key = self._key(task)
+        position = bisect_left(self.order, key)
+        self.order.insert(position, key)
+        self.totals.insert(position, 0)
+        self.ends.insert(position, 0)
+        self.tasks[task['id']] = task
+        self._keys[task['id']] = key
+        self._effort[task['id']] = self._effort_of(task)
+        self._valid = min(self._valid, position)
+
+    def remove_task(self, task_id):
+        """Drop a deleted task from the plan"""
+        if task_id in self._keys:
+            self._remove(task_id)
+        self._seqs.pop(task_id, None)
+
+    def _deferral_key(self, position):
+        """Heap key that puts the least important task first"""
+        key = self.order[position]
+        return (-key[1], -self._effort[key[3]], -position)
+
+    def _refresh(self):
+        """Redo the deadline pass from the first position that can have changed"""
+        count = len(self.order)
+        start = min(self._valid, self._first_deferred)
+        if start >= count:
+            return
+
+        # Nothing before ``start`` was deferred, so the pass can resume from
+        # its running total there
+        for position in range(start, count):
+            self.deferred.discard(self.order[position][3])
+        total = self.totals[start - 1] if start else 0
+        heap = None
+        first_deferred = count
+        for position in range(start, count):
+            due_date, _, _, task_id = self.order[position]
+            if due_date == NO_DEADLINE:
+                self.totals[position] = total
+                continue
+            effort = self._effort[task_id]
+            available = self._available_by(due_date)
+            total += effort
+            if total > available and effort > available:
+                # Late whatever else is dropped: don't defer other work for it
+                total -= effort
+                self.deferred.add(task_id)
+                first_deferred = min(first_deferred, position)
+            elif total > available:
+                if heap is None:
+                    heap = [self._deferral_key(p) for p in range(position)
+                            if self.order[p][0] != NO_DEADLINE
+                            and self.order[p][3] not in self.deferred]
+                    heapq.heapify(heap)
+                heapq.heappush(heap, self._deferral_key(position))
+                while total > available:
+                    _, minus_effort, minus_position = heapq.heappop(heap)
+                    total += minus_effort
+                    self.deferred.add(self.order[-minus_position][3])
+                    first_deferred = min(first_deferred, -minus_position)
+            elif heap is not None:
+                heapq.heappush(heap, self._deferral_key(position))
+            self.totals[position] = total
+
+        # Finish times: on-time work in deadline order, then deferred and
+        # undated tasks. Deferring can reach back before ``start``.
+        begin = min(start, first_deferred)
+        end = self.totals[begin - 1] if begin else 0
+        for position in range(begin, count):
+            due_date, _, _, task_id = self.order[position]
+            if due_date != NO_DEADLINE and task_id not in self.deferred:
+                end += self._effort[task_id]
+                self.ends[position] = end
+        undated = bisect_left(self.order, (NO_DEADLINE,))
+        for position in self._late_positions(min(begin, undated)):
+            total += self._effort[self.order[position][3]]
+            self.ends[position] = total
+
+        self._valid = count
+        self._first_deferred = first_deferred
+
+    def _late_positions(self, start=0):
+        """Positions of deferred and undated tasks from ``start``, in plan order"""
+        for position in range(start, len(self.order)):
+            due_date, _, _, task_id = self.order[position]
+            if due_date == NO_DEADLINE or task_id in self.deferred:
+                yield position
+
+    def _sequence(self):
+        """Positions in the order the tasks are worked on"""
+        for position, (due_date, _, _, task_id) in enumerate(self.order):
+            if due_date != NO_DEADLINE and task_id not in self.deferred:
+                yield position
+        yield from self._late_positions()
+
+    def _extend_days(self, days):
+        """Make sure capacity is known for the first ``days`` days"""
+        capacity = self._capacity
+        weekday = self.start.weekday()
+        while len(capacity) <= days:
+            day = len(capacity) - 1
+            capacity.append(capacity[-1] + self.daily_minutes[(weekday + day) % 7])
+
+    def _extend_minutes(self, minutes):
+        """Make sure capacity covers ``minutes`` of work"""
+        while self._capacity[-1] < minutes:
+            self._extend_days(len(self._capacity) + 31)
+
+    def _available_by(self, due_date):
+        """Minutes available from the start date through the end of due_date"""
+        available = self._deadlines.get(due_date)
+        if available is None:
+            days = (date.fromisoformat(due_date) - self.start).days + 1
+            available = 0
+            if days > 0:
+                self._extend_days(days)
+                available = self._capacity[days]
+            self._deadlines[due_date] = available
+        return available
+
+    def _day_of(self, minute):
+        """Index of the day in which the given minute of work is done"""
+        self._extend_minutes(minute + 1)
+        return bisect_right(self._capacity, minute) - 1
+
+    def _date(self, day):
+        return (self.start + timedelta(days=day)).isoformat()
+
+    def _plan(self, position):
+        task_id = self.order[position][3]
+        task = self.tasks[task_id]
+        end = self.ends[position]
+        start = end - self._effort[task_id]
+        missing = 0
+        if task['due_date']:
+            missing = max(0, end - self._available_by(task['due_date']))
+        return {
+            'task_id': task_id,
+            'title': task['title'],
+            'priority': task['priority'],
+            'due_date': task['due_date'],
+            'minutes': end - start,
+            'start_date': self._date(self._day_of(start)),
+            'finish_date': self._date(self._day_of(end - 1)),
+            'feasible': task_id not in self.deferred,
+            'missing_minutes': missing
+        }
+
+    def plan_for(self, task_id):
+        """Where one task lands in the plan, or None if it isn't planned"""
+        key = self._keys.get(task_id)
+        if key is None:
+            return None
+        self._refresh()
+        return self._plan(bisect_left(self.order, key))
+
+    def plans(self):
+        """Plan entries for every task, in the order they are worked on"""
+        self._refresh()
+        return [self._plan(position) for position in self._sequence()]
+
+    def infeasible(self):
+        """Tasks that cannot be finished by their due date, earliest due first"""
+        self._refresh()
+        return [self._plan(position) for position in self._late_positions()
+                if self.order[position][3] in self.deferred]
+
+    def calendar(self, days=None):
+        """Day-by-day study sessions, up to the last planned day or ``days`` days.
+
+        Each day is a dict with its date, the minutes available and a list
+        of sessions (task id, title and minutes).
+        """
+        self._refresh()
+        total = max(self.ends, default=0)
+        last_day = self._day_of(total - 1) + 1 if total else 0
+        if days is not None:
+            last_day = min(last_day, days)
+        self._extend_days(last_day)
+
+        calendar = [{
+            'date': self._date(day),
+            'available': self._capacity[day + 1] - self._capacity[day],
+            'sessions': []
+        } for day in range(last_day)]
+
+        minute, day = 0, 0
+        for position in self._sequence():
+            if day >= last_day:
+                break
+            task = self.tasks[self.order[position][3]]
+            remaining = self._effort[task['id']]
+            while remaining and day < last_day:
+                room = self._capacity[day + 1] - minute
+                if room <= 0:
+                    day += 1
+                    continue
+                length = min(self.session_minutes, remaining, room)
+                calendar[day]['sessions'].append({
+                    'task_id': task['id'],
+                    'title': task['title'],
+                    'minutes': length
+                })
+                minute += length
+                remaining -= length
+        return calendar
+
+    def summary(self):
+        """Totals for the whole plan"""
+        self._refresh()
+        total = max(self.ends, default=0)
+        return {
+            'tasks': len(self.order),
+            'minutes': total,
+            'session_minutes': self.session_minutes,
+            'finish_date': self._date(self._day_of(total - 1)) if total else None,
+            'infeasible': len(self.deferred)
+        }
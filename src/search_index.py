@@ -0,0 +1,127 @@
+"""
+Search Index Module
+Inverted index with case-folded tokens and prefix matching
+"""
+
+import json
+import os
+import re
+from bisect import bisect_left, insort
+from .fileio import atomic_write_json, file_stamp
+
+TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Case-folded word tokens of a text"""
+    return TOKEN.findall(text.casefold()) if text else []
+
+
+class SearchIndex:
+    """Token -> document ids, plus the sorted vocabulary for prefix lookups.
+
+    Every query term matches as a prefix ("alg" finds "algebra") and a
+    document must match all terms. Documents are removed by re-tokenizing
+    their text, so the index never stores per-document token lists.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = []
+
+    def add(self, doc_id, text):
+        """Index one document"""
+        for token in set(tokenize(text)):
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = set()
+                insort(self.vocabulary, token)
+            docs.add(doc_id)
+
+    def add_many(self, documents):
+        """Index (doc_id, text) pairs, re-sorting the vocabulary at most once"""
+        postings = self.postings
+        new_tokens = []
+        for doc_id, text in documents:
+            for token in set(tokenize(text)):
+                docs = postings.get(token)
+                if docs is None:
+                    docs = postings[token] = set()
+                    new_tokens.append(token)
+                docs.add(doc_id)
+        if len(new_tokens) * 8 > len(self.vocabulary):
+            self.vocabulary = sorted(postings)
+        else:
+            for token in new_tokens:
+                insort(self.vocabulary, token)
+
+    def remove(self, doc_id, text):
+        """Drop a document indexed with ``text``"""
+        for token in set(tokenize(text)):
+            docs = self.postings.get(token)
+            if docs is None:
+                continue
+            docs.discard(doc_id)
+            if not docs:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def _matching(self, prefix):
+        """Ids of documents containing a token that starts with ``prefix``
+        (may be an index posting set: don't modify it)"""
+        vocabulary = self.vocabulary
+        matches = []
+        position = bisect_left(vocabulary, prefix)
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            matches.append(self.postings[vocabulary[position]])
+            position += 1
+        if len(matches) == 1:
+            return matches[0]
+        return set().union(*matches)
+
+    def search(self, query):
+        """Ids of documents matching every term of ``query`` (as prefixes)"""
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not terms:
+            return set()
+        result = None
+        for term in terms:
+            matches = self._matching(term)
+            result = set(matches) if result is None else result & matches
+            if not result:
+                break
+        return result
+
+    def save(self, path, source_file, stamp=None):
+        """Write the index, tagged with the state of its source file it was
+        built from (``stamp``, a file_stamp; default: the current one)"""
+        if stamp is None:
+            stamp = file_stamp(source_file)
+        atomic_write_json(path, {
+            'source': list(stamp or ()),
+            'postings': {token: list(docs) for token, docs in self.postings.items()}
+        })
+
+    @classmethod
+    def load(cls, path, source_file, stamp=None):
+        """Read a saved index, or return None if it is missing or was built
+        from another state of the source file than ``stamp`` (default: the
+        current one)"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stamp is None:
+            stamp = file_stamp(source_file)
+        if data.get('source') != list(stamp or ()):
+            return None
+        index = cls()
+        index.postings = {token: set(docs) for token, docs in data['postings'].items()}
+        index.vocabulary = sorted(index.postings)
+        return index
+
+
+def index_path(data_file):
+    """Where the search index for a data file is saved"""
+    return os.path.splitext(data_file)[0] + '.search.json'
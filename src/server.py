@@ -0,0 +1,336 @@
+"""
+Planner Server Module
+Multi-user JSON HTTP API over per-user TaskManager / StudyTracker instances
+"""
+
+import json
+import os
+import re
+import threading
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from .instrument import measure
+from .task_manager import TaskManager
+from .study_tracker import StudyTracker
+from .recommender import StudyRecommender
+from .review_queue import ReviewQueue
+from .utils import parse_due_date
+
+USER_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class UserPlanner:
+    """One user's components, loaded on first use, plus the lock that serializes access"""
+
+    def __init__(self, user_dir, storage='json'):
+        self.user_dir = user_dir
+        self.storage = storage
+        self.lock = threading.RLock()
+        self.refs = 0
+        self.loaded = False
+
+    def load(self):
+        """Read the user's files; call with ``lock`` held"""
+        task_storage = 'sqlite' if self.storage == 'sqlite' else 'json'
+        self.task_manager = TaskManager(os.path.join(self.user_dir, 'tasks.json'),
+                                        storage=task_storage)
+        self.study_tracker = StudyTracker(os.path.join(self.user_dir, 'study_sessions.json'),
+                                          storage=self.storage)
+        self.review_queue = ReviewQueue(os.path.join(self.user_dir, 'reviews.jsonl'))
+        self.recommender = StudyRecommender(self.study_tracker, self.review_queue)
+        self.loaded = True
+
+    def close(self):
+        if self.loaded:
+            self.task_manager.close()
+            self.study_tracker.close()
+
+
+class PlannerPool:
+    """Bounded LRU pool of loaded per-user planners.
+
+    Entries in use by a request are pinned by a reference count and never
+    evicted, so two requests for the same user always share one planner
+    and one lock. The pool lock only covers the bookkeeping: a user's files
+    are read under that user's lock, so a slow load holds up requests for
+    that user alone.
+    """
+
+    def __init__(self, data_dir='data/users', capacity=128, storage='json'):
+        self.data_dir = data_dir
+        self.capacity = capacity
+        self.storage = storage
+        self._planners = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def _evict(self):
+        """Drop least recently used idle planners until within capacity"""
+        for user_id in list(self._planners):
+            if len(self._planners) <= self.capacity:
+                break
+            planner = self._planners[user_id]
+            if planner.refs == 0:
+                del self._planners[user_id]
+                planner.close()
+                self.evictions += 1
+
+    @contextmanager
+    def user(self, user_id):
+        """Hold a user's planner and lock for the duration of a request"""
+        if not USER_ID.match(user_id):
+            raise ValueError(f"invalid user id '{user_id}'")
+
+        with self._lock:
+            planner = self._planners.get(user_id)
+            if planner is None:
+                # Just a placeholder; the files are read below, outside the pool lock
+                planner = UserPlanner(os.path.join(self.data_dir, user_id), self.storage)
+                self._planners[user_id] = planner
+                self.loads += 1
+            self._planners.move_to_end(user_id)
+            planner.refs += 1
+            self._evict()
+
+        try:
+            with planner.lock:
+                if not planner.loaded:
+                    try:
+                        planner.load()
+                    except BaseException:
+                        # Don't keep a half-loaded planner; the next request retries
+                        with self._lock:
+                            if self._planners.get(user_id) is planner:
+                                del self._planners[user_id]
+                        raise
+                yield planner
+        finally:
+            with self._lock:
+                planner.refs -= 1
+
+    def close(self):
+        with self._lock:
+            for planner in self._planners.values():
+                planner.close()
+            self._planners.clear()
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PlannerRequestHandler(BaseHTTPRequestHandler):
+    """Routes /users/<id>/... requests to the user's planner"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY keep-alive
+    # responses stall on delayed ACKs
+    disable_nagle_algorithm = True
+    server_version = 'SmartStudyPlanner/1.0'
+
+    routes = [
+        ('GET', r'^/users/([^/]+)/tasks$', 'list_tasks'),
+        ('POST', r'^/users/([^/]+)/tasks$', 'add_task'),
+        ('GET', r'^/users/([^/]+)/tasks/due$', 'due_tasks'),
+        ('GET', r'^/users/([^/]+)/tasks/([^/]+)$', 'get_task'),
+        ('POST', r'^/users/([^/]+)/tasks/([^/]+)/complete$', 'complete_task'),
+        ('DELETE', r'^/users/([^/]+)/tasks/([^/]+)$', 'delete_task'),
+        ('GET', r'^/users/([^/]+)/sessions$', 'list_sessions'),
+        ('POST', r'^/users/([^/]+)/sessions$', 'add_session'),
+        ('GET', r'^/users/([^/]+)/stats$', 'stats'),
+        ('GET', r'^/users/([^/]+)/recommendations$', 'recommendations'),
+        ('GET', r'^/users/([^/]+)/reviews$', 'list_reviews'),
+        ('POST', r'^/users/([^/]+)/reviews$', 'add_review'),
+        ('GET', r'^/users/([^/]+)/changes$', 'list_changes'),
+    ]
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        self.query = parse_qs(url.query)
+        try:
+            for route_method, pattern, handler in self.routes:
+                match = re.match(pattern, url.path)
+                if match and route_method == method:
+                    user_id, *params = match.groups()
+                    with measure(f"http.{handler}"), self.server.pool.user(user_id) as planner:
+                        status, body = getattr(self, handler)(planner, *params)
+                    break
+            else:
+                raise HTTPError(404, 'not found')
+        except HTTPError as e:
+            status, body = e.status, {'error': str(e)}
+        except ValueError as e:
+            status, body = 400, {'error': str(e)}
+        except Exception:
+            # Still answer, so a keep-alive client isn't left waiting
+            traceback.print_exc()
+            status, body = 500, {'error': 'internal server error'}
+        self._send(status, body)
+
+    def _send(self, status, body):
+        payload = json.dumps(body, default=dict).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _json_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise HTTPError(400, 'invalid JSON body')
+        if not isinstance(body, dict):
+            raise HTTPError(400, 'expected a JSON object')
+        return body
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    # Handlers run with the user's lock held and return (status, body)
+
+    def list_tasks(self, planner):
+        if self.query.get('high') == ['1']:
+            return 200, planner.task_manager.get_priority_tasks()
+        if self.query.get('sort') == ['urgency']:
+            return 200, planner.task_manager.get_tasks_by_urgency()
+        return 200, planner.task_manager.get_all_tasks()
+
+    def add_task(self, planner):
+        body = self._json_body()
+        title = (body.get('title') or '').strip()
+        if not title:
+            raise HTTPError(400, 'title is required')
+        priority = body.get('priority', 'Medium')
+        if priority not in ('High', 'Medium', 'Low'):
+            raise HTTPError(400, f"invalid priority '{priority}'")
+        try:
+            due_date = parse_due_date(body.get('due_date'))
+        except ValueError:
+            raise HTTPError(400, f"invalid due date '{body.get('due_date')}'")
+        task_id = planner.task_manager.add_task(title, body.get('description', ''),
+                                                priority, due_date)
+        return 201, planner.task_manager.get_task_by_id(task_id)
+
+    def due_tasks(self, planner):
+        days = int(self.query.get('days', ['7'])[0])
+        manager = planner.task_manager
+        return 200, {
+            'overdue': manager.get_overdue(),
+            'due_soon': manager.get_due_within(days),
+            'next_deadline': manager.next_deadline()
+        }
+
+    def get_task(self, planner, task_id):
+        task = planner.task_manager.get_task_by_id(task_id)
+        if task is None:
+            raise HTTPError(404, 'task not found')
+        return 200, task
+
+    def complete_task(self, planner, task_id):
+        if not planner.task_manager.complete_task(task_id):
+            raise HTTPError(404, 'task not found')
+        return 200, planner.task_manager.get_task_by_id(task_id)
+
+    def delete_task(self, planner, task_id):
+        if not planner.task_manager.delete_task(task_id):
+            raise HTTPError(404, 'task not found')
+        return 200, {'id': task_id, 'deleted': True}
+
+    def list_sessions(self, planner):
+        limit = int(self.query.get('limit', ['20'])[0])
+        return 200, planner.study_tracker.get_recent_sessions(limit)
+
+    def add_session(self, planner):
+        body = self._json_body()
+        subject = (body.get('subject') or '').strip()
+        duration = body.get('duration')
+        if not subject:
+            raise HTTPError(400, 'subject is required')
+        if not isinstance(duration, int) or isinstance(duration, bool) or duration <= 0:
+            raise HTTPError(400, 'duration must be a positive number of minutes')
+        return 201, planner.study_tracker.start_session(subject, duration)
+
+    def stats(self, planner):
+        return 200, {
+            'tasks': planner.task_manager.get_statistics(),
+            'study': planner.study_tracker.get_statistics()
+        }
+
+    def recommendations(self, planner):
+        return 200, {
+            'recommendations': planner.recommender.get_recommendations(),
+            'optimal_study_time': planner.recommender.get_optimal_study_time(),
+            'suggested_next_subject': planner.recommender.get_suggested_next_subject()
+        }
+
+    def list_reviews(self, planner):
+        limit = int(self.query.get('limit', ['20'])[0])
+        planner.review_queue.add_many(planner.study_tracker.get_subject_breakdown())
+        if self.query.get('all') == ['1']:
+            return 200, planner.review_queue.upcoming(limit)
+        return 200, planner.review_queue.due(limit=limit)
+
+    def add_review(self, planner):
+        body = self._json_body()
+        subject = (body.get('subject') or '').strip()
+        quality = body.get('quality')
+        if not subject:
+            raise HTTPError(400, 'subject is required')
+        if (not isinstance(quality, int) or isinstance(quality, bool)
+                or not 0 <= quality <= 5):
+            raise HTTPError(400, 'quality must be an integer from 0 to 5')
+        return 201, planner.review_queue.review(subject, quality)
+
+    def list_changes(self, planner):
+        since = int(self.query.get('since', ['0'])[0])
+        limit = int(self.query.get('limit', ['100'])[0])
+        events = planner.task_manager.changes.changes_since(since, limit=limit)
+        return 200, {'events': events, 'next': events[-1]['seq'] if events else since}
+
+
+class PlannerServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one PlannerPool"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, pool, verbose=False):
+        super().__init__(address, PlannerRequestHandler)
+        self.pool = pool
+        self.verbose = verbose
+
+
+def serve(host='127.0.0.1', port=8000, data_dir='data/users', pool_size=128,
+          storage='json', verbose=True):
+    """Run the planner API until interrupted"""
+    pool = PlannerPool(data_dir, capacity=pool_size, storage=storage)
+    server = PlannerServer((host, port), pool, verbose=verbose)
+    print(f"Smart Study Planner API listening on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
@@ -0,0 +1,185 @@
+"""
+Session Log Module
+Append-only write-ahead log with snapshot compaction for study sessions
+"""
+
+import json
+import os
+import threading
+from .fileio import atomic_write_json, read_json_file
+from .instrument import note
+
+
+class SessionLog:
+    """Snapshot file plus an append-only JSON-lines log.
+
+    The snapshot is a plain JSON array (the same format the tracker has
+    always written), so it stays readable by the default storage mode.
+    The log starts with a header line recording how many records the
+    snapshot held when the log was started; every other line is one
+    session. Replay skips log entries already folded into the snapshot,
+    which makes a crash in the middle of compaction harmless.
+
+    Only one process may write to a log. Compaction snapshots the records
+    this process holds and swaps in a new log with os.replace, so sessions
+    another process appended are dropped, and its later appends go to the
+    replaced file and are lost. Other processes may read (replay) it.
+    """
+
+    def __init__(self, snapshot_file, log_file=None, compact_threshold=1000,
+                 fsync=True, background=True):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or snapshot_file + '.log'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.background = background
+        self._lock = threading.Lock()
+        self._compacting = None
+        self._log = None
+        self._base = 0
+        self._tail = []
+
+    def replay(self):
+        """Load the snapshot and apply the log on top of it"""
+        records = self._read_snapshot()
+        base, entries = self._read_log()
+        if base is None:
+            # No log yet: it starts where the snapshot ends
+            base = len(records)
+
+        # Entries below len(records) were already compacted into the snapshot
+        skip = max(0, len(records) - base)
+        if skip and entries and records[base]['start_time'] != entries[0].get('start_time'):
+            # Not a copy of the snapshot: the log was started on an existing
+            # history by a version that headed it with base 0 regardless
+            base = len(records)
+            skip = 0
+        records.extend(entries[skip:])
+
+        self._base = base
+        self._tail = [json.dumps(e) for e in entries]
+        return records
+
+    def _read_snapshot(self):
+        """Read the snapshot file, returning an empty list if absent"""
+        return read_json_file(self.snapshot_file, [])
+
+    def _read_log(self):
+        """Read the log, truncating any torn trailing line; the base is None
+        if the log has no header yet"""
+        if not os.path.exists(self.log_file):
+            return None, []
+
+        base = None
+        entries = []
+        good_offset = 0
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if good_offset == 0 and isinstance(record, dict) and '__base__' in record:
+                    base = record['__base__']
+                else:
+                    entries.append(record)
+                good_offset += len(line)
+        note(bytes_read=good_offset)
+
+        if good_offset < os.path.getsize(self.log_file):
+            # A crash left a partial record behind; drop it
+            with open(self.log_file, 'r+b') as f:
+                f.truncate(good_offset)
+        return base, entries
+
+    def _open_log(self):
+        """Open the log for appending, writing a header if it is new"""
+        if self._log is None:
+            fresh = not os.path.exists(self.log_file) or os.path.getsize(self.log_file) == 0
+            self._log = open(self.log_file, 'a')
+            if fresh:
+                self._write_lines([json.dumps({'__base__': self._base})])
+        return self._log
+
+    def _write_lines(self, lines):
+        """Write lines to the log and make them durable with one fsync"""
+        text = ''.join(line + '\n' for line in lines)
+        self._log.write(text)
+        note(bytes_written=len(text))
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def append(self, session):
+        """Append one session to the log.
+
+        Returns True when the log has grown past the compaction threshold.
+        """
+        return self.append_many([session])
+
+    def append_many(self, sessions):
+        """Append several sessions to the log with a single write"""
+        lines = [json.dumps(session, default=dict) for session in sessions]
+        with self._lock:
+            self._open_log()
+            self._write_lines(lines)
+            self._tail.extend(lines)
+            return len(self._tail) >= self.compact_threshold
+
+    def _write_snapshot(self, records):
+        """Replace the snapshot file with ``records``"""
+        atomic_write_json(self.snapshot_file, records, indent=4, default=dict)
+
+    def _frozen(self, records):
+        """A copy of ``records`` that later appends won't change"""
+        return list(records)
+
+    def compact(self, records):
+        """Fold the log into a fresh snapshot of ``records``"""
+        records = self._frozen(records)
+        count = len(records)
+
+        self._write_snapshot(records)
+
+        with self._lock:
+            # Keep anything appended after the records we just snapshotted
+            kept = self._tail[max(0, count - self._base):]
+            tmp_log = self.log_file + '.tmp'
+            with open(tmp_log, 'w') as f:
+                f.write(json.dumps({'__base__': count}) + '\n')
+                for line in kept:
+                    f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            os.replace(tmp_log, self.log_file)
+            self._base = count
+            self._tail = kept
+
+    def compact_async(self, records):
+        """Compact in a background thread unless one is already running"""
+        if self._compacting is not None and self._compacting.is_alive():
+            return self._compacting
+        self._compacting = threading.Thread(
+            target=self.compact, args=(self._frozen(records),), daemon=True
+        )
+        self._compacting.start()
+        return self._compacting
+
+    def wait(self):
+        """Wait for a running background compaction to finish"""
+        if self._compacting is not None:
+            self._compacting.join()
+            self._compacting = None
+
+    def close(self):
+        """Finish pending compaction and close the log file"""
+        self.wait()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
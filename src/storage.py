@@ -0,0 +1,675 @@
+"""
+Storage Module
+Pluggable persistence backends for tasks and study sessions
+"""
+
+import atexit
+import os
+import threading
+from .fileio import atomic_write_json, file_lock, file_stamp, read_json_file
+from .instrument import measure
+
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+
+def priority_rank(priority):
+    """Sort rank of a priority label (unknown labels sort last)"""
+    return PRIORITY_RANK.get(priority, 3)
+
+
+def sqlite_path(data_file):
+    """Database path used in place of a JSON data file"""
+    return os.path.splitext(data_file)[0] + '.db'
+
+
+def partition_dir(data_file):
+    """Directory of monthly partitions used in place of a JSON data file"""
+    return os.path.splitext(data_file)[0]
+
+
+class JSONStore:
+    """Whole-file JSON persistence; records are kept in memory by the caller.
+
+    Writes go to a temp file that atomically replaces the data file, under an
+    exclusive lock shared with other processes. If the file changed on disk
+    since this store last read or wrote it, the mutation is re-applied on top
+    of the on-disk records instead of overwriting them, and the merged list is
+    returned so the caller can refresh its in-memory copy. Mutations return
+    None when no merge was needed.
+    """
+
+    resident = True
+
+    def __init__(self, data_file, key=None):
+        self.data_file = data_file
+        self.lock_file = data_file + '.lock'
+        self.key = key
+        self._stamp = None
+
+    def load(self):
+        """Load all records from the JSON file"""
+        with file_lock(self.lock_file, exclusive=False):
+            records = read_json_file(self.data_file, [])
+            self._stamp = file_stamp(self.data_file)
+        return records
+
+    def _write(self, records):
+        records = list(records)
+        with measure('json.write') as operation:
+            atomic_write_json(self.data_file, records, indent=4, default=dict)
+            operation.records += len(records)
+        self._stamp = file_stamp(self.data_file)
+
+    def save(self, records):
+        """Rewrite the JSON file with all records"""
+        with file_lock(self.lock_file):
+            self._write(records)
+
+    def _commit(self, records, apply):
+        """Write records, or apply one change to a concurrently modified file"""
+        with file_lock(self.lock_file):
+            if file_stamp(self.data_file) != self._stamp:
+                merged = apply(read_json_file(self.data_file, []))
+                self._write(merged)
+                return merged
+            self._write(records)
+            return None
+
+    # Each change is a function from the on-disk records to the changed records
+
+    def _added(self, new_records):
+        def apply(on_disk):
+            if self.key:
+                known = {r[self.key] for r in on_disk}
+                new = [r for r in new_records if r[self.key] not in known]
+            else:
+                new = list(new_records)
+            return on_disk + new
+        return apply
+
+    def _updated(self, record, records):
+        def apply(on_disk):
+            if not self.key:
+                return list(records)
+            return [record if r[self.key] == record[self.key] else r for r in on_disk]
+        return apply
+
+    def _deleted(self, record, records):
+        def apply(on_disk):
+            if not self.key:
+                return list(records)
+            return [r for r in on_disk if r[self.key] != record[self.key]]
+        return apply
+
+    def add(self, record, records):
+        return self.add_many([record], records)
+
+    def add_many(self, new_records, records):
+        return self._commit(records, self._added(new_records))
+
+    def update(self, record, records):
+        return self._commit(records, self._updated(record, records))
+
+    def delete(self, record, records):
+        return self._commit(records, self._deleted(record, records))
+
+    def compact(self, records):
+        pass
+
+    def close(self):
+        pass
+
+
+class DeferredStore:
+    """Write-behind wrapper that coalesces the writes of a JSONStore.
+
+    Mutations only queue their change. Queued changes are written together
+    once ``max_pending`` of them are waiting, ``max_delay`` seconds after the
+    first one (from a timer thread), on ``flush()`` and at interpreter exit;
+    either limit can be None to disable it. A write that finds the file
+    changed by another process re-applies every queued change on top of it,
+    as an immediate write would. If that happens on the timer thread, the
+    merged list is returned by the next mutation or flush instead.
+    """
+
+    resident = True
+
+    def __init__(self, store, max_delay=2.0, max_pending=100):
+        self.store = store
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.lock = threading.RLock()
+        self.writes = 0
+        self._pending = []
+        self._records = None
+        self._merged = None
+        self._timer = None
+        atexit.register(self.flush)
+
+    @property
+    def dirty(self):
+        """Whether changes are waiting to be written"""
+        return bool(self._pending)
+
+    def load(self):
+        return self.store.load()
+
+    def save(self, records):
+        with self.lock:
+            self._cancel_timer()
+            self._pending = []
+            self._merged = None
+            self.store.save(records)
+            self.writes += 1
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _write_pending(self):
+        """Write every queued change at once; returns the merged list or None"""
+        self._cancel_timer()
+        if not self._pending:
+            return None
+        changes, self._pending = self._pending, []
+
+        def apply(on_disk):
+            for change in changes:
+                on_disk = change(on_disk)
+            return on_disk
+        try:
+            merged = self.store._commit(self._records, apply)
+        except BaseException:
+            self._pending = changes + self._pending
+            raise
+        self.writes += 1
+        return merged
+
+    def _autosave(self):
+        with self.lock, measure('json.autosave'):
+            if self._timer is threading.current_thread():
+                self._timer = None
+            merged = self._write_pending()
+            if merged is not None:
+                self._merged = merged
+
+    def _queue(self, records, change):
+        with self.lock:
+            merged = None
+            if self._merged is not None:
+                # A timer write merged in another process's changes: hand the
+                # caller that list with this change applied as well
+                merged = records = change(self._merged)
+                self._merged = None
+            self._records = records
+            self._pending.append(change)
+
+            if self.max_pending is not None and len(self._pending) >= self.max_pending:
+                written = self._write_pending()
+                return merged if written is None else written
+            if self._timer is None and self.max_delay is not None:
+                self._timer = threading.Timer(self.max_delay, self._autosave)
+                self._timer.daemon = True
+                self._timer.start()
+            return merged
+
+    def add(self, record, records):
+        return self.add_many([record], records)
+
+    def add_many(self, new_records, records):
+        return self._queue(records, self.store._added(new_records))
+
+    def update(self, record, records):
+        return self._queue(records, self.store._updated(record, records))
+
+    def delete(self, record, records):
+        return self._queue(records, self.store._deleted(record, records))
+
+    def flush(self):
+        """Write queued changes now; returns the merged list or None"""
+        with self.lock:
+            merged = self._write_pending()
+            if merged is None:
+                merged, self._merged = self._merged, None
+            return merged
+
+    def detach(self):
+        """Flush and stop deferring; returns the wrapped store"""
+        self.flush()
+        atexit.unregister(self.flush)
+        return self.store
+
+    def compact(self, records):
+        self.flush()
+        self.store.compact(records)
+
+    def close(self):
+        self.detach().close()
+
+
+class LogSessionStore(JSONStore):
+    """JSON snapshot plus append-only session log (see SessionLog).
+
+    Supports a single writer process: unlike JSONStore, appends and
+    compaction don't coordinate with other processes.
+    """
+
+    def __init__(self, data_file, compact_threshold=1000):
+        super().__init__(data_file)
+        self.log = self._open_log(data_file, compact_threshold)
+
+    def _open_log(self, data_file, compact_threshold):
+        from .session_log import SessionLog
+        return SessionLog(data_file, compact_threshold=compact_threshold)
+
+    def load(self):
+        return self.log.replay()
+
+    def save(self, records):
+        self.compact(records)
+
+    def add(self, record, records):
+        self.add_many([record], records)
+
+    def add_many(self, new_records, records):
+        if self.log.append_many(new_records):
+            if self.log.background:
+                self.log.compact_async(records)
+            else:
+                self.compact(records)
+        return None
+
+    def compact(self, records):
+        self.log.wait()
+        self.log.compact(records)
+
+    def close(self):
+        self.log.close()
+
+
+class BinarySessionStore(LogSessionStore):
+    """Memory-mapped binary session file plus append-only session log.
+
+    Loading maps the file instead of parsing it, and yields a columnar
+    session list (see binary_sessions); new sessions go to the JSON-lines
+    log and are folded into a rewritten binary file on compaction.
+    """
+
+    def __init__(self, data_file, compact_threshold=1000):
+        from .binary_sessions import binary_path
+        super().__init__(binary_path(data_file), compact_threshold=compact_threshold)
+
+    def _open_log(self, data_file, compact_threshold):
+        from .binary_sessions import BinarySessionLog
+        return BinarySessionLog(data_file, compact_threshold=compact_threshold)
+
+
+class SQLiteStore:
+    """Shared connection handling for the SQLite backends"""
+
+    resident = False
+    schema = ''
+
+    def __init__(self, db_file):
+        # Imported here so the default JSON backend doesn't pay for sqlite3 at startup
+        import sqlite3
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.schema)
+        self.conn.commit()
+
+    def load(self):
+        """Records stay in the database; nothing is loaded up front"""
+        return []
+
+    def compact(self, records=None):
+        self.conn.execute('VACUUM')
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteTaskStore(SQLiteStore):
+    """Tasks in an indexed SQLite table"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            title TEXT,
+            description TEXT,
+            priority TEXT,
+            priority_rank INTEGER,
+            due_date TEXT,
+            created_at TEXT,
+            completed INTEGER NOT NULL DEFAULT 0,
+            completed_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_order
+            ON tasks (completed, priority_rank, seq);
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority
+            ON tasks (priority, completed);
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_deadline
+            ON tasks (completed, due_date, priority_rank);
+    """
+
+    columns = ('id', 'title', 'description', 'priority', 'due_date',
+               'created_at', 'completed', 'completed_at')
+
+    def _row_to_task(self, row):
+        task = {key: row[key] for key in self.columns}
+        task['completed'] = bool(task['completed'])
+        return task
+
+    def _values(self, task):
+        return (task['id'], task['title'], task['description'],
+                task['priority'], priority_rank(task['priority']),
+                task['due_date'], task['created_at'],
+                int(bool(task['completed'])), task['completed_at'])
+
+    def add(self, task, records=None):
+        self.add_many([task])
+
+    def add_many(self, tasks, records=None):
+        """Insert several tasks in one transaction"""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO tasks (id, title, description, priority, priority_rank, '
+                'due_date, created_at, completed, completed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [self._values(t) for t in tasks]
+            )
+
+    def update(self, task, records=None):
+        with self.conn:
+            self.conn.execute(
+                'UPDATE tasks SET title = ?, description = ?, priority = ?, '
+                'priority_rank = ?, due_date = ?, completed = ?, completed_at = ? '
+                'WHERE id = ?',
+                (task['title'], task['description'], task['priority'],
+                 priority_rank(task['priority']), task['due_date'],
+                 int(bool(task['completed'])), task['completed_at'], task['id'])
+            )
+
+    def delete(self, task, records=None):
+        with self.conn:
+            self.conn.execute('DELETE FROM tasks WHERE id = ?', (task['id'],))
+
+    def get(self, task_id):
+        """Look up one task by id"""
+        row = self.conn.execute(
+            'SELECT * FROM tasks WHERE id = ?', (task_id,)
+        ).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def iter_tasks(self):
+        """Iterate tasks in insertion order"""
+        for row in self.conn.execute('SELECT * FROM tasks ORDER BY seq'):
+            yield self._row_to_task(row)
+
+    def ordered_tasks(self):
+        """All tasks ordered by completion status, then priority"""
+        rows = self.conn.execute(
+            'SELECT * FROM tasks ORDER BY completed, priority_rank, '
+            'CASE WHEN completed THEN completed_at END, seq'
+        )
+        return [self._row_to_task(row) for row in rows]
+
+    def priority_tasks(self):
+        """Pending high priority tasks"""
+        rows = self.conn.execute(
+            "SELECT * FROM tasks WHERE priority = 'High' AND completed = 0 ORDER BY seq"
+        )
+        return [self._row_to_task(row) for row in rows]
+
+    def urgency_ordered_tasks(self):
+        """All tasks, pending ones by due date (undated last), then completed ones"""
+        rows = self.conn.execute(
+            "SELECT * FROM tasks ORDER BY completed, "
+            "CASE WHEN completed = 0 THEN COALESCE(due_date, '9999-12-31') END, "
+            "priority_rank, CASE WHEN completed THEN completed_at ELSE created_at END, seq"
+        )
+        return [self._row_to_task(row) for row in rows]
+
+    def due_tasks(self, start=None, end=None, limit=None, before=None):
+        """Pending tasks due from ``start`` through ``end`` (or before ``before``),
+        earliest deadline then highest priority first"""
+        conditions = ['completed = 0', 'due_date IS NOT NULL']
+        params = []
+        for clause, value in (('due_date >= ?', start), ('due_date <= ?', end),
+                              ('due_date < ?', before)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        query = (f"SELECT * FROM tasks WHERE {' AND '.join(conditions)} "
+                 "ORDER BY due_date, priority_rank, created_at, seq")
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        return [self._row_to_task(row) for row in self.conn.execute(query, params)]
+
+    def statistics(self):
+        """Counts used by TaskManager.get_statistics"""
+        row = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(completed), 0), "
+            "COALESCE(SUM(priority = 'High'), 0) FROM tasks"
+        ).fetchone()
+        return row[0], row[1], row[2]
+
+
+class SQLiteSessionStore(SQLiteStore):
+    """Study sessions in an indexed SQLite table"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT,
+            subject_key TEXT,
+            planned_duration INTEGER,
+            actual_duration INTEGER,
+            start_time TEXT,
+            date TEXT,
+            completed INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_subject ON sessions (subject_key);
+        CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions (date);
+        CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions (start_time);
+    """
+
+    columns = ('subject', 'planned_duration', 'actual_duration',
+               'start_time', 'date', 'completed')
+
+    def _row_to_session(self, row):
+        session = {key: row[key] for key in self.columns}
+        session['completed'] = bool(session['completed'])
+        return session
+
+    def _values(self, session):
+        return (session['subject'], session['subject'].lower(),
+                session['planned_duration'], session['actual_duration'],
+                session['start_time'], session['date'],
+                int(bool(session.get('completed', True))))
+
+    def add(self, session, records=None):
+        self.add_many([session])
+
+    def add_many(self, sessions, records=None):
+        """Insert several sessions in one transaction"""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO sessions (subject, subject_key, planned_duration, '
+                'actual_duration, start_time, date, completed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [self._values(s) for s in sessions]
+            )
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def iter_sessions(self):
+        """Iterate sessions in insertion order without loading them all"""
+        for row in self.conn.execute('SELECT * FROM sessions ORDER BY seq'):
+            yield self._row_to_session(row)
+
+    def sessions_by_subject(self, subject):
+        """Sessions for a subject, matched case-insensitively"""
+        rows = self.conn.execute(
+            'SELECT * FROM sessions WHERE subject_key = ? ORDER BY seq',
+            (subject.lower(),)
+        )
+        return [self._row_to_session(row) for row in rows]
+
+    def sessions_on(self, date):
+        """Sessions recorded on a YYYY-MM-DD date"""
+        rows = self.conn.execute(
+            'SELECT * FROM sessions WHERE date = ? ORDER BY seq', (date,)
+        )
+        return [self._row_to_session(row) for row in rows]
+
+    def sessions_between(self, start, end):
+        """Sessions with start <= start_time < end, oldest first"""
+        rows = self.conn.execute(
+            'SELECT * FROM sessions WHERE start_time >= ? AND start_time < ? '
+            'ORDER BY start_time, seq',
+            (start, end)
+        )
+        return [self._row_to_session(row) for row in rows]
+
+    def recent(self, limit):
+        """Newest sessions by start time"""
+        rows = self.conn.execute(
+            'SELECT * FROM sessions ORDER BY start_time DESC, seq LIMIT ?',
+            (limit,)
+        )
+        return [self._row_to_session(row) for row in rows]
+
+    def totals(self):
+        """Session count and total minutes"""
+        row = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(actual_duration), 0) FROM sessions'
+        ).fetchone()
+        return row[0], row[1]
+
+    def subject_totals(self):
+        """(subject, minutes, count) rows in order of first appearance"""
+        rows = self.conn.execute(
+            'SELECT subject, SUM(actual_duration), COUNT(*) FROM sessions '
+            'GROUP BY subject ORDER BY MIN(seq)'
+        )
+        return [(row[0], row[1], row[2]) for row in rows]
+
+
+def defer_writes(store, max_delay=2.0, max_pending=100):
+    """Wrap a JSON store so its writes are coalesced (see DeferredStore)"""
+    if type(store) is not JSONStore:
+        raise ValueError("Write-behind mode is only supported by the json storage mode")
+    return DeferredStore(store, max_delay=max_delay, max_pending=max_pending)
+
+
+def open_task_store(storage, data_file):
+    """Create the task store for a storage mode"""
+    if storage == 'json':
+        return JSONStore(data_file, key='id')
+    if storage == 'sqlite':
+        return SQLiteTaskStore(sqlite_path(data_file))
+    raise ValueError(f"Unknown storage mode: {storage}")
+
+
+def open_session_store(storage, data_file, compact_threshold=1000):
+    """Create the session store for a storage mode; the log, binary and
+    partitioned backends are imported only when they are used"""
+    if storage == 'json':
+        return JSONStore(data_file)
+    if storage == 'log':
+        return LogSessionStore(data_file, compact_threshold=compact_threshold)
+    if storage == 'binary':
+        return BinarySessionStore(data_file, compact_threshold=compact_threshold)
+    if storage == 'sqlite':
+        return SQLiteSessionStore(sqlite_path(data_file))
+    if storage == 'partitioned':
+        from .partitions import PartitionedSessionStore
+        return PartitionedSessionStore(partition_dir(data_file))
+    raise ValueError(f"Unknown storage mode: {storage}")
+
+
+def migrate_json_to_sqlite(tasks_file='data/tasks.json',
+                           sessions_file='data/study_sessions.json'):
+    """Copy the JSON task and session files into their SQLite databases"""
+    tasks = JSONStore(tasks_file, key='id').load()
+    # Replaying through the log store also picks up an uncompacted session log
+    sessions = LogSessionStore(sessions_file).load()
+
+    task_store = SQLiteTaskStore(sqlite_path(tasks_file))
+    session_store = SQLiteSessionStore(sqlite_path(sessions_file))
+    try:
+        known = {row[0] for row in task_store.conn.execute('SELECT id FROM tasks')}
+        task_store.add_many([t for t in tasks if t['id'] not in known])
+        if session_store.count() == 0:
+            session_store.add_many(sessions)
+    finally:
+        task_store.close()
+        session_store.close()
+
+    return len(tasks), len(sessions)
+
+
+def migrate_json_to_partitions(sessions_file='data/study_sessions.json'):
+    """Split the JSON session file into monthly partitions"""
+    from .partitions import PartitionedSessionStore
+    sessions = LogSessionStore(sessions_file).load()
+    store = PartitionedSessionStore(partition_dir(sessions_file))
+    if store.partitions():
+        raise ValueError(f"{store.directory} already contains partitions")
+    store.add_many(sessions)
+    store.subject_totals()
+    store.close()
+    return len(sessions)
+
+
+def migrate_json_to_binary(sessions_file='data/study_sessions.json'):
+    """Write the JSON sessions as a binary session file, checking the round trip"""
+    from .binary_sessions import binary_path, read_sessions, write_sessions
+    sessions = LogSessionStore(sessions_file).load()
+    path = binary_path(sessions_file)
+    if os.path.exists(path):
+        raise ValueError(f"{path} already exists")
+    write_sessions(path, sessions)
+    if read_sessions(path).to_dicts() != sessions:
+        os.remove(path)
+        raise ValueError(f"Sessions in {sessions_file} did not round-trip through {path}")
+    return len(sessions)
+
+
+def migrate_binary_to_json(sessions_file='data/study_sessions.json'):
+    """Rewrite the JSON session file from the binary one (and its log)"""
+    store = BinarySessionStore(sessions_file)
+    sessions = store.load().to_dicts()
+    store.close()
+    atomic_write_json(sessions_file, sessions, indent=4)
+    if read_json_file(sessions_file, []) != sessions:
+        raise ValueError(f"Sessions in {store.data_file} did not round-trip through "
+                         f"{sessions_file}")
+    return len(sessions)
+
+
+if __name__ == '__main__':
+    import sys
+    target = sys.argv[1] if len(sys.argv) > 1 else 'sqlite'
+    if target == 'sqlite':
+        migrated_tasks, migrated_sessions = migrate_json_to_sqlite()
+        print(f"Migrated {migrated_tasks} tasks and {migrated_sessions} sessions to SQLite")
+    elif target == 'partitioned':
+        migrated_sessions = migrate_json_to_partitions()
+        print(f"Split {migrated_sessions} sessions into monthly partitions")
+    elif target == 'binary':
+        migrated_sessions = migrate_json_to_binary()
+        print(f"Wrote {migrated_sessions} sessions to a binary session file")
+    elif target == 'json':
+        migrated_sessions = migrate_binary_to_json()
+        print(f"Wrote {migrated_sessions} sessions back to JSON")
+    else:
+        sys.exit(f"Unknown migration target: {target} "
+                 f"(expected sqlite, partitioned, binary or json)")
@@ -3,16 +3,42 @@ Study Tracker Module
 Tracks study sessions and provides statistics
 """
 
-import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
-from collections import Counter
+from .storage import DeferredStore, JSONStore, defer_writes, open_session_store
+from .aggregates import SessionAggregates
+from .changefeed import SESSION_EVENTS, SESSION_RECORDED, feed_dir, shared_feed
+from .analytics import StudyAnalytics
+from .columnar import ColumnarSessions
+from .instrument import note, timed
+from .search_index import SearchIndex
+from .time_index import TimeIndex
+from .utils import check_record, validate_date, parse_bool
 
 class StudyTracker:
-    def __init__(self, data_file='data/study_sessions.json'):
+    def __init__(self, data_file='data/study_sessions.json', storage='json',
+                 compact_threshold=1000, verify_aggregates=False, layout='dicts',
+                 write_behind=False, max_delay=2.0, max_pending=100):
+        if layout not in ('dicts', 'columnar'):
+            raise ValueError(f"Unknown session layout: {layout}")
         self.data_file = data_file
+        self.storage = storage
+        self.layout = layout
         self.sessions = []
+        self.version = 0  # bumped on every change so derived data can be cached
+        self.aggregates = SessionAggregates()
+        self.time_index = TimeIndex(lambda i: self.sessions[i]['start_time'])
+        self._analytics = None
+        self._subjects = None
+        self.verify_aggregates = verify_aggregates
         self._ensure_data_dir()
+        self.changes = shared_feed(feed_dir(data_file))
+        self.store = open_session_store(storage, data_file,
+                                        compact_threshold=compact_threshold)
+        if write_behind:
+            # Coalesce writes: at most max_pending changes or max_delay seconds unsaved
+            self.store = defer_writes(self.store, max_delay, max_pending)
         self._load_sessions()
     
     def _ensure_data_dir(self):
@@ -21,85 +47,314 @@ class StudyTracker:
         if data_dir and not os.path.exists(data_dir):
             os.makedirs(data_dir)
     
+    @timed('sessions.load')
     def _load_sessions(self):
-        """Load study sessions from JSON file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    self.sessions = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                self.sessions = []
+        """Load study sessions from the storage backend"""
+        self._set_sessions(self.store.load())
+        note(records=len(self.sessions))
+    
+    def _set_sessions(self, sessions):
+        """Replace the in-memory sessions and rebuild everything derived from them"""
+        self.sessions = sessions
+        # The binary store already loads sessions into columns
+        if self.layout == 'columnar' and not isinstance(self.sessions, ColumnarSessions):
+            self.sessions = ColumnarSessions(self.sessions)
+        if self.store.resident:
+            self.aggregates.rebuild(self.sessions)
+            order = None
+            if isinstance(self.sessions, ColumnarSessions):
+                order = self.sessions.time_order()
+            self.time_index.rebuild(len(self.sessions), order)
         else:
-            self.sessions = []
+            self.aggregates.reset()
+            for subject, minutes, count in self.store.subject_totals():
+                self.aggregates.add_subject(subject, minutes, count)
+        self._analytics = None
+        self._subjects = None
+        self.version += 1
     
     def _save_sessions(self):
-        """Save study sessions to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.sessions, f, indent=4)
+        """Save all study sessions to the storage backend"""
+        if self.store.resident:
+            self.store.save(self.sessions)
     
     def start_session(self, subject, planned_duration):
         """Start a new study session"""
-        session = {
+        # Recorded as planned; timer.SessionEngine measures the real duration
+        return self.record_session({
             'subject': subject,
             'planned_duration': planned_duration,
-            'actual_duration': planned_duration,  # In a real app, this would be tracked
+            'actual_duration': planned_duration,
             'start_time': datetime.now().isoformat(),
             'date': datetime.now().strftime('%Y-%m-%d'),
             'completed': True
-        }
-        self.sessions.append(session)
-        self._save_sessions()
+        })
+    
+    @timed('sessions.record')
+    def record_session(self, session):
+        """Record a session that has already taken place"""
+        if self.store.resident:
+            self.sessions.append(session)
+            self.time_index.add(len(self.sessions) - 1)
+            self._index_subjects(len(self.sessions) - 1)
+        merged = self.store.add(session, self.sessions)
+        self._publish([session])
+        if merged is not None:
+            # Another process wrote to the file too; pick up its sessions as well
+            self._set_sessions(merged)
+        else:
+            self.aggregates.add(session)
+            if self._analytics is not None:
+                self._analytics.append(session)
+            self.version += 1
         return session
     
+    def _session_from_record(self, record):
+        """Build a validated session from an imported record"""
+        check_record(record)
+        subject = (record.get('subject') or '').strip()
+        if not subject:
+            raise ValueError("missing subject")
+        
+        try:
+            planned = int(record.get('planned_duration') or record.get('duration'))
+            actual = record.get('actual_duration')
+            # 0 minutes actually studied is a value, not a missing field
+            actual = planned if actual in (None, '') else int(actual)
+        except (TypeError, ValueError):
+            raise ValueError("invalid duration")
+        if planned <= 0 or actual < 0:
+            raise ValueError("invalid duration")
+        
+        start_time = (record.get('start_time') or '').strip()
+        try:
+            started = datetime.fromisoformat(start_time)
+        except ValueError:
+            raise ValueError(f"invalid start time '{start_time}'")
+        
+        date = (record.get('date') or '').strip() or started.strftime('%Y-%m-%d')
+        if not validate_date(date):
+            raise ValueError(f"invalid date '{date}'")
+        
+        completed = parse_bool(record.get('completed', True))
+        
+        return {
+            'subject': subject,
+            'planned_duration': planned,
+            'actual_duration': actual,
+            'start_time': started.isoformat(),
+            'date': date,
+            'completed': completed
+        }
+    
+    def _commit_sessions(self, batch):
+        """Record a batch of sessions with a single storage write"""
+        if self.store.resident:
+            first = len(self.sessions)
+            self.sessions.extend(batch)
+            for position in range(first, len(self.sessions)):
+                self.time_index.add(position)
+            self._index_subjects(first)
+        merged = self.store.add_many(batch, self.sessions)
+        self._publish(batch)
+        if merged is not None:
+            self._set_sessions(merged)
+            return
+        for session in batch:
+            self.aggregates.add(session)
+        if self._analytics is not None:
+            self._analytics.extend(batch)
+        self.version += 1
+    
+    @timed('sessions.import')
+    def import_sessions(self, records, batch_size=1000):
+        """Validate and record many past sessions, writing once per batch.
+        
+        Returns a dict with the number of imported sessions and a list of
+        (record number, reason) pairs for rejected records.
+        """
+        imported = 0
+        rejected = []
+        batch = []
+        for number, record in enumerate(records, 1):
+            try:
+                batch.append(self._session_from_record(record))
+            except ValueError as e:
+                rejected.append((number, str(e)))
+                continue
+            except (TypeError, AttributeError) as e:
+                # A field of the wrong type, e.g. a number where text was expected
+                rejected.append((number, f"invalid field type ({e})"))
+                continue
+            
+            if len(batch) >= batch_size:
+                self._commit_sessions(batch)
+                imported += len(batch)
+                batch = []
+        
+        if batch:
+            self._commit_sessions(batch)
+            imported += len(batch)
+        return {'imported': imported, 'rejected': rejected}
+    
+    def _publish(self, sessions):
+        """Record new sessions in the change feed"""
+        self.changes.publish_many([(SESSION_RECORDED, {'session': dict(session)})
+                                   for session in sessions])
+    
+    def subscribe(self, callback):
+        """Call ``callback(event)`` after every session recorded in this process;
+        returns a function that unsubscribes"""
+        return self.changes.subscribe(callback, SESSION_EVENTS)
+    
+    def changes_since(self, seq, limit=None):
+        """session_recorded events after ``seq``, oldest first (see
+        TaskManager.changes_since)"""
+        return self.changes.changes_since(seq, SESSION_EVENTS, limit)
+    
+    @timed('sessions.flush')
+    def flush(self):
+        """Write any sessions held back by write-behind mode"""
+        if isinstance(self.store, DeferredStore):
+            merged = self.store.flush()
+            if merged is not None:
+                self._set_sessions(merged)
+    
+    @contextmanager
+    def batch(self):
+        """Coalesce every session recorded inside the block into a single write"""
+        if type(self.store) is JSONStore:
+            store = self.store
+            self.store = defer_writes(store, max_delay=None, max_pending=None)
+            try:
+                yield self
+            finally:
+                self.flush()
+                self.store = self.store.detach()
+        else:
+            yield self
+            self.flush()
+    
+    def compact(self):
+        """Compact the storage backend (folds the session log into its snapshot)"""
+        self.store.compact(self.sessions)
+    
+    def close(self):
+        """Flush pending sessions and release storage resources"""
+        self.flush()
+        self.store.close()
+    
+    @timed('sessions.list', records=len)
     def get_all_sessions(self):
         """Return all study sessions"""
+        if not self.store.resident:
+            return list(self.store.iter_sessions())
         return self.sessions
     
+    def iter_sessions(self):
+        """Iterate over all sessions, streaming them from disk when the
+        storage backend doesn't keep them in memory"""
+        if not self.store.resident:
+            return self.store.iter_sessions()
+        return iter(self.sessions)
+    
+    def get_session_count(self):
+        """Return the number of recorded sessions"""
+        return self.aggregates.session_count
+    
+    def _index_subjects(self, first):
+        """Add sessions from position ``first`` on to the subject index, if built"""
+        if self._subjects is None:
+            return
+        positions_by_key, search = self._subjects
+        for position in range(first, len(self.sessions)):
+            subject = self.sessions[position]['subject']
+            positions = positions_by_key.get(subject.lower())
+            if positions is None:
+                positions = positions_by_key[subject.lower()] = []
+                search.add(subject.lower(), subject)
+            positions.append(position)
+    
+    def _subject_index(self):
+        """Session positions per lower-cased subject, plus a search index over
+        the distinct subjects; built on first use and then kept up to date"""
+        if self._subjects is None:
+            self._subjects = ({}, SearchIndex())
+            self._index_subjects(0)
+        return self._subjects
+    
+    @timed('sessions.by_subject', records=len)
     def get_sessions_by_subject(self, subject):
         """Get all sessions for a specific subject"""
-        return [s for s in self.sessions if s['subject'].lower() == subject.lower()]
+        if not self.store.resident:
+            return self.store.sessions_by_subject(subject)
+        positions = self._subject_index()[0].get(subject.lower(), [])
+        return [self.sessions[i] for i in positions]
+    
+    @timed('sessions.search', records=len)
+    def search(self, query, limit=None):
+        """Sessions whose subject contains every word of the query (as a
+        prefix, ignoring case), oldest first"""
+        if not self.store.resident:
+            search = SearchIndex()
+            search.add_many((row[0].lower(), row[0]) for row in self.store.subject_totals())
+            matches = []
+            for key in search.search(query):
+                matches.extend(self.store.sessions_by_subject(key))
+            matches.sort(key=lambda s: s['start_time'])
+        else:
+            positions_by_key, search = self._subject_index()
+            positions = sorted(p for key in search.search(query) for p in positions_by_key[key])
+            matches = [self.sessions[i] for i in positions]
+        return matches[:limit] if limit is not None else matches
+    
+    def check_aggregates(self):
+        """Verify the running aggregates against a full recompute"""
+        return self.aggregates.verify(self.iter_sessions())
     
+    @timed('sessions.statistics')
     def get_statistics(self):
-        """Calculate and return study statistics"""
-        if not self.sessions:
-            return {
-                'total_sessions': 0,
-                'total_hours': 0,
-                'avg_duration': 0,
-                'most_studied_subject': 'None'
-            }
-        
-        total_sessions = len(self.sessions)
-        total_minutes = sum(s['actual_duration'] for s in self.sessions)
-        total_hours = total_minutes / 60
-        avg_duration = total_minutes / total_sessions if total_sessions > 0 else 0
-        
-        # Find most studied subject
-        subjects = [s['subject'] for s in self.sessions]
-        subject_counts = Counter(subjects)
-        most_studied = subject_counts.most_common(1)[0][0] if subject_counts else 'None'
-        
-        return {
-            'total_sessions': total_sessions,
-            'total_hours': total_hours,
-            'avg_duration': avg_duration,
-            'most_studied_subject': most_studied
-        }
+        """Return study statistics from the running aggregates"""
+        if self.verify_aggregates:
+            self.check_aggregates()
+        return self.aggregates.statistics()
     
+    @timed('sessions.recent', records=len)
     def get_recent_sessions(self, limit=5):
         """Get most recent study sessions"""
-        return sorted(self.sessions, 
-                     key=lambda x: x['start_time'], 
-                     reverse=True)[:limit]
+        if not self.store.resident:
+            return self.store.recent(limit)
+        return [self.sessions[i] for i in self.time_index.newest(limit)]
+    
+    @timed('sessions.between', records=len)
+    def get_sessions_between(self, start, end):
+        """Get sessions with start <= start_time < end, oldest first.
+        
+        Bounds are datetimes or ISO strings; a bare 'YYYY-MM-DD' means the
+        start of that day.
+        """
+        if isinstance(start, datetime):
+            start = start.isoformat()
+        if isinstance(end, datetime):
+            end = end.isoformat()
+        if not self.store.resident:
+            return self.store.sessions_between(start, end)
+        return [self.sessions[i] for i in self.time_index.between(start, end)]
     
+    @timed('sessions.analytics')
+    def get_analytics(self):
+        """Analytics over the whole history (see StudyAnalytics), built on first
+        use and then kept up to date as sessions are recorded"""
+        if self._analytics is None:
+            if isinstance(self.sessions, ColumnarSessions):
+                self._analytics = StudyAnalytics.from_columnar(self.sessions)
+            else:
+                self._analytics = StudyAnalytics(self.iter_sessions())
+        return self._analytics
+    
+    @timed('sessions.breakdown')
     def get_subject_breakdown(self):
         """Get breakdown of time spent on each subject"""
-        subject_time = {}
-        for session in self.sessions:
-            subject = session['subject']
-            duration = session['actual_duration']
-            subject_time[subject] = subject_time.get(subject, 0) + duration
-        
-        return dict(sorted(subject_time.items(), 
-                          key=lambda x: x[1], 
-                          reverse=True))
+        if self.verify_aggregates:
+            self.check_aggregates()
+        return self.aggregates.breakdown()
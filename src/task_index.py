@@ -0,0 +1,87 @@
+"""
+Task Index Module
+In-memory id lookup and priority-ordered buckets for tasks
+"""
+
+from .storage import PRIORITY_RANK, priority_rank
+
+RANKS = sorted(set(PRIORITY_RANK.values())) + [3]
+
+
+class TaskIndex:
+    """id -> task dict plus one insertion-ordered bucket per (completed, rank).
+
+    Walking the buckets in key order lists pending tasks before completed
+    ones and higher priority first. Within a priority, pending tasks keep the
+    order they were added in, as the full sort get_all_tasks used to do left
+    them. Completed tasks are ordered by completed_at (oldest first) instead
+    of by when they were added: this is intentional, since completing a task
+    appends it to its bucket and a reload has to give the same order.
+    """
+
+    def __init__(self, tasks=()):
+        self.by_id = {}
+        self.buckets = {(completed, rank): {}
+                        for completed in (False, True) for rank in RANKS}
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks):
+        """Index a list of tasks loaded from storage"""
+        self.by_id.clear()
+        for bucket in self.buckets.values():
+            bucket.clear()
+
+        for task in tasks:
+            self.by_id[task['id']] = task
+        pending = [t for t in tasks if not t['completed']]
+        completed = sorted((t for t in tasks if t['completed']),
+                           key=lambda t: t.get('completed_at') or '')
+        for task in pending + completed:
+            self._bucket(task)[task['id']] = task
+
+    def _bucket(self, task):
+        return self.buckets[(bool(task['completed']), priority_rank(task['priority']))]
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def values(self):
+        """Tasks in insertion order"""
+        return self.by_id.values()
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def add(self, task):
+        self.by_id[task['id']] = task
+        self._bucket(task)[task['id']] = task
+
+    def remove(self, task):
+        del self.by_id[task['id']]
+        del self._bucket(task)[task['id']]
+
+    def mark_completed(self, task, completed_at):
+        """Move a task into its completed bucket"""
+        del self._bucket(task)[task['id']]
+        task['completed'] = True
+        task['completed_at'] = completed_at
+        self._bucket(task)[task['id']] = task
+
+    def ordered(self):
+        """Tasks ordered by completion status, then priority, then the order
+        they were added (pending) or completed (completed)"""
+        result = []
+        for key in sorted(self.buckets):
+            result.extend(self.buckets[key].values())
+        return result
+
+    def bucket(self, priority, completed=False):
+        """Tasks with one priority and completion status, in bucket order"""
+        return list(self.buckets[(completed, priority_rank(priority))].values())
+
+    def count(self, completed=None, priority=None):
+        """Number of tasks matching a completion status and/or priority"""
+        rank = None if priority is None else priority_rank(priority)
+        return sum(len(bucket) for (c, r), bucket in self.buckets.items()
+                   if (completed is None or c == completed)
+                   and (rank is None or r == rank))
@@ -3,16 +3,41 @@ Task Manager Module
 Handles task creation, management, and storage
 """
 
-import json
 import os
-from datetime import datetime
-import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from .storage import DeferredStore, JSONStore, defer_writes, open_task_store, priority_rank
+from .changefeed import (TASK_ADDED, TASK_COMPLETED, TASK_DELETED, TASK_EVENTS,
+                         feed_dir, shared_feed)
+from .due_index import DueIndex
+from .fileio import file_stamp
+from .instrument import note, timed
+from .search_index import SearchIndex, index_path
+from .task_index import TaskIndex
+from .utils import check_record, parse_bool, parse_due_date
+
+PRIORITIES = ('High', 'Medium', 'Low')
+
+def new_task_id():
+    """Random 8-character hex task id (uuid4 prefix without importing uuid)"""
+    return os.urandom(4).hex()
 
 class TaskManager:
-    def __init__(self, data_file='data/tasks.json'):
+    def __init__(self, data_file='data/tasks.json', storage='json',
+                 write_behind=False, max_delay=2.0, max_pending=100):
         self.data_file = data_file
-        self.tasks = []
+        self.search_file = index_path(data_file)
+        self.index = TaskIndex()
+        self._due = None
+        self._search = None
+        self._search_dirty = False
+        self._search_stale = False
         self._ensure_data_dir()
+        self.changes = shared_feed(feed_dir(data_file))
+        self.store = open_task_store(storage, data_file)
+        if write_behind:
+            # Coalesce writes: at most max_pending changes or max_delay seconds unsaved
+            self.store = defer_writes(self.store, max_delay, max_pending)
         self._load_tasks()
     
     def _ensure_data_dir(self):
@@ -21,82 +46,301 @@ class TaskManager:
         if data_dir and not os.path.exists(data_dir):
             os.makedirs(data_dir)
     
+    @property
+    def tasks(self):
+        """All tasks in insertion order"""
+        return list(self.index.values())
+    
+    @timed('tasks.load')
     def _load_tasks(self):
-        """Load tasks from JSON file"""
-        if os.path.exists(self.data_file):
+        """Load tasks from the storage backend"""
+        self.index.rebuild(self.store.load())
+        self._due = None
+        self._search_stale = False
+        note(records=len(self.index))
+    
+    def reload(self):
+        """Save pending changes and re-read every task, picking up changes
+        other processes made since this manager was loaded"""
+        self.flush()
+        self._load_tasks()
+        self._search = None
+    
+    def _merge(self, merged):
+        """Adopt the merged task list after another process changed the file"""
+        if merged is not None:
+            self.index.rebuild(merged)
+            self._due = None
+            self._search = None
+    
+    @property
+    def due(self):
+        """Index of pending tasks by due date, built on first use so loading
+        (and every command that never asks about deadlines) doesn't pay for it"""
+        if self._due is None:
+            self._due = DueIndex(self.index.values())
+        return self._due
+    
+    def _save_tasks(self):
+        """Save all tasks to the storage backend"""
+        if self.store.resident:
+            self.store.save(self.index.values())
+    
+    def _publish(self, kind, tasks):
+        """Record task changes in the change feed (copies, so later edits don't leak in)"""
+        self.changes.publish_many([(kind, {'task': dict(task)}) for task in tasks])
+    
+    def subscribe(self, callback):
+        """Call ``callback(event)`` after every task change made in this process;
+        returns a function that unsubscribes"""
+        return self.changes.subscribe(callback, TASK_EVENTS)
+    
+    def changes_since(self, seq, limit=None):
+        """Task events (added, completed, deleted) after ``seq``, oldest first.
+        
+        Pass the seq of the last event seen to pick up from there; the feed is
+        on disk, so this also returns changes made by other processes.
+        """
+        return self.changes.changes_since(seq, TASK_EVENTS, limit)
+    
+    @timed('tasks.flush')
+    def flush(self):
+        """Write any changes held back by write-behind mode"""
+        if isinstance(self.store, DeferredStore):
+            self._merge(self.store.flush())
+    
+    @contextmanager
+    def batch(self):
+        """Coalesce every change made inside the block into a single write"""
+        if type(self.store) is JSONStore:
+            store = self.store
+            self.store = defer_writes(store, max_delay=None, max_pending=None)
             try:
-                with open(self.data_file, 'r') as f:
-                    self.tasks = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                self.tasks = []
+                yield self
+            finally:
+                self.flush()
+                self.store = self.store.detach()
         else:
-            self.tasks = []
+            yield self
+            self.flush()
     
-    def _save_tasks(self):
-        """Save tasks to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.tasks, f, indent=4)
+    def close(self):
+        """Flush pending changes, save the search index and release storage"""
+        self.flush()
+        if self._search is not None and self._search_dirty:
+            self._search.save(self.search_file, self._source_file(), self._source_stamp())
+            self._search_dirty = False
+        self.store.close()
     
+    @timed('tasks.add')
     def add_task(self, title, description, priority='Medium', due_date=None):
-        """Add a new task"""
+        """Add a new task; raises ValueError if the due date isn't YYYY-MM-DD"""
+        due_date = parse_due_date(due_date)
         task = {
-            'id': str(uuid.uuid4())[:8],
+            'id': new_task_id(),
             'title': title,
             'description': description,
             'priority': priority,
-            'due_date': due_date if due_date else None,
+            'due_date': due_date,
             'created_at': datetime.now().isoformat(),
             'completed': False,
             'completed_at': None
         }
-        self.tasks.append(task)
-        self._save_tasks()
+        if self.store.resident:
+            self.index.add(task)
+            if self._due is not None:
+                self._due.add(task)
+        self._index_tasks([task])
+        self._merge(self.store.add(task, self.index.values()))
+        self._publish(TASK_ADDED, [task])
         return task['id']
     
+    def _task_from_record(self, record):
+        """Build a validated task from an imported record"""
+        check_record(record)
+        title = (record.get('title') or '').strip()
+        if not title:
+            raise ValueError("missing title")
+        
+        priority = (record.get('priority') or 'Medium').strip().capitalize()
+        if priority not in PRIORITIES:
+            raise ValueError(f"invalid priority '{record.get('priority')}'")
+        
+        due_date = parse_due_date(record.get('due_date'))
+        
+        completed = parse_bool(record.get('completed', False))
+        
+        task_id = record.get('id') or new_task_id()
+        if self.get_task_by_id(task_id) is not None:
+            raise ValueError(f"duplicate task id '{task_id}'")
+        
+        now = datetime.now().isoformat()
+        return {
+            'id': task_id,
+            'title': title,
+            'description': record.get('description') or '',
+            'priority': priority,
+            'due_date': due_date,
+            'created_at': record.get('created_at') or now,
+            'completed': completed,
+            'completed_at': (record.get('completed_at') or now) if completed else None
+        }
+    
+    def _commit_tasks(self, batch):
+        """Add a batch of tasks with a single storage write"""
+        if self.store.resident:
+            for task in batch:
+                self.index.add(task)
+                if self._due is not None:
+                    self._due.add(task)
+        self._index_tasks(batch)
+        self._merge(self.store.add_many(batch, self.index.values()))
+        self._publish(TASK_ADDED, batch)
+    
+    @timed('tasks.import')
+    def add_tasks_bulk(self, records, batch_size=1000):
+        """Validate and add many tasks, writing to storage once per batch.
+        
+        Returns a dict with the number of imported tasks and a list of
+        (record number, reason) pairs for rejected records.
+        """
+        imported = 0
+        rejected = []
+        batch = []
+        batch_ids = set()
+        for number, record in enumerate(records, 1):
+            try:
+                task = self._task_from_record(record)
+                if task['id'] in batch_ids:
+                    raise ValueError(f"duplicate task id '{task['id']}'")
+            except ValueError as e:
+                rejected.append((number, str(e)))
+                continue
+            except (TypeError, AttributeError) as e:
+                # A field of the wrong type, e.g. a number where text was expected
+                rejected.append((number, f"invalid field type ({e})"))
+                continue
+            
+            batch.append(task)
+            batch_ids.add(task['id'])
+            if len(batch) >= batch_size:
+                self._commit_tasks(batch)
+                imported += len(batch)
+                batch = []
+                batch_ids = set()
+        
+        if batch:
+            self._commit_tasks(batch)
+            imported += len(batch)
+        return {'imported': imported, 'rejected': rejected}
+    
+    @timed('tasks.list', records=len)
     def get_all_tasks(self):
         """Return all tasks"""
-        return sorted(self.tasks, key=lambda x: (
-            x['completed'],
-            {'High': 0, 'Medium': 1, 'Low': 2}.get(x['priority'], 3)
-        ))
+        if not self.store.resident:
+            return self.store.ordered_tasks()
+        return self.index.ordered()
     
     def get_task_by_id(self, task_id):
         """Get a specific task by ID"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                return task
-        return None
+        if not self.store.resident:
+            return self.store.get(task_id)
+        return self.index.get(task_id)
     
+    @timed('tasks.complete')
     def complete_task(self, task_id):
         """Mark a task as completed"""
         task = self.get_task_by_id(task_id)
         if task:
-            task['completed'] = True
-            task['completed_at'] = datetime.now().isoformat()
-            self._save_tasks()
+            completed_at = datetime.now().isoformat()
+            if self.store.resident:
+                self.index.mark_completed(task, completed_at)
+                if self._due is not None:
+                    self._due.remove(task['id'])
+            else:
+                task['completed'] = True
+                task['completed_at'] = completed_at
+            self._merge(self.store.update(task, self.index.values()))
+            self._publish(TASK_COMPLETED, [task])
             return True
         return False
     
+    @timed('tasks.delete')
     def delete_task(self, task_id):
         """Delete a task"""
         task = self.get_task_by_id(task_id)
         if task:
-            self.tasks.remove(task)
-            self._save_tasks()
+            if self.store.resident:
+                self.index.remove(task)
+                if self._due is not None:
+                    self._due.remove(task['id'])
+            search = self._search_for_update()
+            if search is not None:
+                search.remove(task['id'], self._search_text(task))
+                self._search_dirty = True
+            self._merge(self.store.delete(task, self.index.values()))
+            self._publish(TASK_DELETED, [task])
             return True
         return False
     
+    @timed('tasks.priority', records=len)
     def get_priority_tasks(self):
         """Get high priority tasks that are not completed"""
-        return [task for task in self.tasks 
-                if task['priority'] == 'High' and not task['completed']]
+        if not self.store.resident:
+            return self.store.priority_tasks()
+        return self.index.bucket('High', completed=False)
+    
+    @timed('tasks.urgency', records=len)
+    def get_tasks_by_urgency(self):
+        """All tasks, most urgent first: pending tasks by due date (overdue ones
+        lead), then priority; undated pending tasks by priority; then completed ones"""
+        if not self.store.resident:
+            return self.store.urgency_ordered_tasks()
+        buckets = [(key, self.index.buckets[key]) for key in sorted(self.index.buckets)]
+        undated = [task for (done, _), bucket in buckets if not done
+                   for task in bucket.values() if task['id'] not in self.due]
+        completed = [task for (done, _), bucket in buckets if done
+                     for task in bucket.values()]
+        return self.due.ordered() + undated + completed
+    
+    def get_due_between(self, start=None, end=None, limit=None):
+        """Pending tasks due from ``start`` through ``end`` (dates, inclusive;
+        None leaves that side open), earliest deadline then highest priority first"""
+        start = start.isoformat() if start is not None else None
+        end = end.isoformat() if end is not None else None
+        if not self.store.resident:
+            return self.store.due_tasks(start, end, limit)
+        return self.due.between(start, end, limit)
     
+    @timed('tasks.overdue', records=len)
+    def get_overdue(self, today=None, limit=None):
+        """Pending tasks whose due date has passed, most overdue first"""
+        today = (today or date.today()).isoformat()
+        if not self.store.resident:
+            return self.store.due_tasks(before=today, limit=limit)
+        return self.due.before(today, limit)
+    
+    @timed('tasks.due_within', records=len)
+    def get_due_within(self, days, today=None, limit=None):
+        """Pending tasks due today or in the next ``days`` days, soonest first"""
+        today = today or date.today()
+        return self.get_due_between(today, today + timedelta(days=days), limit)
+    
+    def next_deadline(self, today=None):
+        """The pending task due soonest from ``today`` on (overdue ones aside), or None"""
+        tasks = self.get_due_between(today or date.today(), limit=1)
+        return tasks[0] if tasks else None
+    
+    @timed('tasks.statistics')
     def get_statistics(self):
         """Get task statistics"""
-        total = len(self.tasks)
-        completed = len([t for t in self.tasks if t['completed']])
+        if not self.store.resident:
+            total, completed, high_priority = self.store.statistics()
+        else:
+            total = len(self.index)
+            completed = self.index.count(completed=True)
+            high_priority = self.index.count(priority='High')
         pending = total - completed
-        high_priority = len([t for t in self.tasks if t['priority'] == 'High'])
         
         return {
             'total': total,
@@ -105,3 +349,69 @@ class TaskManager:
             'high_priority': high_priority,
             'completion_rate': (completed / total * 100) if total > 0 else 0
         }
+    
+    @staticmethod
+    def _search_text(task):
+        return f"{task['title']} {task['description'] or ''}"
+    
+    def _source_file(self):
+        """File the search index is checked against"""
+        return getattr(self.store, 'db_file', self.data_file)
+    
+    def _source_stamp(self):
+        """State of the task file the in-memory tasks match: as this manager
+        last read or wrote it, not as another process may since have left it.
+        A saved search index built from any other state would return ids this
+        manager doesn't have. () stands for a file that didn't exist yet."""
+        if not self.store.resident:
+            # Lookups go to the database, so its current state is the one to match
+            return file_stamp(self._source_file()) or ()
+        store = self.store.store if isinstance(self.store, DeferredStore) else self.store
+        return store._stamp or ()
+    
+    def _search_for_update(self):
+        """The search index a change should be applied to. A saved index is
+        loaded before the first change, while it still matches the task file,
+        so close() saves it updated instead of the next search rebuilding it;
+        None if there is no such index"""
+        if self._search is None and not self._search_stale:
+            self._search = SearchIndex.load(self.search_file, self._source_file(),
+                                            self._source_stamp())
+            self._search_dirty = False
+            # Changes made without an index leave the saved one out of date
+            self._search_stale = self._search is None
+        return self._search
+    
+    def _index_tasks(self, tasks):
+        """Add tasks to the search index, if there is one to keep up to date"""
+        search = self._search_for_update()
+        if search is not None:
+            search.add_many((t['id'], self._search_text(t)) for t in tasks)
+            self._search_dirty = True
+    
+    def _search_index(self):
+        """The search index: loaded from disk when it was built from the tasks
+        this manager has, otherwise built once and saved for the next start"""
+        if self._search is None:
+            if not self._search_stale:
+                self._search = SearchIndex.load(self.search_file, self._source_file(),
+                                                self._source_stamp())
+            if self._search is None:
+                tasks = self.index.values() if self.store.resident else self.store.iter_tasks()
+                self._search = SearchIndex()
+                self._search.add_many((t['id'], self._search_text(t)) for t in tasks)
+                self._search.save(self.search_file, self._source_file(), self._source_stamp())
+            self._search_dirty = False
+        return self._search
+    
+    @timed('tasks.search', records=len)
+    def search(self, query, limit=None):
+        """Tasks whose title or description contains every word of the query
+        (as a prefix, ignoring case), pending and high priority first"""
+        matches = [self.get_task_by_id(task_id)
+                   for task_id in self._search_index().search(query)]
+        # Ids another process indexed (or deleted since) aren't ours to show
+        matches = [task for task in matches if task is not None]
+        matches.sort(key=lambda t: (t['completed'], priority_rank(t['priority']),
+                                    t['created_at']))
+        return matches[:limit] if limit is not None else matches
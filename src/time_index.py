@@ -0,0 +1,96 @@
+"""
+Time Index Module
+Keeps session positions ordered by start time for top-K and range queries
+"""
+
+from array import array
+
+
+class TimeIndex:
+    """Session positions sorted by (start_time, -position).
+
+    Only positions are stored (8 bytes per session); start times are read
+    back from the session list through ``key``. Sessions usually arrive in
+    chronological order, so loading is a single sortedness check and an
+    insert is an append; out-of-order sessions fall back to a binary-search
+    insert. Ties on start time put later sessions first, which matches a
+    stable descending sort when the index is read newest-first; between()
+    hands ties back in the order they were added.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.order = array('q')
+
+    def rebuild(self, count, order=None):
+        """Index positions 0..count-1, sorting only if they are out of order.
+
+        While positions are in order the index is just a range. ``order`` is
+        the sorted order of the first ``len(order)`` positions when the caller
+        already has it (columnar stores work it out without decoding a start
+        time); positions after those are added one at a time.
+        """
+        if order is None:
+            keys = [self.key(i) for i in range(count)]
+            if all(keys[i] < keys[i + 1] for i in range(count - 1)):
+                order = range(count)
+            else:
+                order = array('q', sorted(range(count), key=lambda i: (keys[i], -i)))
+        self.order = order
+        for position in range(len(order), count):
+            self.add(position)
+
+    def __len__(self):
+        return len(self.order)
+
+    def _first_at_or_after(self, start_time):
+        """Index into order of the first session starting at or after start_time"""
+        lo, hi = 0, len(self.order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(self.order[mid]) < start_time:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def add(self, position):
+        """Index a newly appended session"""
+        start_time = self.key(position)
+        if not self.order or self.key(self.order[-1]) < start_time:
+            if isinstance(self.order, range) and position == len(self.order):
+                self.order = range(position + 1)
+            else:
+                self._materialize()
+                self.order.append(position)
+        else:
+            self._materialize()
+            self.order.insert(self._first_at_or_after(start_time), position)
+
+    def _materialize(self):
+        if isinstance(self.order, range):
+            self.order = array('q', self.order)
+
+    def newest(self, limit):
+        """Positions of the newest sessions, newest first"""
+        count = len(self.order)
+        return [self.order[i] for i in range(count - 1, max(count - limit, 0) - 1, -1)]
+
+    def between(self, start, end):
+        """Positions with start <= start_time < end, oldest first; sessions
+        with the same start time come in the order they were added"""
+        lo = self._first_at_or_after(start)
+        hi = self._first_at_or_after(end)
+        positions = list(self.order[lo:hi])
+        keys = [self.key(position) for position in positions]
+        ties = [i for i in range(1, len(keys)) if keys[i] == keys[i - 1]]
+        # The index keeps ties later-first for newest(); flip each run of them
+        i = 0
+        while i < len(ties):
+            first = ties[i] - 1
+            while i + 1 < len(ties) and ties[i + 1] == ties[i] + 1:
+                i += 1
+            last = ties[i] + 1
+            positions[first:last] = positions[first:last][::-1]
+            i += 1
+        return positions
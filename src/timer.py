@@ -0,0 +1,380 @@
+"""
+Session Timer Module
+Asyncio Pomodoro timers that measure study sessions as they happen
+"""
+
+import asyncio
+import heapq
+import math
+import time
+from datetime import datetime, timedelta
+
+WORK = 'work'
+BREAK = 'break'
+
+
+class SystemClock:
+    """Real time, with timers scheduled on the running event loop"""
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def now(self):
+        return datetime.now()
+
+    def call_later(self, delay, callback):
+        """Run ``callback`` after ``delay`` seconds; returns a handle with cancel()"""
+        return asyncio.get_running_loop().call_later(delay, callback)
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+class FakeClock(SystemClock):
+    """Manually advanced clock for exercising timers without waiting.
+
+    ``await clock.advance(seconds)`` fires due timers in order, letting the
+    event loop run after each one so sessions schedule their next phase
+    at the exact time the previous one ended.
+    """
+
+    def __init__(self, start=None):
+        self.time = 0.0
+        self.start = start or datetime(2025, 1, 1, 9, 0)
+        self._timers = []
+        self._seq = 0
+
+    def monotonic(self):
+        return self.time
+
+    def now(self):
+        return self.start + timedelta(seconds=self.time)
+
+    def call_later(self, delay, callback):
+        handle = _FakeHandle(callback)
+        self._seq += 1
+        heapq.heappush(self._timers, (self.time + max(delay, 0), self._seq, handle))
+        return handle
+
+    async def sleep(self, seconds):
+        future = asyncio.get_running_loop().create_future()
+        self.call_later(seconds, lambda: future.done() or future.set_result(None))
+        await future
+
+    async def settle(self):
+        """Let woken coroutines run until they wait again"""
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def advance(self, seconds):
+        target = self.time + seconds
+        await self.settle()
+        while self._timers and self._timers[0][0] <= target:
+            when, _, handle = heapq.heappop(self._timers)
+            if handle.cancelled:
+                continue
+            self.time = when
+            handle.callback()
+            await self.settle()
+        self.time = target
+        await self.settle()
+
+
+class _FakeHandle:
+    def __init__(self, callback):
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def pomodoro_phases(planned_duration, work_minutes=25, break_minutes=5):
+    """(kind, seconds) phases covering ``planned_duration`` minutes of work.
+
+    Work is split into blocks of ``work_minutes`` with a break between
+    blocks (none after the last one); the last block may be shorter.
+    """
+    if planned_duration <= 0 or work_minutes <= 0 or break_minutes < 0:
+        raise ValueError("durations must be positive")
+    phases = []
+    left = planned_duration * 60
+    while left > 1e-9:
+        block = min(work_minutes * 60, left)
+        if phases and break_minutes:
+            phases.append((BREAK, break_minutes * 60))
+        phases.append((WORK, block))
+        left -= block
+    return phases
+
+
+class TimedSession:
+    """One study session running through its Pomodoro phases.
+
+    The session waits for the end of the current phase with a single timer
+    rather than ticking, so an idle session costs nothing until a phase ends
+    or it is paused, resumed or aborted. Only time spent in running work
+    phases counts as studied.
+    """
+
+    def __init__(self, subject, planned_duration, work_minutes=25, break_minutes=5,
+                 clock=None):
+        self.subject = subject
+        self.planned_duration = planned_duration
+        self.phases = pomodoro_phases(planned_duration, work_minutes, break_minutes)
+        self.clock = clock or SystemClock()
+        self.state = 'pending'
+        self.phase_index = 0
+        self.remaining = self.phases[0][1]
+        self.studied = 0.0
+        self.started = None
+        self.ended = None
+        self._mark = None
+        self._waiter = None
+
+    @property
+    def phase(self):
+        return self.phases[self.phase_index][0]
+
+    @property
+    def cycle(self):
+        """Number of the current work block (a break counts towards the next one)"""
+        return sum(1 for kind, _ in self.phases[:self.phase_index] if kind == WORK) + 1
+
+    @property
+    def cycles(self):
+        return sum(1 for kind, _ in self.phases if kind == WORK)
+
+    @property
+    def active(self):
+        return self.state in ('pending', 'running', 'paused')
+
+    def _account(self):
+        """Charge the time since the last mark to the current phase"""
+        now = self.clock.monotonic()
+        if self.state == 'running':
+            spent = min(now - self._mark, self.remaining)
+            self.remaining -= spent
+            if self.phase == WORK:
+                self.studied += spent
+        self._mark = now
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _wait(self, seconds):
+        """Wait ``seconds`` (None: indefinitely) or until pause/resume/abort"""
+        self._waiter = asyncio.get_running_loop().create_future()
+        handle = self.clock.call_later(seconds, self._wake) if seconds is not None else None
+        try:
+            await self._waiter
+        finally:
+            if handle is not None:
+                handle.cancel()
+            self._waiter = None
+
+    async def run(self):
+        """Run every phase; returns the session once finished or aborted"""
+        self.started = self.clock.now()
+        self._mark = self.clock.monotonic()
+        if self.state == 'pending':
+            self.state = 'running'
+        while self.state != 'aborted':
+            if self.state == 'paused':
+                await self._wait(None)
+                continue
+            await self._wait(self.remaining)
+            self._account()
+            if self.remaining <= 1e-9 and self.state == 'running':
+                if self.phase_index == len(self.phases) - 1:
+                    self.state = 'finished'
+                    break
+                self.phase_index += 1
+                self.remaining = self.phases[self.phase_index][1]
+        self.ended = self.clock.now()
+        return self
+
+    def pause(self):
+        if self.state not in ('pending', 'running'):
+            return False
+        self._account()
+        self.state = 'paused'
+        self._wake()
+        return True
+
+    def resume(self):
+        if self.state != 'paused':
+            return False
+        self._mark = self.clock.monotonic()
+        self.state = 'running'
+        self._wake()
+        return True
+
+    def abort(self):
+        if not self.active:
+            return False
+        self._account()
+        self.state = 'aborted'
+        self._wake()
+        return True
+
+    def phase_left(self):
+        """Seconds left in the current phase, up to this moment"""
+        if self.state != 'running':
+            return self.remaining
+        return max(0.0, self.remaining - (self.clock.monotonic() - self._mark))
+
+    def studied_seconds(self):
+        """Seconds studied so far, up to this moment"""
+        if self.state == 'running' and self.phase == WORK:
+            return self.studied + self.remaining - self.phase_left()
+        return self.studied
+
+    def progress(self):
+        """Snapshot of the session for displays and APIs"""
+        return {
+            'subject': self.subject,
+            'state': self.state,
+            'phase': self.phase,
+            'cycle': self.cycle,
+            'cycles': self.cycles,
+            'phase_left': round(self.phase_left(), 1),
+            'studied_minutes': round(self.studied_seconds() / 60, 2),
+            'planned_duration': self.planned_duration
+        }
+
+    def record(self):
+        """The session record to store, with the measured duration"""
+        return {
+            'subject': self.subject,
+            'planned_duration': self.planned_duration,
+            'actual_duration': round(self.studied / 60),
+            'start_time': self.started.isoformat(),
+            'date': self.started.strftime('%Y-%m-%d'),
+            'completed': self.state == 'finished'
+        }
+
+
+class SessionEngine:
+    """Runs any number of timed sessions on one event loop.
+
+    Finished sessions, and aborted ones that got at least a minute of
+    study in, are recorded in ``study_tracker`` with their measured
+    duration. Sessions are addressed by the id ``start()`` returns.
+    """
+
+    def __init__(self, study_tracker=None, clock=None):
+        self.study_tracker = study_tracker
+        self.clock = clock or SystemClock()
+        self.sessions = {}
+        self.recorded = []
+        self._tasks = {}
+        self._next_id = 1
+
+    def start(self, subject, planned_duration, work_minutes=25, break_minutes=5):
+        """Start a session in the running loop; returns its id"""
+        session = TimedSession(subject, planned_duration, work_minutes, break_minutes,
+                               self.clock)
+        session_id = self._next_id
+        self._next_id += 1
+        self.sessions[session_id] = session
+        self._tasks[session_id] = asyncio.get_running_loop().create_task(
+            self._run(session))
+        return session_id
+
+    async def _run(self, session):
+        await session.run()
+        record = session.record()
+        if session.state == 'finished' or record['actual_duration'] > 0:
+            if self.study_tracker is not None:
+                record = self.study_tracker.record_session(record)
+            self.recorded.append(record)
+        return record
+
+    def pause(self, session_id):
+        return self.sessions[session_id].pause()
+
+    def resume(self, session_id):
+        return self.sessions[session_id].resume()
+
+    def abort(self, session_id):
+        return self.sessions[session_id].abort()
+
+    def abort_all(self):
+        for session in self.sessions.values():
+            session.abort()
+
+    def active(self):
+        return [s for s in self.sessions.values() if s.active]
+
+    def progress(self):
+        return {session_id: s.progress() for session_id, s in self.sessions.items()}
+
+    async def wait(self):
+        """Wait for every started session to finish or be aborted"""
+        await asyncio.gather(*self._tasks.values())
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(math.ceil(seconds)), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def render(session):
+    """One status line for a session"""
+    if session.state == 'paused':
+        status = "paused"
+    elif session.phase == BREAK:
+        status = "break"
+    else:
+        status = f"work {session.cycle}/{session.cycles}"
+    return (f"{session.subject}: {status} {format_seconds(session.phase_left())} left, "
+            f"{session.studied_seconds() / 60:.0f}/{session.planned_duration} min studied")
+
+
+class ProgressDisplay:
+    """Redraws a status line once per ``interval`` while sessions are active.
+
+    On a terminal the line is rewritten in place with a carriage return and
+    an erase-line escape; anything else gets a new line only when a
+    session changes phase or state.
+    """
+
+    def __init__(self, engine, stream, interval=1.0, max_shown=3):
+        self.engine = engine
+        self.stream = stream
+        self.interval = interval
+        self.max_shown = max_shown
+        self.tty = hasattr(stream, 'isatty') and stream.isatty()
+        self._last = None
+
+    def line(self):
+        active = self.engine.active()
+        if len(active) <= self.max_shown:
+            return " | ".join(render(s) for s in active)
+        paused = sum(1 for s in active if s.state == 'paused')
+        return f"{len(active)} sessions running, {paused} paused"
+
+    def draw(self):
+        text = self.line()
+        if self.tty:
+            self.stream.write(f"\r\033[K{text}")
+        else:
+            key = [(s.state, s.phase_index) for s in self.engine.active()]
+            if key == self._last:
+                return
+            self._last = key
+            self.stream.write(text + "\n")
+        self.stream.flush()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(0)
+            if not self.engine.active():
+                break
+            self.draw()
+            await self.engine.clock.sleep(self.interval)
+        if self.tty:
+            self.stream.write("\r\033[K")
+            self.stream.flush()
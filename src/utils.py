@@ -8,7 +8,14 @@ import sys
 
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if not sys.stdout.isatty():
+        return
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        # ANSI clear + cursor home; avoids spawning a shell for every screen
+        sys.stdout.write('\033[2J\033[H')
+        sys.stdout.flush()
 
 def print_banner():
     """Print application banner"""
@@ -55,6 +62,35 @@ def validate_date(date_string):
     except ValueError:
         return False
 
+def parse_due_date(value):
+    """Normalize a due date to YYYY-MM-DD (None when empty); raises ValueError if invalid"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    
+    from datetime import datetime
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise ValueError(f"invalid due date '{value}' (expected YYYY-MM-DD)") from None
+
+def check_record(record):
+    """Return an imported record if it is a dict; raise ValueError otherwise
+    (a record that failed to parse arrives as the ValueError itself)"""
+    if isinstance(record, ValueError):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError(f"expected an object, got {type(record).__name__}")
+    return record
+
+def parse_bool(value):
+    """Interpret a boolean that may have been read from a text file"""
+    if isinstance(value, str):
+        return value.strip().lower() in ['true', '1', 'yes', 'y']
+    return bool(value)
+
 def print_success(message):
     """Print success message"""
     print(f"\n✓ {message}")